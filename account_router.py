@@ -0,0 +1,276 @@
+"""
+Project Terminus - Multi-Account Order Router
+Fans a single strategy signal out to many prop firm accounts concurrently
+"""
+
+import asyncio
+import time
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+
+from directional_futures_strategy import SignalType
+from tradovate_oms import TradovateOMS, OrderType, OrderStatus
+
+class AccountRouter:
+    """
+    Routes strategy signals to N Tradovate accounts
+    
+    Every account keeps its own TradovateOMS session. A signal is sized per
+    account and submitted to all sessions at once, so the signal-to-last-ack
+    time is bounded by the slowest account rather than the sum of all of them.
+    """
+    
+    def __init__(self, ack_timeout: float = 2.0):
+        """
+        Initialize router
+        
+        Args:
+            ack_timeout: Seconds to wait for any single account's ack
+        """
+        self.ack_timeout = ack_timeout
+        self.accounts: Dict[str, Dict] = {}
+        
+        # Fills from every account land on one queue, tagged by account
+        self.fill_queue: asyncio.Queue = asyncio.Queue()
+        self.fills: Dict[str, List[Dict]] = {}
+        self.last_route: Optional[Dict] = None
+        
+    def add_account(self,
+                    oms: TradovateOMS,
+                    size_multiplier: float = 1.0,
+                    max_contracts: int = 1,
+                    risk_check: Optional[Callable[[TradovateOMS, str, int], Tuple[bool, str]]] = None):
+        """
+        Register an account session with the router
+        
+        Args:
+            oms: Connected (or connectable) OMS session for the account
+            size_multiplier: Scales the strategy's base quantity for this account
+            max_contracts: Hard cap on contracts per order for this account
+            risk_check: Optional synchronous governor hook returning (approved, reason)
+        """
+        account_id = oms.account_id
+        if account_id in self.accounts:
+            raise ValueError(f"Account {account_id} already registered")
+            
+        self.accounts[account_id] = {
+            'oms': oms,
+            'size_multiplier': size_multiplier,
+            'max_contracts': max_contracts,
+            'risk_check': risk_check
+        }
+        self.fills[account_id] = []
+        oms.register_fill_callback(partial(self._on_fill, account_id))
+        
+    @classmethod
+    def from_account_ids(cls, account_ids: List[str],
+                         governor_factory: Optional[Callable] = None,
+                         **kwargs) -> 'AccountRouter':
+        """
+        Build a router with one OMS session per account ID
+        
+        Args:
+            account_ids: Tradovate account IDs
+            governor_factory: Optional callable returning a fresh TerminusGovernor
+                per account; place_order then enforces it on every routed order
+        """
+        router = cls(**kwargs)
+        for account_id in account_ids:
+            governor = governor_factory() if governor_factory is not None else None
+            router.add_account(TradovateOMS(account_id=account_id, governor=governor))
+        return router
+        
+    async def connect_all(self) -> Dict[str, bool]:
+        """Connect every session concurrently"""
+        account_ids = list(self.accounts)
+        results = await asyncio.gather(
+            *[self.accounts[a]['oms'].connect() for a in account_ids],
+            return_exceptions=True
+        )
+        return {a: r is True for a, r in zip(account_ids, results)}
+        
+    def size_for_account(self, account_id: str, base_quantity: int) -> int:
+        """
+        Per-account order size
+        
+        Args:
+            account_id: Registered account
+            base_quantity: Quantity requested by the strategy
+            
+        Returns:
+            Contracts to trade on this account (0 means skip)
+        """
+        slot = self.accounts[account_id]
+        quantity = int(base_quantity * slot['size_multiplier'])
+        return max(0, min(quantity, slot['max_contracts']))
+        
+    async def route_signal(self,
+                           signal: SignalType,
+                           details: Optional[Dict] = None,
+                           base_quantity: int = 1,
+                           order_type: OrderType = OrderType.MARKET,
+                           price: Optional[float] = None,
+                           stop_price: Optional[float] = None) -> Dict:
+        """
+        Fan one strategy signal out to every account
+        
+        Args:
+            signal: Signal from DirectionalFuturesStrategy.generate_signal
+            details: Signal details (kept for the route report)
+            base_quantity: Strategy quantity before per-account sizing
+            order_type: Order type for entries
+            price: Limit price (for Limit orders)
+            stop_price: Stop price (for Stop orders)
+            
+        Returns:
+            Route report with per-account acks, rejections and latencies
+        """
+        report = {
+            'signal': signal.value,
+            'details': details or {},
+            'acks': {},
+            'rejected': {},
+            'errors': {},
+            'latency_ms': {}
+        }
+        
+        if signal == SignalType.HOLD:
+            return report
+            
+        start = time.perf_counter()
+        decision_ns = time.monotonic_ns()
+        account_ids = list(self.accounts)
+        
+        results = await asyncio.gather(
+            *[self._route_to_account(a, signal, base_quantity, order_type, price, stop_price, start,
+                                     decision_ns)
+              for a in account_ids],
+            return_exceptions=True
+        )
+        
+        for account_id, result in zip(account_ids, results):
+            if isinstance(result, Exception):
+                report['errors'][account_id] = repr(result)
+                continue
+                
+            status, payload, latency_ms = result
+            report['latency_ms'][account_id] = latency_ms
+            if status == 'ack':
+                report['acks'][account_id] = payload
+            elif status == 'rejected':
+                report['rejected'][account_id] = payload
+            else:
+                report['errors'][account_id] = payload
+                
+        report['signal_to_last_ack_ms'] = max(report['latency_ms'].values(), default=0.0)
+        self.last_route = report
+        
+        print(f"📡 Routed {signal.value} to {len(account_ids)} accounts: "
+              f"{len(report['acks'])} acked, {len(report['rejected'])} rejected, "
+              f"{len(report['errors'])} errors in {report['signal_to_last_ack_ms']:.2f}ms")
+              
+        return report
+        
+    async def _route_to_account(self,
+                                account_id: str,
+                                signal: SignalType,
+                                base_quantity: int,
+                                order_type: OrderType,
+                                price: Optional[float],
+                                stop_price: Optional[float],
+                                start: float,
+                                decision_ns: Optional[int] = None) -> Tuple[str, object, float]:
+        """Size, risk-check and submit a signal for one account"""
+        slot = self.accounts[account_id]
+        oms = slot['oms']
+        
+        def elapsed_ms() -> float:
+            return (time.perf_counter() - start) * 1000
+            
+        if signal == SignalType.CLOSE:
+            coro = oms.close_position()
+        else:
+            side = 'buy' if signal == SignalType.BUY else 'sell'
+            quantity = self.size_for_account(account_id, base_quantity)
+            if quantity == 0:
+                return 'rejected', 'Sized to zero contracts', elapsed_ms()
+                
+            if slot['risk_check'] is not None:
+                approved, reason = slot['risk_check'](oms, side, quantity)
+                if not approved:
+                    return 'rejected', reason, elapsed_ms()
+                    
+            coro = oms.place_order(side, quantity, order_type, price=price, stop_price=stop_price,
+                                   decision_ns=decision_ns)
+            
+        try:
+            response = await asyncio.wait_for(coro, timeout=self.ack_timeout)
+        except asyncio.TimeoutError:
+            return 'error', f"No ack within {self.ack_timeout}s", elapsed_ms()
+            
+        if 'error' in response or response.get('status') == OrderStatus.REJECTED.value:
+            return 'rejected', response.get('error', response.get('message')), elapsed_ms()
+            
+        return 'ack', response, elapsed_ms()
+        
+    async def on_tick(self, tick: Dict):
+        """
+        Feed callback: forward one tick to every account session concurrently
+        
+        Each session marks its own governor and paper engine, so sessions
+        must not share a PaperMatchingEngine.
+        """
+        await asyncio.gather(*[slot['oms'].on_tick(tick) for slot in self.accounts.values()])
+        
+    async def _on_fill(self, account_id: str, fill: Dict):
+        """Collect a fill from any account without blocking the others"""
+        tagged = {'accountId': account_id, **fill}
+        self.fills[account_id].append(tagged)
+        self.fill_queue.put_nowait(tagged)
+        
+    async def next_fill(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Wait for the next fill from any account"""
+        try:
+            return await asyncio.wait_for(self.fill_queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+            
+    def get_positions(self) -> Dict[str, Dict]:
+        """Current position on every account"""
+        return {a: slot['oms'].get_position() for a, slot in self.accounts.items()}
+        
+    async def disconnect_all(self):
+        """Disconnect every session"""
+        await asyncio.gather(
+            *[slot['oms'].disconnect() for slot in self.accounts.values()],
+            return_exceptions=True
+        )
+
+async def test_account_router():
+    """Test fan-out across multiple accounts"""
+    print("=" * 60)
+    print("📡 ACCOUNT ROUTER TEST")
+    print("=" * 60)
+    
+    account_ids = [f"APEX-EVAL-{i:02d}" for i in range(20)]
+    router = AccountRouter.from_account_ids(account_ids)
+    
+    # Mix of account sizes (25K accounts trade 1, larger accounts scale up)
+    for i, account_id in enumerate(account_ids):
+        router.accounts[account_id]['size_multiplier'] = 1 + (i % 3)
+        router.accounts[account_id]['max_contracts'] = 3
+        
+    connected = await router.connect_all()
+    if not all(connected.values()):
+        print("⚠️  Running in placeholder mode")
+        for slot in router.accounts.values():
+            slot['oms'].is_connected = True  # Force for testing
+            
+    report = await router.route_signal(SignalType.BUY, {'reason': 'Router test'})
+    print(f"\n⏱️  Signal-to-last-ack: {report['signal_to_last_ack_ms']:.2f}ms")
+    print(f"   Acks: {len(report['acks'])}/{len(account_ids)}")
+    
+    await router.disconnect_all()
+
+if __name__ == "__main__":
+    asyncio.run(test_account_router())
@@ -0,0 +1,316 @@
+"""
+Project Terminus - Contract Roll Manager
+Quarterly equity index futures calendar, front-month resolution and back-adjusted series
+"""
+
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Union
+
+import pandas as pd
+
+# CME quarterly cycle month codes
+QUARTERLY_MONTH_CODES = {3: 'H', 6: 'M', 9: 'U', 12: 'Z'}
+
+class ContractRollManager:
+    """
+    Quarterly roll calendar for /MES and /MNQ
+    
+    Equity index futures expire on the third Friday of Mar/Jun/Sep/Dec.
+    Liquidity moves to the next contract on the CME roll date, the Thursday
+    eight days before expiration; that is when we switch the front month.
+    Contract IDs are resolved once per session and served from a dict, so
+    order placement never waits on a lookup.
+    """
+    
+    def __init__(self, roots: tuple = ('MES', 'MNQ'), roll_days_before_expiry: int = 8):
+        """
+        Initialize roll manager
+        
+        Args:
+            roots: Product roots to manage
+            roll_days_before_expiry: Calendar days before expiry to roll
+        """
+        self.roots = roots
+        self.roll_days_before_expiry = roll_days_before_expiry
+        
+        # Session cache: root -> {'symbol', 'contract_id', 'expiry', 'roll_date'}
+        self.session_cache: Dict[str, Dict] = {}
+        self.session_date: Optional[date] = None
+        
+    @staticmethod
+    def third_friday(year: int, month: int) -> date:
+        """Third Friday of a month"""
+        first = date(year, month, 1)
+        offset = (4 - first.weekday()) % 7  # Friday is weekday 4
+        return first + timedelta(days=offset + 14)
+        
+    def contract_for(self, root: str, year: int, month: int) -> Dict:
+        """
+        Contract details for a quarterly expiry
+        
+        Args:
+            root: Product root (e.g. 'MES')
+            year: Expiry year
+            month: Expiry month (3, 6, 9 or 12)
+            
+        Returns:
+            Dict with symbol, expiry and roll date
+        """
+        if month not in QUARTERLY_MONTH_CODES:
+            raise ValueError(f"{month} is not a quarterly expiry month")
+            
+        expiry = self.third_friday(year, month)
+        return {
+            'root': root,
+            'symbol': f"{root}{QUARTERLY_MONTH_CODES[month]}{year % 10}",
+            'year': year,
+            'month': month,
+            'expiry': expiry,
+            'roll_date': expiry - timedelta(days=self.roll_days_before_expiry)
+        }
+        
+    def front_month(self, root: str, as_of: Optional[Union[date, datetime]] = None) -> Dict:
+        """
+        Front-month contract trading on a given date
+        
+        Args:
+            root: Product root
+            as_of: Date to evaluate (default today)
+            
+        Returns:
+            Contract dict (see contract_for)
+        """
+        as_of = self._as_date(as_of)
+        contract = self.contract_for(root, as_of.year, 3)
+        while as_of >= contract['roll_date']:
+            contract = self.next_contract(contract)
+        return contract
+        
+    def next_contract(self, contract: Dict) -> Dict:
+        """Contract following a given one in the quarterly cycle"""
+        month = contract['month'] + 3
+        year = contract['year']
+        if month > 12:
+            month -= 12
+            year += 1
+        return self.contract_for(contract['root'], year, month)
+        
+    def roll_calendar(self, root: str, start: Union[date, datetime], end: Union[date, datetime]) -> List[Dict]:
+        """
+        Contracts active over a date range with their active windows
+        
+        Returns:
+            List of contract dicts with 'active_from' and 'active_to' (exclusive)
+        """
+        start, end = self._as_date(start), self._as_date(end)
+        contract = self.front_month(root, start)
+        calendar = []
+        active_from = start
+        
+        while active_from <= end:
+            calendar.append({**contract, 'active_from': active_from, 'active_to': contract['roll_date']})
+            active_from = contract['roll_date']
+            contract = self.next_contract(contract)
+            
+        return calendar
+        
+    async def resolve_session(self, resolver: Optional[Callable],
+                              as_of: Optional[Union[date, datetime]] = None) -> Dict[str, Dict]:
+        """
+        Resolve front-month contract IDs for every root once per session
+        
+        Args:
+            resolver: Async callable mapping a contract symbol to a broker contract ID
+                (None for market data sessions that only need symbols)
+            as_of: Session date (default today)
+            
+        Returns:
+            Session cache
+        """
+        session_date = self._as_date(as_of)
+        contracts = [self.front_month(root, session_date) for root in self.roots]
+        if resolver is not None:
+            contract_ids = await asyncio.gather(*[resolver(c['symbol']) for c in contracts])
+        else:
+            contract_ids = [None] * len(contracts)
+        
+        self.session_cache = {
+            c['root']: {**c, 'contract_id': contract_id}
+            for c, contract_id in zip(contracts, contract_ids)
+        }
+        self.session_date = session_date
+        
+        for root, entry in self.session_cache.items():
+            print(f"📅 {root} front month: {entry['symbol']} (id {entry['contract_id']}, "
+                  f"rolls {entry['roll_date'].isoformat()})")
+                  
+        return self.session_cache
+        
+    def get_contract_id(self, root: str) -> Optional[int]:
+        """Cached front-month contract ID (None until resolve_session runs)"""
+        entry = self.session_cache.get(root)
+        return entry['contract_id'] if entry is not None else None
+        
+    def get_front_symbol(self, root: str) -> str:
+        """Cached front-month symbol, computed from the calendar if not resolved"""
+        entry = self.session_cache.get(root)
+        if entry is None:
+            entry = self.front_month(root)
+            self.session_cache[root] = {**entry, 'contract_id': None}
+        return entry['symbol']
+        
+    def needs_roll(self, as_of: Optional[Union[date, datetime]] = None) -> bool:
+        """True when any cached contract has reached its roll date"""
+        as_of = self._as_date(as_of)
+        return any(as_of >= entry['roll_date'] for entry in self.session_cache.values())
+        
+    async def roll_session(self, resolver: Optional[Callable],
+                           as_of: Optional[Union[date, datetime]] = None) -> List[Dict]:
+        """
+        Re-resolve the session after a roll date has been reached
+        
+        Call when needs_roll() is True; long-running sessions do this from
+        their tick loop so they stop trading the expiring contract.
+        
+        Args:
+            resolver: See resolve_session
+            as_of: Date the roll was detected (default today)
+            
+        Returns:
+            One dict per rolled root with 'root', 'from_symbol', 'to_symbol'
+            and the new 'contract_id'
+        """
+        previous = {root: entry['symbol'] for root, entry in self.session_cache.items()}
+        await self.resolve_session(resolver, as_of)
+        
+        return [
+            {'root': root, 'from_symbol': previous[root], 'to_symbol': entry['symbol'],
+             'contract_id': entry['contract_id']}
+            for root, entry in self.session_cache.items()
+            if root in previous and previous[root] != entry['symbol']
+        ]
+        
+    def build_continuous_series(self, bars: Union[List[Dict], pd.DataFrame], root: str,
+                                method: str = 'difference') -> pd.DataFrame:
+        """
+        Back-adjusted continuous series from per-contract bars
+        
+        Bars from each contract are kept only inside that contract's active
+        window. At every roll the price gap between the new and old contract
+        (measured at the last timestamp both traded) is applied to all earlier
+        bars, so the most recent prices are real and moving averages such as
+        the 200-period SMA do not jump at rolls.
+        
+        Args:
+            bars: Bars with 'timestamp', 'symbol', 'open', 'high', 'low', 'close'
+            root: Product root
+            method: 'difference' (add the gap) or 'ratio' (scale by the ratio)
+            
+        Returns:
+            DataFrame of continuous bars with the source 'symbol' and the
+            cumulative 'adjustment' applied to each bar
+        """
+        if method not in ('difference', 'ratio'):
+            raise ValueError("method must be 'difference' or 'ratio'")
+            
+        df = pd.DataFrame(bars) if not isinstance(bars, pd.DataFrame) else bars.copy()
+        if df.empty:
+            return df
+            
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+        df = df.sort_values('timestamp', kind='stable').reset_index(drop=True)
+        calendar = self.roll_calendar(root, df['timestamp'].iloc[0], df['timestamp'].iloc[-1])
+        
+        # Active contract per bar via the roll dates (vectorized lookup)
+        roll_dates = pd.to_datetime([c['roll_date'] for c in calendar])
+        segment = roll_dates.searchsorted(df['timestamp'], side='right')
+        active_symbols = pd.Series([c['symbol'] for c in calendar])
+        df['active_symbol'] = active_symbols.iloc[segment].to_numpy()
+        
+        continuous = df[df['symbol'] == df['active_symbol']].copy()
+        price_cols = [c for c in ('open', 'high', 'low', 'close') if c in continuous.columns]
+        
+        # Gap at each roll: new contract minus old contract at the last common timestamp
+        gaps = []
+        for old, new in zip(calendar[:-1], calendar[1:]):
+            cutoff = pd.Timestamp(old['roll_date'])
+            old_px = df[(df['symbol'] == old['symbol']) & (df['timestamp'] < cutoff)].set_index('timestamp')['close']
+            new_px = df[(df['symbol'] == new['symbol']) & (df['timestamp'] < cutoff)].set_index('timestamp')['close']
+            common = old_px.index.intersection(new_px.index)
+            
+            if len(common):
+                old_close, new_close = old_px[common[-1]], new_px[common[-1]]
+            else:
+                after = df[(df['symbol'] == new['symbol']) & (df['timestamp'] >= cutoff)]['close']
+                if old_px.empty or after.empty:
+                    gaps.append(0.0 if method == 'difference' else 1.0)
+                    continue
+                old_close, new_close = old_px.iloc[-1], after.iloc[0]
+                
+            gaps.append(new_close - old_close if method == 'difference' else new_close / old_close)
+            
+        # Cumulative adjustment per segment: everything before a roll gets that roll's gap
+        if method == 'difference':
+            cumulative = pd.Series(gaps[::-1]).cumsum()[::-1].tolist() + [0.0]
+        else:
+            cumulative = pd.Series(gaps[::-1]).cumprod()[::-1].tolist() + [1.0]
+            
+        adjustment = pd.Series(cumulative).iloc[
+            roll_dates.searchsorted(continuous['timestamp'], side='right')
+        ].to_numpy()
+        continuous['adjustment'] = adjustment
+        
+        for col in price_cols:
+            if method == 'difference':
+                continuous[col] = continuous[col] + adjustment
+            else:
+                continuous[col] = continuous[col] * adjustment
+                
+        return continuous.drop(columns=['active_symbol']).reset_index(drop=True)
+        
+    @staticmethod
+    def _as_date(value: Optional[Union[date, datetime]]) -> date:
+        if value is None:
+            return date.today()
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, pd.Timestamp):
+            return value.date()
+        return value
+
+def test_roll_manager():
+    """Test the contract roll manager"""
+    print("=" * 60)
+    print("📅 CONTRACT ROLL MANAGER TEST")
+    print("=" * 60)
+    
+    manager = ContractRollManager()
+    
+    for as_of in [date(2025, 3, 12), date(2025, 3, 13), date(2025, 12, 11), date(2025, 12, 12)]:
+        contract = manager.front_month('MES', as_of)
+        print(f"   {as_of}: {contract['symbol']} (expires {contract['expiry']}, rolls {contract['roll_date']})")
+        
+    async def resolver(symbol):
+        return abs(hash(symbol)) % 100000
+        
+    asyncio.run(manager.resolve_session(resolver, date(2025, 8, 1)))
+    print(f"   Cached MES contract ID: {manager.get_contract_id('MES')}")
+    
+    # Two overlapping contracts with a 40-point carry gap across the September roll
+    bars = []
+    start = datetime(2025, 9, 8)
+    for i in range(8 * 24):
+        ts = start + timedelta(hours=i)
+        price = 6400 + i * 0.1
+        bars.append({'timestamp': ts, 'symbol': 'MESU5', 'open': price, 'high': price + 1,
+                     'low': price - 1, 'close': price})
+        bars.append({'timestamp': ts, 'symbol': 'MESZ5', 'open': price + 40, 'high': price + 41,
+                     'low': price + 39, 'close': price + 40})
+                     
+    series = manager.build_continuous_series(bars, 'MES')
+    jumps = series['close'].diff().abs().max()
+    print(f"\n📈 Continuous series: {len(series)} bars, largest bar-to-bar move {jumps:.2f} points")
+
+if __name__ == "__main__":
+    test_roll_manager()
@@ -6,10 +6,12 @@ Professional-grade futures market data integration
 import os
 import json
 import asyncio
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import Dict, List, Optional, Callable
 from dotenv import load_dotenv
 
+from contract_roll_manager import ContractRollManager
+
 # Load environment variables
 load_dotenv()
 
@@ -19,12 +21,26 @@ class DatentoClient:
     Handles real-time and historical data feeds
     """
     
-    def __init__(self):
+    def __init__(self, roll_manager: Optional[ContractRollManager] = None):
+        """
+        Initialize client
+        
+        Args:
+            roll_manager: Front-month resolver for the feed. Keep it separate
+                from the OMS's, which also carries broker contract IDs.
+        """
         self.api_key = os.getenv('DATABENTO_API_KEY')
         self.rate_limit = int(os.getenv('DATABENTO_RATE_LIMIT_PER_SECOND', 10))
         self.client = None
         self.is_connected = False
         self.callbacks = {}
+        self.roll_manager = roll_manager or ContractRollManager()
+        
+        # Roll handling: callbacks get {'root', 'from_symbol', 'to_symbol', 'gap'}
+        self.roll_callbacks: List[Callable] = []
+        self.last_price: Optional[float] = None
+        self._pending_roll: Optional[Dict] = None
+        self._roll_check_date: Optional[date] = None
         
         # Validate API key
         if not self.api_key or self.api_key == 'your-databento-api-key-here':
@@ -52,24 +68,31 @@ class DatentoClient:
         Subscribe to /MES (Micro E-mini S&P 500) real-time data
         
         Args:
-            callback: Function to call with market data updates
+            callback: Function to call with market data updates, e.g.
+                TradovateOMS.on_tick or AccountRouter.on_tick so the paper
+                engine, execution recorder and governor see every tick
         """
         if not self.is_connected:
             print("❌ Not connected to Databento")
             return False
         
         try:
+            # Subscribe to the front-month contract (e.g. MESU5), not the bare root
+            front_symbol = self.roll_manager.get_front_symbol('MES')
+            
             # TODO: Implement actual subscription
             # Symbol for Micro E-mini S&P 500 futures
             # self.client.subscribe(
-            #     dataset='GLBX.MDP3',  # CME Globex
-            #     symbols=['MES'],      # Micro E-mini S&P 500
-            #     schema='trades',      # Trade data
+            #     dataset='GLBX.MDP3',     # CME Globex
+            #     symbols=[front_symbol],  # Front-month Micro E-mini S&P 500
+            #     stype_in='raw_symbol',
+            #     schema='trades',         # Trade data
             #     handler=callback
             # )
             
-            print("📊 Subscribed to /MES futures data (placeholder)")
+            print(f"📊 Subscribed to /MES futures data: {front_symbol} (placeholder)")
             self.callbacks['MES'] = callback
+            self._roll_check_date = date.today()
             
             # Simulate some test data for development
             await self._simulate_market_data()
@@ -78,10 +101,64 @@ class DatentoClient:
             print(f"❌ Subscription error: {e}")
             return False
     
+    def register_roll_callback(self, callback: Callable):
+        """
+        Register an async callback invoked when the feed rolls to a new contract
+        
+        Args:
+            callback: Coroutine function taking a dict with 'root',
+                'from_symbol', 'to_symbol' and 'gap' (first new-contract trade
+                minus last old-contract trade), e.g.
+                DirectionalFuturesStrategy.on_roll
+        """
+        self.roll_callbacks.append(callback)
+        
+    async def _check_roll(self, as_of: datetime):
+        """Resubscribe to the next contract once the roll date is reached (checked daily)"""
+        day = as_of.date()
+        if day == self._roll_check_date:
+            return
+        self._roll_check_date = day
+        
+        if not self.roll_manager.needs_roll(day):
+            return
+            
+        for roll in await self.roll_manager.roll_session(None, day):
+            if roll['root'] != 'MES':
+                continue
+                
+            # TODO: Swap the live subscription
+            # self.client.subscribe(
+            #     dataset='GLBX.MDP3',
+            #     symbols=[roll['to_symbol']],
+            #     stype_in='raw_symbol',
+            #     schema='trades',
+            #     handler=self.callbacks['MES']
+            # )
+            print(f"🔁 Rolled /MES feed {roll['from_symbol']} -> {roll['to_symbol']} (placeholder)")
+            
+            # Gap is measured on the first trade of the new contract
+            self._pending_roll = {**roll, 'from_price': self.last_price}
+            
+    async def _dispatch_tick(self, tick: Dict):
+        """Deliver a tick, completing a pending roll on the new contract's first trade"""
+        roll = self._pending_roll
+        if roll is not None and tick.get('contract') == roll['to_symbol']:
+            self._pending_roll = None
+            from_price = roll.pop('from_price')
+            roll['gap'] = tick['price'] - from_price if from_price is not None else 0.0
+            for callback in self.roll_callbacks:
+                await callback(roll)
+                
+        self.last_price = tick['price']
+        if 'MES' in self.callbacks:
+            await self.callbacks['MES'](tick)
+            
     async def get_historical_data(self, 
                                   start_date: datetime, 
                                   end_date: datetime,
-                                  interval: str = '1m') -> List[Dict]:
+                                  interval: str = '1m',
+                                  continuous: bool = True) -> List[Dict]:
         """
         Fetch historical /MES data for backtesting
         
@@ -89,15 +166,21 @@ class DatentoClient:
             start_date: Start of historical period
             end_date: End of historical period  
             interval: Data interval (1m, 5m, 1h, 1d)
+            continuous: Back-adjust across quarterly rolls so indicators
+                (e.g. the 200-period SMA) do not jump at roll dates
             
         Returns:
             List of OHLCV bars
         """
         try:
+            calendar = self.roll_manager.roll_calendar('MES', start_date, end_date)
+            
             # TODO: Implement actual historical data fetch
+            # Every contract active in the range, so rolls can be stitched:
             # data = self.client.timeseries.get_range(
             #     dataset='GLBX.MDP3',
-            #     symbols=['MES'],
+            #     symbols=[c['symbol'] for c in calendar],
+            #     stype_in='raw_symbol',
             #     schema='ohlcv-1m',
             #     start=start_date,
             #     end=end_date
@@ -114,7 +197,7 @@ class DatentoClient:
             while current <= end_date:
                 dummy_data.append({
                     'timestamp': current.isoformat(),
-                    'symbol': 'MES',
+                    'symbol': self.roll_manager.front_month('MES', current)['symbol'],
                     'open': price,
                     'high': price + 2,
                     'low': price - 2,
@@ -124,6 +207,11 @@ class DatentoClient:
                 current += timedelta(minutes=1)
                 price += (0.5 if len(dummy_data) % 2 == 0 else -0.5)
             
+            if continuous and len(calendar) > 1:
+                series = self.roll_manager.build_continuous_series(dummy_data, 'MES')
+                series['timestamp'] = series['timestamp'].dt.strftime('%Y-%m-%dT%H:%M:%S')
+                return series.to_dict('records')
+                
             return dummy_data
             
         except Exception as e:
@@ -136,18 +224,21 @@ class DatentoClient:
         
         price = 4500.0
         while self.is_connected:
+            now = datetime.now()
+            await self._check_roll(now)
+            
             # Generate fake tick
             tick = {
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': now.isoformat(),
                 'symbol': 'MES',
+                'contract': self.roll_manager.get_front_symbol('MES'),
                 'price': price,
                 'size': 1,
                 'side': 'buy' if price > 4500 else 'sell'
             }
             
             # Call registered callbacks
-            if 'MES' in self.callbacks:
-                await self.callbacks['MES'](tick)
+            await self._dispatch_tick(tick)
             
             # Random walk
             price += (0.25 if asyncio.get_event_loop().time() % 2 < 1 else -0.25)
@@ -54,6 +54,10 @@ class DirectionalFuturesStrategy:
         self.position_entry_price = None
         self.position_stop_loss = None
         
+        # Roll gaps since entry: the position stays in the contract it was
+        # opened in while the price feed moves to the new front month
+        self.position_roll_offset = 0.0
+        
         # Price history for indicator calculation
         self.price_history = []
         self.indicators = {}
@@ -115,6 +119,33 @@ class DirectionalFuturesStrategy:
         else:
             self.current_regime = MarketRegime.NEUTRAL
     
+    def apply_roll_adjustment(self, price_gap: float):
+        """
+        Back-adjust price history when the feed rolls to a new contract
+        
+        Shifts every stored price by the new-minus-old contract gap so the
+        200 SMA and 20 EMA continue smoothly instead of jumping at the roll.
+        An open position is still held in the old contract, so its entry and
+        stop stay at their real levels; the gap is tracked separately and
+        taken out of feed prices when checking the stop.
+        
+        Args:
+            price_gap: New contract price minus old contract price at the roll
+        """
+        for point in self.price_history:
+            point['price'] += price_gap
+            
+        if self.position_entry_price is not None:
+            self.position_roll_offset += price_gap
+            
+        if len(self.price_history) >= self.ma_long_period:
+            self._calculate_indicators()
+            
+    async def on_roll(self, roll: Dict):
+        """Roll callback for DatentoClient.register_roll_callback"""
+        self.apply_roll_adjustment(roll['gap'])
+        
+
     def generate_signal(self) -> Tuple[SignalType, Dict]:
         """
         Generate trading signal based on current market conditions
@@ -140,20 +171,25 @@ class DirectionalFuturesStrategy:
         
         # Check if we have an open position
         if self.position_entry_price is not None:
+            # Price of the contract the position is held in
+            held_price = current_price - self.position_roll_offset
+            
             # Check stop loss
-            if current_price <= self.position_stop_loss:
+            if held_price <= self.position_stop_loss:
                 signal_details['reason'] = "Stop loss hit"
-                signal_details['exit_price'] = current_price
+                signal_details['exit_price'] = held_price
                 self.position_entry_price = None
                 self.position_stop_loss = None
+                self.position_roll_offset = 0.0
                 return SignalType.CLOSE, signal_details
             
             # Check regime change (exit on bear market)
             if self.current_regime != MarketRegime.BULL:
                 signal_details['reason'] = "Market regime changed to non-bull"
-                signal_details['exit_price'] = current_price
+                signal_details['exit_price'] = held_price
                 self.position_entry_price = None
                 self.position_stop_loss = None
+                self.position_roll_offset = 0.0
                 return SignalType.CLOSE, signal_details
             
             # Hold position
@@ -188,6 +224,7 @@ class DirectionalFuturesStrategy:
             'position_open': self.position_entry_price is not None,
             'position_entry': self.position_entry_price,
             'position_stop_loss': self.position_stop_loss,
+            'position_roll_offset': self.position_roll_offset,
             'indicators': self.indicators.copy() if self.indicators else {},
             'data_points': len(self.price_history)
         }
@@ -0,0 +1,264 @@
+"""
+Project Terminus - Execution Quality Analytics
+Per-order slippage and latency attribution for TradovateOMS
+"""
+
+import time
+import asyncio
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+import numpy as np
+
+class ExecutionRecorder:
+    """
+    Records each order's decision, submit, ack and fill stages
+    
+    Stage timestamps come from time.monotonic_ns(), so latencies are immune
+    to wall-clock adjustments. The decision price is the feed mid (bid/ask
+    if the tick has them, otherwise the last trade) current when the order
+    was decided. Completed orders go into a rolling window for live
+    summaries and into column lists that are saved as a compressed .npz.
+    """
+    
+    ORDER_TYPE_CODES = {'Market': 0, 'Limit': 1, 'Stop': 2, 'StopLimit': 3}
+    
+    def __init__(self, tick_size: float = 0.25, window: int = 500,
+                 output_path: str = 'execution_quality.npz'):
+        """
+        Initialize recorder
+        
+        Args:
+            tick_size: Minimum price increment for slippage in ticks
+            window: Completed orders kept for rolling statistics
+            output_path: Default file for save()
+        """
+        self.tick_size = tick_size
+        self.output_path = output_path
+        
+        # Latest feed state
+        self.last_mid: Optional[float] = None
+        self.last_tick_ns: Optional[int] = None
+        
+        self.open_records: Dict[str, Dict] = {}
+        self.window: Deque[Dict] = deque(maxlen=window)
+        self.columns: Dict[str, List] = {name: [] for name in (
+            'order_id', 'order_type', 'side', 'qty', 'filled_qty', 'rejected',
+            'decision_mid', 'fill_price', 'slippage_ticks',
+            'tick_ns', 'decision_ns', 'submit_ns', 'ack_ns', 'first_fill_ns', 'last_fill_ns'
+        )}
+        
+    def on_price(self, tick: Dict):
+        """Update the decision mid from a feed tick"""
+        bid, ask = tick.get('bid'), tick.get('ask')
+        self.last_mid = (bid + ask) / 2 if bid is not None and ask is not None else float(tick['price'])
+        self.last_tick_ns = time.monotonic_ns()
+        
+    async def on_tick(self, tick: Dict):
+        """Feed callback"""
+        self.on_price(tick)
+        
+    def begin_order(self, side: str, quantity: int, order_type: str,
+                    decision_ns: Optional[int] = None) -> Dict:
+        """
+        Open a record at decision time
+        
+        Args:
+            side: 'buy' or 'sell'
+            quantity: Contracts
+            order_type: OrderType value ('Market', 'Limit', ...)
+            decision_ns: Monotonic time the strategy decided (default now)
+            
+        Returns:
+            Record to pass to the later mark_* calls
+        """
+        return {
+            'order_id': None,
+            'order_type': order_type,
+            'side': 1 if side.lower() == 'buy' else -1,
+            'qty': quantity,
+            'filled_qty': 0,
+            'notional': 0.0,
+            'rejected': False,
+            'decision_mid': self.last_mid,
+            'tick_ns': self.last_tick_ns,
+            'decision_ns': decision_ns if decision_ns is not None else time.monotonic_ns(),
+            'submit_ns': None,
+            'ack_ns': None,
+            'first_fill_ns': None,
+            'last_fill_ns': None
+        }
+        
+    def mark_submit(self, record: Dict):
+        """Order handed to the broker (or paper engine)"""
+        record['submit_ns'] = time.monotonic_ns()
+        
+    def mark_ack(self, record: Dict, order_id: str, key: Optional[str] = None):
+        """Broker acknowledged the order; start waiting for fills"""
+        record['ack_ns'] = time.monotonic_ns()
+        record['order_id'] = order_id
+        self.open_records[key or order_id] = record
+        
+    def mark_reject(self, record: Dict, reason: str = ''):
+        """Order rejected before or at the broker"""
+        record['rejected'] = True
+        record['reject_reason'] = reason
+        self._complete(record)
+        
+    def record_fill(self, fill: Dict, key: Optional[str] = None):
+        """
+        Attribute a (partial) fill to its order
+        
+        Args:
+            fill: Fill dict with 'orderId', 'qty' and 'price'
+            key: Record key if not the bare order ID (e.g. account-qualified)
+        """
+        record = self.open_records.get(key or fill['orderId'])
+        if record is None:
+            return
+            
+        now = time.monotonic_ns()
+        if record['first_fill_ns'] is None:
+            record['first_fill_ns'] = now
+        record['last_fill_ns'] = now
+        record['filled_qty'] += fill['qty']
+        record['notional'] += fill['qty'] * fill['price']
+        
+        if record['filled_qty'] >= record['qty']:
+            del self.open_records[key or fill['orderId']]
+            self._complete(record)
+            
+    def close_order(self, order_id: str, key: Optional[str] = None):
+        """Finalize a cancelled or partially filled order"""
+        record = self.open_records.pop(key or order_id, None)
+        if record is not None:
+            self._complete(record)
+            
+    def _complete(self, record: Dict):
+        """Derive fill price and slippage, then store the record"""
+        if record['filled_qty'] > 0:
+            record['fill_price'] = record['notional'] / record['filled_qty']
+        else:
+            record['fill_price'] = None
+            
+        if record['fill_price'] is not None and record['decision_mid'] is not None:
+            record['slippage_ticks'] = ((record['fill_price'] - record['decision_mid'])
+                                        * record['side'] / self.tick_size)
+        else:
+            record['slippage_ticks'] = None
+            
+        self.window.append(record)
+        for name, values in self.columns.items():
+            values.append(record.get(name))
+            
+    def get_summary(self) -> Dict[str, Dict]:
+        """
+        Rolling execution quality per order type
+        
+        Returns:
+            Dict keyed by order type with order/reject counts, reject rate,
+            mean/median slippage in ticks (positive = adverse) and latency
+            percentiles in milliseconds
+        """
+        by_type: Dict[str, List[Dict]] = {}
+        for record in self.window:
+            by_type.setdefault(record['order_type'], []).append(record)
+            
+        summary = {}
+        for order_type, records in by_type.items():
+            rejected = sum(1 for r in records if r['rejected'])
+            slippage = np.array([r['slippage_ticks'] for r in records if r['slippage_ticks'] is not None])
+            
+            summary[order_type] = {
+                'orders': len(records),
+                'rejected': rejected,
+                'reject_rate': rejected / len(records),
+                'avg_slippage_ticks': float(slippage.mean()) if slippage.size else None,
+                'median_slippage_ticks': float(np.median(slippage)) if slippage.size else None,
+                'tick_to_trade_ms': self._percentiles(records, 'tick_ns', 'submit_ns'),
+                'decision_to_submit_ms': self._percentiles(records, 'decision_ns', 'submit_ns'),
+                'submit_to_ack_ms': self._percentiles(records, 'submit_ns', 'ack_ns'),
+                'ack_to_fill_ms': self._percentiles(records, 'ack_ns', 'first_fill_ns'),
+                'decision_to_fill_ms': self._percentiles(records, 'decision_ns', 'last_fill_ns')
+            }
+            
+        return summary
+        
+    @staticmethod
+    def _percentiles(records: List[Dict], start: str, end: str) -> Optional[Dict[str, float]]:
+        """p50/p90/p99 of end - start in milliseconds"""
+        deltas = np.array([r[end] - r[start] for r in records
+                           if r[start] is not None and r[end] is not None], dtype=np.float64)
+        if not deltas.size:
+            return None
+        p50, p90, p99 = np.percentile(deltas / 1e6, [50, 90, 99])
+        return {'p50': float(p50), 'p90': float(p90), 'p99': float(p99)}
+        
+    def save(self, path: Optional[str] = None) -> str:
+        """
+        Write every completed order as compressed columns
+        
+        Missing stage timestamps are stored as -1, missing prices as NaN.
+        Load with np.load(path) and wrap in a DataFrame for analysis.
+        """
+        path = path or self.output_path
+        cols = self.columns
+        
+        def ns_column(name):
+            return np.array([v if v is not None else -1 for v in cols[name]], dtype=np.int64)
+            
+        def float_column(name):
+            return np.array([v if v is not None else np.nan for v in cols[name]], dtype=np.float64)
+            
+        np.savez_compressed(
+            path,
+            order_id=np.array([str(v) for v in cols['order_id']]),
+            order_type=np.array([self.ORDER_TYPE_CODES.get(v, -1) for v in cols['order_type']], dtype=np.int8),
+            side=np.array(cols['side'], dtype=np.int8),
+            qty=np.array(cols['qty'], dtype=np.int32),
+            filled_qty=np.array(cols['filled_qty'], dtype=np.int32),
+            rejected=np.array(cols['rejected'], dtype=bool),
+            decision_mid=float_column('decision_mid'),
+            fill_price=float_column('fill_price'),
+            slippage_ticks=float_column('slippage_ticks'),
+            **{name: ns_column(name) for name in ('tick_ns', 'decision_ns', 'submit_ns', 'ack_ns',
+                                                  'first_fill_ns', 'last_fill_ns')}
+        )
+        print(f"💾 Saved {len(cols['order_id'])} execution records to {path}")
+        return path
+
+async def test_execution_analytics():
+    """Test execution analytics against the paper matching engine"""
+    from paper_matching_engine import PaperMatchingEngine
+    from tradovate_oms import TradovateOMS, OrderType
+    
+    print("=" * 60)
+    print("⏱️  EXECUTION ANALYTICS TEST")
+    print("=" * 60)
+    
+    engine = PaperMatchingEngine(latency_ms=20.0, market_slippage_ticks=1)
+    recorder = ExecutionRecorder()
+    oms = TradovateOMS(account_id='APEX-TEST', paper_engine=engine, execution_recorder=recorder)
+    await oms.connect()
+    
+    # The OMS forwards each feed tick to the recorder and paper engine
+    on_tick = oms.on_tick
+        
+    price = 4500.0
+    for i in range(40):
+        await on_tick({'timestamp': f"2025-08-01T09:30:{i:02d}", 'price': price, 'size': 5})
+        if i % 4 == 0:
+            await oms.place_order('buy' if i % 8 == 0 else 'sell', 1, OrderType.MARKET)
+        if i % 10 == 0:
+            await oms.place_order('buy', 1, OrderType.LIMIT, price=price - 0.25)
+        price += 0.25 if i % 3 else -0.25
+        
+    print(f"\n📊 Rolling summary:")
+    for order_type, stats in recorder.get_summary().items():
+        print(f"   {order_type}: {stats['orders']} orders, slippage {stats['avg_slippage_ticks']} ticks, "
+              f"tick-to-trade {stats['tick_to_trade_ms']}")
+              
+    recorder.save('execution_quality_test.npz')
+
+if __name__ == "__main__":
+    asyncio.run(test_execution_analytics())
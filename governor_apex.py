@@ -0,0 +1,295 @@
+"""
+Project Terminus - The Terminus Governor
+Real-time Apex trailing threshold monitoring and pre-trade risk approval
+"""
+
+import os
+import asyncio
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+from enum import Enum
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+class GovernorLevel(Enum):
+    """Governor protection levels"""
+    NORMAL = "Normal"        # Full trading enabled
+    CAUTION = "Caution"      # Reduced position sizing
+    EMERGENCY = "Emergency"  # No new trades
+    CRITICAL = "Critical"    # Force close all positions
+
+class TerminusGovernor:
+    """
+    Apex evaluation risk governor
+    
+    Risk Budget = Account Equity - (Highest Equity - Trailing Threshold)
+    
+    All state (realized balance, position, working-order quantity, open
+    P&L, high-water mark, risk budget, level) is updated incrementally on
+    each tick, order and fill, so both the per-tick mark and the per-order
+    check are a handful of arithmetic operations with no history scans.
+    """
+    
+    def __init__(self,
+                 starting_balance: Optional[float] = None,
+                 trailing_threshold: Optional[float] = None,
+                 point_value: float = 5.0,
+                 max_contracts: int = 1,
+                 caution_level: float = 500.0,
+                 emergency_level: float = 100.0,
+                 critical_level: float = 50.0):
+        """
+        Initialize governor
+        
+        Args:
+            starting_balance: Evaluation starting balance (default APEX_STARTING_CAPITAL)
+            trailing_threshold: Trailing drawdown (default APEX_TRAILING_THRESHOLD)
+            point_value: Dollars per point ($5 for /MES)
+            max_contracts: Maximum position size in Normal mode
+            caution_level: Risk budget below which sizing is reduced
+            emergency_level: Risk budget below which new trades are blocked
+            critical_level: Risk budget below which positions are force-closed
+        """
+        self.starting_balance = float(starting_balance or os.getenv('APEX_STARTING_CAPITAL', 25000))
+        self.trailing_threshold = float(trailing_threshold or os.getenv('APEX_TRAILING_THRESHOLD', 1500))
+        self.point_value = point_value
+        self.max_contracts = max_contracts
+        self.caution_max_contracts = max(1, max_contracts // 2)
+        self.caution_level = caution_level
+        self.emergency_level = emergency_level
+        self.critical_level = critical_level
+        
+        # Incrementally maintained account state
+        self.balance = self.starting_balance        # Realized
+        self.position_qty = 0
+        self.pending_qty = 0                        # Signed, approved but unfilled
+        self.avg_price = 0.0
+        self.last_price: Optional[float] = None
+        self.open_pnl = 0.0
+        self.high_water_mark = self.starting_balance
+        self.risk_budget = self.trailing_threshold
+        self.level = GovernorLevel.NORMAL
+        
+        # Force-flatten hook (set by TradovateOMS.attach_governor)
+        self.flatten_callback: Optional[Callable] = None
+        self.flatten_in_progress = False
+        self.level_changes = []
+        
+    @property
+    def equity(self) -> float:
+        """Realized balance plus open P&L"""
+        return self.balance + self.open_pnl
+        
+    @property
+    def liquidation_threshold(self) -> float:
+        """Equity level at which the evaluation fails"""
+        return self.high_water_mark - self.trailing_threshold
+        
+    def on_price(self, price: float) -> GovernorLevel:
+        """
+        Mark the position to a new trade price
+        
+        Args:
+            price: Latest trade price
+            
+        Returns:
+            Governor level after the update
+        """
+        self.last_price = price
+        self.open_pnl = (price - self.avg_price) * self.position_qty * self.point_value
+        self._update_risk()
+        return self.level
+        
+    async def on_tick(self, tick: Dict):
+        """
+        Feed callback: mark to the tick and force-flatten if Critical
+        
+        Called by TradovateOMS.on_tick for the account the governor is
+        attached to.
+        """
+        self.on_price(float(tick['price']))
+        if self.needs_flatten():
+            await self.force_flatten()
+            
+    def on_fill(self, fill: Dict):
+        """
+        Apply a fill to the governor's position and realized balance
+        
+        Args:
+            fill: Dict with 'action', 'qty' and 'price'
+        """
+        signed_qty = fill['qty'] if fill['action'].lower() == 'buy' else -fill['qty']
+        price = fill['price']
+        current = self.position_qty
+        
+        if current != 0 and (current > 0) != (signed_qty > 0):
+            # Reducing (possibly flipping): realize P&L on the closed part
+            closed = min(abs(signed_qty), abs(current))
+            direction = 1 if current > 0 else -1
+            self.balance += (price - self.avg_price) * closed * direction * self.point_value
+            
+            remaining = current + signed_qty
+            if remaining == 0:
+                self.avg_price = 0.0
+            elif (remaining > 0) != (current > 0):
+                self.avg_price = price
+            self.position_qty = remaining
+        else:
+            new_qty = current + signed_qty
+            self.avg_price = (self.avg_price * abs(current) + price * abs(signed_qty)) / abs(new_qty)
+            self.position_qty = new_qty
+            
+        if self.position_qty == 0:
+            self.flatten_in_progress = False
+            
+        self.on_price(self.last_price if self.last_price is not None else price)
+        
+    async def on_fill_async(self, fill: Dict):
+        """Async adapter for TradovateOMS fill callbacks"""
+        self.on_fill(fill)
+        
+    def reserve(self, side: str, quantity: int):
+        """Count an approved order as exposure until it fills or is cancelled"""
+        self.pending_qty += quantity if side.lower() == 'buy' else -quantity
+        
+    def release(self, side: str, quantity: int):
+        """Release part of a reserved order (filled, cancelled or rejected)"""
+        self.pending_qty -= quantity if side.lower() == 'buy' else -quantity
+        
+    def check_order(self, side: str, quantity: int) -> Tuple[bool, str, int]:
+        """
+        Pre-trade approval
+        
+        Limits apply to the position plus reserved working orders, so
+        several resting orders cannot add up past the cap.
+        
+        Args:
+            side: 'buy' or 'sell'
+            quantity: Requested contracts
+            
+        Returns:
+            Tuple of (approved, reason, max_quantity)
+        """
+        signed_qty = quantity if side.lower() == 'buy' else -quantity
+        current = self.position_qty + self.pending_qty
+        
+        # Orders that only reduce exposure are always allowed
+        if current != 0 and (current > 0) != (signed_qty > 0) and quantity <= abs(current):
+            return True, "Reducing order", quantity
+            
+        if self.level in (GovernorLevel.EMERGENCY, GovernorLevel.CRITICAL):
+            return False, f"Governor {self.level.value}: risk budget ${self.risk_budget:,.2f}", 0
+            
+        limit = self.caution_max_contracts if self.level == GovernorLevel.CAUTION else self.max_contracts
+        adding = current == 0 or (current > 0) == (signed_qty > 0)
+        headroom = limit - abs(current) if adding else abs(current) + limit
+        max_quantity = max(0, min(quantity, headroom))
+        if max_quantity == 0:
+            return False, f"Position limit {limit} contracts ({self.level.value})", 0
+            
+        return True, self.level.value, max_quantity
+        
+    def needs_flatten(self) -> bool:
+        """True when Critical with an open position and no flatten in flight"""
+        return (self.level == GovernorLevel.CRITICAL and self.position_qty != 0
+                and not self.flatten_in_progress)
+                
+    async def force_flatten(self):
+        """Close everything through the attached OMS"""
+        if self.flatten_callback is None:
+            print("🚨 Governor CRITICAL but no flatten callback attached")
+            return
+            
+        self.flatten_in_progress = True
+        print(f"🚨 Governor CRITICAL: force-closing {self.position_qty} contracts "
+              f"(risk budget ${self.risk_budget:,.2f})")
+        await self.flatten_callback()
+        
+    def _update_risk(self):
+        """Update high-water mark, risk budget and protection level"""
+        equity = self.balance + self.open_pnl
+        if equity > self.high_water_mark:
+            self.high_water_mark = equity
+            
+        self.risk_budget = equity - (self.high_water_mark - self.trailing_threshold)
+        
+        if self.risk_budget < self.critical_level:
+            level = GovernorLevel.CRITICAL
+        elif self.risk_budget < self.emergency_level:
+            level = GovernorLevel.EMERGENCY
+        elif self.risk_budget <= self.caution_level:
+            level = GovernorLevel.CAUTION
+        else:
+            level = GovernorLevel.NORMAL
+            
+        if level != self.level:
+            self.level_changes.append({
+                'timestamp': datetime.now().isoformat(),
+                'from': self.level.value,
+                'to': level.value,
+                'risk_budget': self.risk_budget
+            })
+            self.level = level
+            
+    def get_state(self) -> Dict:
+        """Current governor state"""
+        return {
+            'level': self.level.value,
+            'balance': self.balance,
+            'equity': self.equity,
+            'open_pnl': self.open_pnl,
+            'high_water_mark': self.high_water_mark,
+            'liquidation_threshold': self.liquidation_threshold,
+            'risk_budget': self.risk_budget,
+            'position_qty': self.position_qty,
+            'pending_qty': self.pending_qty,
+            'avg_price': self.avg_price,
+            'last_price': self.last_price
+        }
+
+async def test_governor():
+    """Test the governor against the paper matching engine"""
+    import time
+    from paper_matching_engine import PaperMatchingEngine
+    from tradovate_oms import TradovateOMS
+    
+    print("=" * 60)
+    print("🛡️  TERMINUS GOVERNOR TEST")
+    print("=" * 60)
+    
+    engine = PaperMatchingEngine(latency_ms=0.0)
+    governor = TerminusGovernor(starting_balance=25000, trailing_threshold=1500, max_contracts=4)
+    oms = TradovateOMS(account_id='APEX-TEST', paper_engine=engine)
+    oms.attach_governor(governor)
+    await oms.connect()
+    
+    # The OMS forwards each feed tick to its paper engine and governor
+    on_tick = oms.on_tick
+    
+    await on_tick({'timestamp': '2025-08-01T09:30:00', 'price': 4500.00, 'size': 1})
+    await oms.place_order('buy', 4)
+    await on_tick({'timestamp': '2025-08-01T09:30:01', 'price': 4500.00, 'size': 1})
+    print(f"   After entry: {governor.get_state()}")
+    
+    # Rally sets a new high-water mark, then a selloff eats the risk budget
+    for i, px in enumerate([4520.0, 4540.0, 4520.0, 4490.0, 4472.0, 4468.0, 4466.0]):
+        await on_tick({'timestamp': f"2025-08-01T09:31:{i:02d}", 'price': px, 'size': 1})
+        print(f"   {px:.2f}: level={governor.level.value:<9} budget=${governor.risk_budget:,.2f} "
+              f"position={governor.position_qty}")
+              
+    # Check cost
+    start = time.perf_counter()
+    for _ in range(100000):
+        governor.check_order('buy', 1)
+    per_check_us = (time.perf_counter() - start) / 100000 * 1e6
+    print(f"\n⏱️  check_order: {per_check_us:.2f}µs per call")
+    
+    account = await oms.get_account_info()
+    print(f"\n💰 Account Info:")
+    for key, value in account.items():
+        print(f"   {key}: {value}")
+
+if __name__ == "__main__":
+    asyncio.run(test_governor())
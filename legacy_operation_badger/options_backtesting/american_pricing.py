@@ -0,0 +1,357 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Sprint 16: American Option Pricing Engine
+Early-exercise pricing for SPY equity options across whole chains
+
+SPY options are American, so Black-Scholes understates ITM puts and calls
+ahead of dividends. This module prices American options for arrays of
+contracts at once with two models:
+
+Key Features:
+- Barone-Adesi-Whaley quadratic approximation (vectorized critical-price Newton solve)
+- Cox-Ross-Rubinstein binomial lattice vectorized across contracts
+- Continuous dividend yield support (cost of carry b = r - q)
+- Finite-difference Greeks from one stacked batch of bumped inputs, so every
+  bump shares the same lattice and inputs (no re-sampling noise)
+"""
+
+import numpy as np
+from datetime import datetime
+from typing import Dict, Optional
+import logging
+from scipy.special import erfc
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SQRT_2 = np.sqrt(2.0)
+INV_SQRT_2PI = 1.0 / np.sqrt(2.0 * np.pi)
+
+def _ncdf(x: np.ndarray) -> np.ndarray:
+    return 0.5 * erfc(-x / SQRT_2)
+
+def _npdf(x: np.ndarray) -> np.ndarray:
+    return INV_SQRT_2PI * np.exp(-0.5 * x * x)
+
+def _broadcast_inputs(S, K, T, r, q, sigma, is_call):
+    """Broadcast pricing inputs to a common 1-D shape"""
+    arrays = np.broadcast_arrays(
+        np.asarray(S, dtype=np.float64), np.asarray(K, dtype=np.float64),
+        np.asarray(T, dtype=np.float64), np.asarray(r, dtype=np.float64),
+        np.asarray(q, dtype=np.float64), np.asarray(sigma, dtype=np.float64),
+        np.asarray(is_call, dtype=bool)
+    )
+    shape = arrays[0].shape
+    return shape, [a.ravel() for a in arrays]
+
+def generalized_black_scholes(S, K, T, r, q, sigma, is_call) -> np.ndarray:
+    """
+    European price with continuous dividend yield (no validity masking)
+    
+    Args:
+        S, K, T, r, q, sigma: Spot, strike, years, rate, dividend yield, volatility
+        is_call: Boolean call mask
+        
+    Returns:
+        Array of European prices
+    """
+    sqrt_t = np.sqrt(T)
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma * sigma) * T) / (sigma * sqrt_t)
+    d2 = d1 - sigma * sqrt_t
+    sign = np.where(is_call, 1.0, -1.0)
+    return sign * (S * np.exp(-q * T) * _ncdf(sign * d1) - K * np.exp(-r * T) * _ncdf(sign * d2))
+
+def baw_price(S, K, T, r, sigma, is_call, q=0.0, tolerance: float = 1e-6,
+              max_iterations: int = 50) -> np.ndarray:
+    """
+    Barone-Adesi-Whaley American option prices
+    
+    The critical exercise price of every contract is found with a vectorized
+    Newton iteration seeded by Haug's approximation; only unconverged
+    contracts are iterated.
+    
+    Args:
+        S: Underlying price(s)
+        K: Strike prices
+        T: Times to expiration (years)
+        r: Risk-free rate(s)
+        sigma: Volatilities
+        is_call: Boolean call mask
+        q: Continuous dividend yield(s)
+        tolerance: Relative tolerance on the critical price equation
+        max_iterations: Newton iteration cap
+        
+    Returns:
+        Array of American prices (intrinsic value where T <= 0)
+    """
+    shape, (S, K, T, r, q, sigma, is_call) = _broadcast_inputs(S, K, T, r, q, sigma, is_call)
+    intrinsic = np.where(is_call, np.maximum(S - K, 0.0), np.maximum(K - S, 0.0))
+    result = intrinsic.copy()
+    
+    valid = (T > 0) & (sigma > 0) & (S > 0) & (K > 0)
+    b = r - q
+    # No early-exercise premium: calls without dividends, puts with r <= 0
+    european_only = np.where(is_call, b >= r, r <= 0)
+    
+    idx = np.flatnonzero(valid)
+    if idx.size == 0:
+        return result.reshape(shape)
+        
+    s, k, t, rr, bb, sig, calls = S[idx], K[idx], T[idx], r[idx], b[idx], sigma[idx], is_call[idx]
+    qq = q[idx]
+    european = generalized_black_scholes(s, k, t, rr, qq, sig, calls)
+    american = european.copy()
+    
+    early = np.flatnonzero(~european_only[idx])
+    if early.size:
+        s, k, t, rr, bb, sig, calls, qq, eu = (
+            s[early], k[early], t[early], rr[early], bb[early], sig[early], calls[early], qq[early],
+            european[early]
+        )
+        sqrt_t = np.sqrt(t)
+        sig_sqrt_t = sig * sqrt_t
+        carry = np.exp((bb - rr) * t)
+        m = 2 * rr / (sig * sig)
+        n = 2 * bb / (sig * sig)
+        kk = 1 - np.exp(-rr * t)
+        sign = np.where(calls, 1.0, -1.0)
+        
+        # Quadratic roots: q2 (calls, positive root) and q1 (puts, negative root)
+        root = sign * np.sqrt((n - 1) ** 2 + 4 * m / kk)
+        qexp = 0.5 * (-(n - 1) + root)
+        
+        # Haug seed for the critical price
+        root_inf = sign * np.sqrt((n - 1) ** 2 + 4 * m)
+        q_inf = 0.5 * (-(n - 1) + root_inf)
+        s_inf = k / (1 - 1 / q_inf)
+        h = np.where(calls, -(bb * t + 2 * sig_sqrt_t) * k / (s_inf - k),
+                     (bb * t - 2 * sig_sqrt_t) * k / (k - s_inf))
+        s_crit = np.where(calls, k + (s_inf - k) * (1 - np.exp(h)), s_inf + (k - s_inf) * np.exp(h))
+        
+        active = np.arange(early.size)
+        for _ in range(max_iterations):
+            a = active
+            si = s_crit[a]
+            d1 = (np.log(si / k[a]) + (bb[a] + 0.5 * sig[a] ** 2) * t[a]) / sig_sqrt_t[a]
+            nd1 = _ncdf(sign[a] * d1)
+            value = generalized_black_scholes(si, k[a], t[a], rr[a], qq[a], sig[a], calls[a])
+            
+            # Call: S - K = c + (1 - e^{(b-r)T} N(d1)) S / q2
+            # Put:  K - S = p - (1 - e^{(b-r)T} N(-d1)) S / q1
+            lhs = sign[a] * (si - k[a])
+            rhs = value + sign[a] * (1 - carry[a] * nd1) * si / qexp[a]
+            slope = sign[a] * (carry[a] * nd1 * (1 - 1 / qexp[a])
+                               + (1 - sign[a] * carry[a] * _npdf(d1) / sig_sqrt_t[a]) / qexp[a])
+                               
+            converged = np.abs(lhs - rhs) / k[a] < tolerance
+            updated = np.where(calls[a], (k[a] + rhs - slope * si) / (1 - slope),
+                               (k[a] - rhs + slope * si) / (1 + slope))
+            s_crit[a] = np.where(converged | ~np.isfinite(updated) | (updated <= 0), si, updated)
+            
+            active = a[~converged]
+            if active.size == 0:
+                break
+                
+        d1 = (np.log(s_crit / k) + (bb + 0.5 * sig * sig) * t) / sig_sqrt_t
+        coefficient = sign * (s_crit / qexp) * (1 - carry * _ncdf(sign * d1))
+        exercise_now = np.where(calls, s >= s_crit, s <= s_crit)
+        premium_price = eu + coefficient * (s / s_crit) ** qexp
+        american[early] = np.where(exercise_now, sign * (s - k), premium_price)
+        
+    result[idx] = np.maximum(american, intrinsic[idx])
+    return result.reshape(shape)
+
+def crr_price(S, K, T, r, sigma, is_call, q=0.0, steps: int = 200) -> np.ndarray:
+    """
+    Cox-Ross-Rubinstein binomial American prices, vectorized across contracts
+    
+    Every contract gets its own (steps + 1)-node lattice; backward induction
+    runs once over all contracts as (contracts, nodes) arrays.
+    
+    Args:
+        S: Underlying price(s)
+        K: Strike prices
+        T: Times to expiration (years)
+        r: Risk-free rate(s)
+        sigma: Volatilities
+        is_call: Boolean call mask
+        q: Continuous dividend yield(s)
+        steps: Lattice time steps
+        
+    Returns:
+        Array of American prices (intrinsic value where T <= 0)
+    """
+    shape, (S, K, T, r, q, sigma, is_call) = _broadcast_inputs(S, K, T, r, q, sigma, is_call)
+    intrinsic = np.where(is_call, np.maximum(S - K, 0.0), np.maximum(K - S, 0.0))
+    result = intrinsic.copy()
+    
+    idx = np.flatnonzero((T > 0) & (sigma > 0) & (S > 0) & (K > 0))
+    if idx.size == 0:
+        return result.reshape(shape)
+        
+    # Node-major layout (nodes, contracts): each backward step works on
+    # contiguous leading rows, updated in place
+    s, k, sign = S[idx], K[idx], np.where(is_call[idx], 1.0, -1.0)
+    dt = T[idx] / steps
+    u = np.exp(sigma[idx] * np.sqrt(dt))
+    d = 1.0 / u
+    p = np.clip((np.exp((r[idx] - q[idx]) * dt) - d) / (u - d), 0.0, 1.0)
+    disc = np.exp(-r[idx] * dt)
+    disc_up, disc_down = disc * p, disc * (1 - p)
+    
+    # Terminal nodes S * u^(steps - 2j); earlier levels follow S_i[j] = S_{i+1}[j+1] * u
+    nodes = s * u ** (steps - 2.0 * np.arange(steps + 1)[:, None])
+    values = np.maximum(sign * (nodes - k), 0.0)
+    continuation = np.empty_like(values)
+    exercise = np.empty_like(values)
+    
+    for width in range(steps, 0, -1):
+        cont, exer = continuation[:width], exercise[:width]
+        np.multiply(values[1:width + 1], disc_down, out=cont)
+        np.multiply(values[:width], disc_up, out=exer)
+        cont += exer
+        np.multiply(nodes[1:width + 1], u, out=nodes[:width])
+        np.subtract(nodes[:width], k, out=exer)
+        exer *= sign
+        np.maximum(cont, exer, out=values[:width])
+        
+    result[idx] = values[0]
+    return result.reshape(shape)
+
+class AmericanOptionPricer:
+    """
+    American option prices and finite-difference Greeks for option chains
+    """
+    
+    MODELS = ('baw', 'binomial')
+    
+    def __init__(self, model: str = 'baw', steps: int = 200, dividend_yield: float = 0.0,
+                 spot_bump: float = 0.01, vol_bump: float = 0.01, rate_bump: float = 0.01):
+        """
+        Initialize pricer
+        
+        Args:
+            model: 'baw' (fast approximation) or 'binomial' (CRR lattice)
+            steps: Lattice steps for the binomial model
+            dividend_yield: Default continuous dividend yield
+            spot_bump: Relative spot bump for delta/gamma
+            vol_bump: Absolute volatility bump (0.01 = 1 vol point)
+            rate_bump: Absolute rate bump (0.01 = 1%)
+        """
+        if model not in self.MODELS:
+            raise ValueError(f"Unknown American pricing model '{model}' (choose from {self.MODELS})")
+            
+        self.model = model
+        self.steps = steps
+        self.dividend_yield = dividend_yield
+        self.spot_bump = spot_bump
+        self.vol_bump = vol_bump
+        self.rate_bump = rate_bump
+        
+    def price(self, S, K, T, r, sigma, is_call, q: Optional[float] = None) -> np.ndarray:
+        """American prices with the configured model"""
+        q = self.dividend_yield if q is None else q
+        if self.model == 'binomial':
+            return crr_price(S, K, T, r, sigma, is_call, q=q, steps=self.steps)
+        return baw_price(S, K, T, r, sigma, is_call, q=q)
+        
+    def calculate_greeks(self, S, K, T, r, sigma, is_call, q: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """
+        Price and finite-difference Greeks for a chain
+        
+        The base case and all bumps (spot +/-, vol +/-, one day forward,
+        rate +/-) are stacked into one batch and priced in a single call,
+        so every scenario uses the same model inputs and lattice. Units
+        match BlackScholesCalculator.calculate_greeks: theta per day,
+        vega and rho per 1% move.
+        
+        Returns:
+            Dict of arrays: price, delta, gamma, theta, vega, rho
+        """
+        q = self.dividend_yield if q is None else q
+        S, K, T, r, q, sigma, is_call = np.broadcast_arrays(
+            np.asarray(S, dtype=np.float64), np.asarray(K, dtype=np.float64),
+            np.asarray(T, dtype=np.float64), np.asarray(r, dtype=np.float64),
+            np.asarray(q, dtype=np.float64), np.asarray(sigma, dtype=np.float64),
+            np.asarray(is_call, dtype=bool)
+        )
+        
+        h = S * self.spot_bump
+        one_day = 1.0 / 365.0
+        dv, dr = self.vol_bump, self.rate_bump
+        
+        # Rows: base, S+h, S-h, vol+, vol-, T-1d, r+, r-
+        stacked = self.price(
+            np.stack([S, S + h, S - h, S, S, S, S, S]),
+            K,
+            np.stack([T, T, T, T, T, np.maximum(T - one_day, 0.0), T, T]),
+            np.stack([r, r, r, r, r, r, r + dr, r - dr]),
+            np.stack([sigma, sigma, sigma, sigma + dv, np.maximum(sigma - dv, 1e-4), sigma, sigma, sigma]),
+            is_call,
+            q=q
+        )
+        base, up, down, vol_up, vol_down, next_day, rate_up, rate_down = stacked
+        
+        live = T > 0
+        return {
+            'price': base,
+            'delta': np.where(live, (up - down) / (2 * h), 0.0),
+            'gamma': np.where(live, (up - 2 * base + down) / (h * h), 0.0),
+            'theta': np.where(live, next_day - base, 0.0),
+            'vega': np.where(live, (vol_up - vol_down) / 2, 0.0),
+            'rho': np.where(live, (rate_up - rate_down) / 2, 0.0)
+        }
+
+
+def main():
+    """
+    Test the American pricing engine
+    """
+    print("=" * 80)
+    print("SPRINT 16: AMERICAN OPTION PRICING ENGINE TEST")
+    print("=" * 80)
+    
+    spot, r = 636.0, 0.05
+    strikes = np.array([560.0, 600.0, 636.0, 680.0, 720.0])
+    is_call = np.zeros(len(strikes), dtype=bool)
+    T = 0.5
+    sigma = 0.20
+    
+    european = generalized_black_scholes(spot, strikes, T, r, 0.0, sigma, is_call)
+    baw = baw_price(spot, strikes, T, r, sigma, is_call)
+    lattice = crr_price(spot, strikes, T, r, sigma, is_call, steps=1000)
+    
+    print("SPY puts, 6 months, 20% vol (European / BAW / CRR-1000):")
+    for k, e, a, l in zip(strikes, european, baw, lattice):
+        print(f"  K={k:6.1f}: {e:8.4f} / {a:8.4f} / {l:8.4f}  early-exercise premium {l - e:.4f}")
+        
+    # Full chain timing
+    rng = np.random.default_rng(16)
+    n = 10000
+    chain_strikes = np.round(rng.uniform(500, 770, n))
+    chain_t = rng.integers(1, 365, n) / 365.0
+    chain_sigma = rng.uniform(0.1, 0.5, n)
+    chain_calls = rng.random(n) < 0.5
+    
+    # The lattice costs O(steps^2) per contract: use it on the traded subset
+    for model, count in (('baw', n), ('binomial', 1000)):
+        pricer = AmericanOptionPricer(model=model, steps=200, dividend_yield=0.013)
+        start = datetime.now()
+        greeks = pricer.calculate_greeks(spot, chain_strikes[:count], chain_t[:count], r,
+                                         chain_sigma[:count], chain_calls[:count])
+        elapsed_ms = (datetime.now() - start).total_seconds() * 1000
+        print(f"\n{model}: price + Greeks for {count:,} contracts in {elapsed_ms:.0f}ms")
+        print(f"  Sample: " + ", ".join(f"{g}={greeks[g][0]:.4f}" for g in greeks))
+        
+    baw_chain = baw_price(spot, chain_strikes, chain_t, r, chain_sigma, chain_calls, q=0.013)
+    crr_chain = crr_price(spot, chain_strikes, chain_t, r, chain_sigma, chain_calls, q=0.013, steps=200)
+    print(f"\nBAW vs CRR-200 over {n:,} contracts: median abs difference "
+          f"{np.median(np.abs(baw_chain - crr_chain)):.4f}, max {np.abs(baw_chain - crr_chain).max():.4f}")
+          
+    print("\nAmerican Pricing Engine test completed [SUCCESS]")
+
+
+if __name__ == "__main__":
+    main()
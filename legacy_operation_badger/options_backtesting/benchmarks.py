@@ -0,0 +1,373 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Sprint 16: Greeks Engine Benchmarks
+Repeatable performance measurements with baseline regression checks
+
+Times the pricing hot paths on synthetic SPY chains so optimizations can be
+measured and regressions caught. Results are written as JSON together with
+machine metadata; a stored baseline JSON can be compared against, failing
+(exit code 1) when any benchmark slows down beyond a tolerance.
+
+Key Features:
+- Synthetic SPY chains (SVI smiles across 20 expiries) of any size
+- BS price/Greeks scalar vs vectorized, IV solve, surface build/query,
+  portfolio Greeks and scenario-grid revaluation
+- Warm-up run plus repeated timings (min / median)
+- JSON output with Python, library, CPU and kernel-backend metadata
+- Baseline comparison with relative tolerance
+
+Usage:
+    python benchmarks.py --sizes 1000 10000 --output results.json
+    python benchmarks.py --save-baseline baseline.json
+    python benchmarks.py --baseline baseline.json --tolerance 0.25
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+import numpy as np
+import pandas as pd
+import scipy
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+
+# Add parent directory for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from options_backtesting.core_engine import OptionContract, OptionType
+from options_backtesting.greeks_engine import (
+    GreeksEngine, BlackScholesCalculator, VolatilitySurface, svi_total_variance
+)
+from options_backtesting.implied_volatility import ImpliedVolatilitySolver
+from options_backtesting.risk_engine import BatchRiskEngine, ScenarioGrid
+from options_backtesting.compiled_kernels import kernel_backend
+
+# Configure logging
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+SCALAR_SAMPLE = 2000  # Scalar paths are timed on a sample and scaled per contract
+
+class SyntheticChain:
+    """
+    Synthetic SPY option chain with an SVI skew per expiry
+    """
+    
+    EXPIRIES = (2, 7, 14, 21, 30, 45, 60, 75, 90, 120, 150, 180, 210, 240, 270, 300, 365, 450, 545, 730)
+    
+    def __init__(self, n_contracts: int, spot: float = 636.0, risk_free_rate: float = 0.05, seed: int = 16):
+        """
+        Generate a chain
+        
+        Args:
+            n_contracts: Number of contracts
+            spot: Underlying price
+            risk_free_rate: Rate used to price the quotes
+            seed: Random seed (same seed, same chain)
+        """
+        rng = np.random.default_rng(seed)
+        self.spot = spot
+        self.risk_free_rate = risk_free_rate
+        
+        dte = rng.choice(self.EXPIRIES, n_contracts)
+        tte = dte / 365.0
+        # Wider strike range for longer expiries
+        width = 0.08 + 0.35 * np.sqrt(tte)
+        strikes = np.round(spot * np.exp(rng.uniform(-width, width * 0.6)))
+        log_moneyness = np.log(strikes / spot)
+        
+        # SVI parameters (a, b, rho, m, s) with total variance increasing in expiry
+        params = np.stack([0.02 * tte, 0.1 * np.sqrt(tte), np.full_like(tte, -0.6),
+                           np.full_like(tte, 0.01), np.full_like(tte, 0.1)], axis=-1)
+        total_variance = svi_total_variance(params, log_moneyness)
+        
+        self.strikes = strikes
+        self.dte = dte
+        self.tte = tte
+        self.is_call = strikes >= spot
+        self.ivs = np.sqrt(total_variance / tte)
+        self.prices = BlackScholesCalculator.calculate_option_prices(
+            spot, strikes, tte, risk_free_rate, self.ivs, self.is_call
+        )
+        self.quantities = rng.choice([-2, -1, 1, 2], n_contracts).astype(np.float64)
+        self._contracts: Optional[List[OptionContract]] = None
+        
+    def __len__(self) -> int:
+        return len(self.strikes)
+        
+    @property
+    def contracts(self) -> List[OptionContract]:
+        """OptionContract objects (built on first use)"""
+        if self._contracts is None:
+            self._contracts = []
+            for strike, dte, is_call, iv, price in zip(self.strikes.tolist(), self.dte.tolist(),
+                                                       self.is_call.tolist(), self.ivs.tolist(),
+                                                       self.prices.tolist()):
+                option_type = OptionType.CALL if is_call else OptionType.PUT
+                self._contracts.append(OptionContract(
+                    symbol=f"SPY{dte}{option_type.value}{strike:.0f}", underlying='SPY', strike=strike,
+                    expiration='', option_type=option_type, bid=price * 0.99, ask=price * 1.01,
+                    last=price, volume=100, open_interest=1000, delta=0.0, gamma=0.0, theta=0.0,
+                    vega=0.0, implied_volatility=iv, mid_price=price, days_to_expiration=dte,
+                    underlying_price=self.spot, moneyness=strike / self.spot
+                ))
+        return self._contracts
+        
+    def positions(self) -> List[Dict[str, Any]]:
+        """Position dicts (contract, quantity) for portfolio benchmarks"""
+        return [{'contract': c, 'quantity': q} for c, q in zip(self.contracts, self.quantities.tolist())]
+
+class GreeksBenchmarkSuite:
+    """
+    Runs the benchmark cases and compares against a baseline
+    """
+    
+    def __init__(self, sizes: tuple = DEFAULT_SIZES, repeat: int = 5, only: Optional[List[str]] = None):
+        """
+        Initialize suite
+        
+        Args:
+            sizes: Chain sizes (contracts)
+            repeat: Timed repetitions per case (after one warm-up)
+            only: Restrict to these case names
+        """
+        self.sizes = tuple(sizes)
+        self.repeat = repeat
+        self.cases: Dict[str, Callable[[SyntheticChain], Tuple[Callable[[], Any], int]]] = {
+            'bs_scalar': self._bs_scalar,
+            'bs_vectorized': self._bs_vectorized,
+            'iv_solve': self._iv_solve,
+            'surface_build': self._surface_build,
+            'surface_query': self._surface_query,
+            'portfolio_greeks': self._portfolio_greeks,
+            'scenario_grid': self._scenario_grid
+        }
+        if only:
+            unknown = set(only) - set(self.cases)
+            if unknown:
+                raise ValueError(f"Unknown benchmarks {sorted(unknown)} (choose from {list(self.cases)})")
+            self.cases = {name: case for name, case in self.cases.items() if name in only}
+            
+    # Each case takes a chain and returns (callable to time, contracts evaluated per call)
+    
+    @staticmethod
+    def _bs_scalar(chain: SyntheticChain):
+        calculator = BlackScholesCalculator()
+        n = min(len(chain), SCALAR_SAMPLE)
+        types = [OptionType.CALL if c else OptionType.PUT for c in chain.is_call[:n].tolist()]
+        inputs = list(zip(chain.strikes[:n].tolist(), chain.tte[:n].tolist(), chain.ivs[:n].tolist(), types))
+        
+        def run():
+            for strike, tte, iv, option_type in inputs:
+                calculator.calculate_greeks(chain.spot, strike, tte, chain.risk_free_rate, iv, option_type)
+        return run, n
+        
+    @staticmethod
+    def _bs_vectorized(chain: SyntheticChain):
+        def run():
+            BlackScholesCalculator.calculate_greeks_vectorized(
+                chain.spot, chain.strikes, chain.tte, chain.risk_free_rate, chain.ivs, chain.is_call
+            )
+        return run, len(chain)
+        
+    @staticmethod
+    def _iv_solve(chain: SyntheticChain):
+        solver = ImpliedVolatilitySolver()
+        
+        def run():
+            solver.solve(chain.prices, chain.spot, chain.strikes, chain.tte, chain.risk_free_rate, chain.is_call)
+        return run, len(chain)
+        
+    @staticmethod
+    def _surface_build(chain: SyntheticChain):
+        contracts = chain.contracts
+        
+        def run():
+            VolatilitySurface().build_surface(contracts)
+        return run, len(chain)
+        
+    @staticmethod
+    def _surface_query(chain: SyntheticChain):
+        surface = VolatilitySurface()
+        surface.build_surface(chain.contracts)
+        
+        def run():
+            surface.get_implied_volatilities(chain.strikes, chain.tte, chain.spot)
+        return run, len(chain)
+        
+    @staticmethod
+    def _portfolio_greeks(chain: SyntheticChain):
+        engine = GreeksEngine(risk_free_rate=chain.risk_free_rate)
+        engine.volatility_surface.build_surface(chain.contracts)
+        positions = chain.positions()
+        
+        def run():
+            engine.calculate_portfolio_greeks(positions, chain.spot)
+        return run, len(chain)
+        
+    @staticmethod
+    def _scenario_grid(chain: SyntheticChain):
+        engine = BatchRiskEngine(GreeksEngine(risk_free_rate=chain.risk_free_rate))
+        engine.greeks_engine.volatility_surface.build_surface(chain.contracts)
+        positions = chain.positions()
+        grid = ScenarioGrid.build(spot_steps=21, vol_steps=5, days_forward=(0,))
+        
+        def run():
+            engine.run(positions, chain.spot, grid)
+        return run, len(chain)
+        
+    def run(self) -> Dict[str, Any]:
+        """
+        Run every case at every size
+        
+        Returns:
+            Results dict: {'metadata': {...}, 'results': {'case[size]': {...}}}
+        """
+        results = {}
+        for size in self.sizes:
+            chain = SyntheticChain(size)
+            for name, case in self.cases.items():
+                fn, evaluated = case(chain)
+                fn()  # Warm-up (caches, lazy imports, JIT)
+                
+                timings = []
+                for _ in range(self.repeat):
+                    start = time.perf_counter()
+                    fn()
+                    timings.append(time.perf_counter() - start)
+                    
+                median = float(np.median(timings))
+                key = f"{name}[{size}]"
+                results[key] = {
+                    'benchmark': name,
+                    'size': size,
+                    'contracts_evaluated': evaluated,
+                    'repeat': self.repeat,
+                    'min_ms': min(timings) * 1000,
+                    'median_ms': median * 1000,
+                    'us_per_contract': median * 1e6 / evaluated,
+                    'contracts_per_second': evaluated / median if median > 0 else None
+                }
+                logger.info(f"{key}: {median * 1000:.2f}ms")
+                
+        return {'metadata': self.machine_metadata(), 'results': results}
+        
+    @staticmethod
+    def machine_metadata() -> Dict[str, Any]:
+        """Environment the numbers were measured on"""
+        try:
+            commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                    cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            commit = None
+            
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'git_commit': commit or None,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'numpy': np.__version__,
+            'scipy': scipy.__version__,
+            'pandas': pd.__version__,
+            'kernel_backend': kernel_backend()
+        }
+        
+    @staticmethod
+    def compare(current: Dict[str, Any], baseline: Dict[str, Any],
+                tolerance: float = 0.25) -> List[Dict[str, Any]]:
+        """
+        Benchmarks whose per-contract median time regressed beyond tolerance
+        
+        Args:
+            current: Results from run()
+            baseline: Stored results from an earlier run()
+            tolerance: Allowed relative slowdown (0.25 = 25%)
+            
+        Returns:
+            List of regressions (empty if none); cases missing from the
+            baseline are ignored
+        """
+        regressions = []
+        for key, result in current['results'].items():
+            reference = baseline.get('results', {}).get(key)
+            if reference is None:
+                continue
+            ratio = result['us_per_contract'] / reference['us_per_contract']
+            result['baseline_ratio'] = ratio
+            if ratio > 1.0 + tolerance:
+                regressions.append({'benchmark': key, 'ratio': ratio,
+                                    'baseline_us_per_contract': reference['us_per_contract'],
+                                    'current_us_per_contract': result['us_per_contract']})
+        return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the Greeks engine benchmarks
+    """
+    parser = argparse.ArgumentParser(description='Sprint 16 Greeks Engine Benchmarks')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help='Chain sizes in contracts')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed repetitions per benchmark')
+    parser.add_argument('--only', nargs='+', help='Run only these benchmarks')
+    parser.add_argument('--output', default='greeks_benchmark_results.json', help='Results JSON path')
+    parser.add_argument('--baseline', help='Baseline JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed relative slowdown vs baseline (0.25 = 25%%)')
+    parser.add_argument('--save-baseline', metavar='PATH', help='Also write the results as a baseline')
+    args = parser.parse_args(argv)
+    
+    print("=" * 80)
+    print("SPRINT 16: GREEKS ENGINE BENCHMARKS")
+    print("=" * 80)
+    
+    # Keep engine INFO logging out of the timed sections
+    logging.getLogger('options_backtesting').setLevel(logging.WARNING)
+    
+    suite = GreeksBenchmarkSuite(sizes=args.sizes, repeat=args.repeat, only=args.only)
+    report = suite.run()
+    
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = suite.compare(report, baseline, args.tolerance)
+        report['baseline'] = {'path': args.baseline, 'metadata': baseline.get('metadata'),
+                              'tolerance': args.tolerance, 'regressions': regressions}
+                              
+    print(f"{'Benchmark':<28} {'median ms':>11} {'us/contract':>12} {'contracts/s':>14} {'vs base':>8}")
+    for key, result in report['results'].items():
+        ratio = result.get('baseline_ratio')
+        print(f"{key:<28} {result['median_ms']:>11.2f} {result['us_per_contract']:>12.3f} "
+              f"{result['contracts_per_second']:>14,.0f} {f'{ratio:.2f}x' if ratio else '-':>8}")
+              
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+    
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump({'metadata': report['metadata'], 'results': report['results']}, f, indent=2)
+        print(f"Baseline written to {args.save_baseline}")
+        
+    if regressions:
+        print(f"\n[FAILED] {len(regressions)} benchmark(s) regressed beyond {args.tolerance:.0%}:")
+        for regression in regressions:
+            print(f"  {regression['benchmark']}: {regression['ratio']:.2f}x slower")
+        return 1
+        
+    print("\nGreeks Engine Benchmarks completed [SUCCESS]")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
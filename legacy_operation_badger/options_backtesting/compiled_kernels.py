@@ -0,0 +1,339 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Sprint 16: Compiled Pricing Kernels
+Numba backend for the chain-wide Black-Scholes and implied volatility hot paths
+
+The NumPy kernels in greeks_engine and implied_volatility allocate a
+temporary array for every intermediate (d1, d2, N(d1), discount factors...).
+These kernels make one fused pass per contract instead, parallelized across
+cores with prange, and are cached to disk so the JIT cost is paid once per
+machine rather than at every start-up.
+
+Key Features:
+- Optional: numba is used when installed; NumPy remains the reference backend
+- Runtime selection via OPTIONS_KERNEL_BACKEND=auto|numba|numpy or set_backend()
+- Fused price + Greeks kernel (same units as calculate_greeks_vectorized)
+- Per-contract Halley/bisection IV kernel (same bounds and seed as the NumPy solver)
+- cache=True compiled kernels reused across processes
+- First parallel launch on the main thread, so worker threads (chain
+  prefetch) can price without hanging the TBB layer at interpreter exit
+"""
+
+import os
+import math
+import threading
+import numpy as np
+from datetime import datetime
+from typing import Dict, Optional
+import logging
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('auto', 'numba', 'numpy')
+_backend: Optional[str] = None
+_main_thread_launched = False
+
+
+def _compile(fn):
+    """Compile with numba when available; otherwise keep the Python function"""
+    if NUMBA_AVAILABLE:
+        return njit(parallel=True, cache=True, nogil=True)(fn)
+    return fn
+
+
+def set_backend(name: str) -> str:
+    """
+    Select the kernel backend
+    
+    Args:
+        name: 'auto' (numba if installed), 'numba' or 'numpy'
+        
+    Returns:
+        The backend actually in use ('numba' or 'numpy')
+    """
+    global _backend
+    name = name.lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown kernel backend '{name}' (choose from {BACKENDS})")
+        
+    if name == 'numba' and not NUMBA_AVAILABLE:
+        logger.warning("numba requested but not installed - using NumPy kernels")
+    _backend = 'numba' if name in ('auto', 'numba') and NUMBA_AVAILABLE else 'numpy'
+    if _backend == 'numba':
+        _launch_on_main_thread()
+    return _backend
+
+
+def kernel_backend() -> str:
+    """Active backend, resolved from OPTIONS_KERNEL_BACKEND on first use"""
+    if _backend is None:
+        set_backend(os.environ.get('OPTIONS_KERNEL_BACKEND', 'auto'))
+    if _backend == 'numba' and not _main_thread_launched:
+        _launch_on_main_thread()
+        if not _main_thread_launched:
+            return 'numpy'
+    return _backend
+
+
+def _launch_on_main_thread():
+    """
+    Start numba's threading layer from the main thread
+    
+    If the first prange launch happens on a worker thread, the TBB layer
+    hangs the process at interpreter exit. Until a kernel has run on the
+    main thread, worker threads get the NumPy kernels; call kernel_backend()
+    on the main thread before handing pricing work to threads.
+    """
+    global _main_thread_launched
+    if _main_thread_launched or threading.current_thread() is not threading.main_thread():
+        return
+    _main_thread_launched = True
+    warmup()
+
+
+@_compile
+def _bs_kernel(S, K, T, r, q, sigma, is_call, out, with_greeks):
+    """
+    Fused Black-Scholes price and Greeks
+    
+    out rows: price, delta, gamma, theta, vega, rho
+    """
+    inv_sqrt2 = 1.0 / math.sqrt(2.0)
+    inv_sqrt2pi = 1.0 / math.sqrt(2.0 * math.pi)
+    
+    for i in prange(S.shape[0]):
+        s, k, t, sig = S[i], K[i], T[i], sigma[i]
+        if not (t > 0.0 and sig > 0.0 and s > 0.0 and k > 0.0):
+            for row in range(out.shape[0]):
+                out[row, i] = 0.0
+            continue
+            
+        sqrt_t = math.sqrt(t)
+        sig_sqrt_t = sig * sqrt_t
+        d1 = (math.log(s / k) + (r[i] - q[i] + 0.5 * sig * sig) * t) / sig_sqrt_t
+        d2 = d1 - sig_sqrt_t
+        sign = 1.0 if is_call[i] else -1.0
+        
+        cdf_d1 = 0.5 * math.erfc(-sign * d1 * inv_sqrt2)
+        cdf_d2 = 0.5 * math.erfc(-sign * d2 * inv_sqrt2)
+        k_disc = k * math.exp(-r[i] * t)
+        s_disc = s * math.exp(-q[i] * t)
+        
+        out[0, i] = max(sign * (s_disc * cdf_d1 - k_disc * cdf_d2), 0.0)
+        if not with_greeks:
+            continue
+            
+        s_pdf = s_disc * inv_sqrt2pi * math.exp(-0.5 * d1 * d1)
+        out[1, i] = sign * (s_disc / s) * cdf_d1
+        out[2, i] = s_pdf / (s * s * sig_sqrt_t)
+        out[3, i] = (-(s_pdf * sig) / (2.0 * sqrt_t) - sign * r[i] * k_disc * cdf_d2
+                     + sign * q[i] * s_disc * cdf_d1) / 365.0
+        out[4, i] = s_pdf * sqrt_t / 100.0
+        out[5, i] = sign * t * k_disc * cdf_d2 / 100.0
+
+
+@_compile
+def _iv_kernel(prices, S, K, T, r, q, is_call, tolerance, max_iterations,
+               min_volatility, max_volatility, out):
+    """Per-contract Halley iterations with bisection fallback"""
+    inv_sqrt2 = 1.0 / math.sqrt(2.0)
+    inv_sqrt2pi = 1.0 / math.sqrt(2.0 * math.pi)
+    
+    for i in prange(prices.shape[0]):
+        out[i] = np.nan
+        target, s, k, t = prices[i], S[i], K[i], T[i]
+        if not (t > 0.0 and s > 0.0 and k > 0.0 and math.isfinite(target)):
+            continue
+            
+        x = k * math.exp(-r[i] * t)
+        f = s * math.exp(-q[i] * t)  # Spot net of carry
+        call = is_call[i]
+        lower = max(f - x, 0.0) if call else max(x - f, 0.0)
+        upper = f if call else x
+        if not (target > lower and target < upper):
+            continue
+            
+        # Corrado-Miller seed on the call-equivalent price
+        call_price = target if call else target + f - x
+        half_gap = 0.5 * (f - x)
+        radicand = max((call_price - half_gap) ** 2 - (f - x) ** 2 / math.pi, 0.0)
+        sig = (math.sqrt(2.0 * math.pi / t) / (f + x)) * (call_price - half_gap + math.sqrt(radicand))
+        if not (math.isfinite(sig) and sig > 0.0):
+            sig = 0.2
+        sig = min(max(sig, min_volatility * 10.0), max_volatility * 0.9)
+        
+        lo, hi = min_volatility, max_volatility
+        sign = 1.0 if call else -1.0
+        sqrt_t = math.sqrt(t)
+        for _ in range(max_iterations):
+            sig_sqrt_t = sig * sqrt_t
+            d1 = (math.log(s / k) + (r[i] - q[i] + 0.5 * sig * sig) * t) / sig_sqrt_t
+            d2 = d1 - sig_sqrt_t
+            price = sign * (f * 0.5 * math.erfc(-sign * d1 * inv_sqrt2)
+                            - x * 0.5 * math.erfc(-sign * d2 * inv_sqrt2))
+            vega = f * inv_sqrt2pi * math.exp(-0.5 * d1 * d1) * sqrt_t
+            volga = vega * d1 * d2 / sig
+            diff = price - target
+            
+            if abs(diff) < tolerance:
+                out[i] = sig
+                break
+                
+            if diff > 0.0:
+                hi = min(hi, sig)
+            else:
+                lo = max(lo, sig)
+                
+            denominator = 2.0 * vega * vega - diff * volga
+            candidate = sig - 2.0 * diff * vega / denominator if denominator != 0.0 else np.nan
+            if math.isfinite(candidate) and candidate > lo and candidate < hi:
+                sig = candidate
+            else:
+                sig = 0.5 * (lo + hi)
+                
+        # Accept bracket-collapsed solutions for flat-vega contracts
+        if math.isnan(out[i]) and hi - lo < 1e-6:
+            out[i] = sig
+
+
+def _flat_inputs(*arrays):
+    """Broadcast and flatten to contiguous 1-D arrays (kernels index elementwise)"""
+    broadcast = np.broadcast_arrays(*arrays)
+    shape = broadcast[0].shape
+    return shape, [np.ascontiguousarray(a.ravel()) for a in broadcast]
+
+
+def bs_greeks_compiled(S, K, T, r, sigma, is_call, q=0.0, greeks: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Compiled counterpart of BlackScholesCalculator.calculate_greeks_vectorized
+    
+    Args and Returns are identical to the NumPy version.
+    """
+    shape, (S, K, T, r, q, sigma, is_call) = _flat_inputs(
+        np.asarray(S, dtype=np.float64), np.asarray(K, dtype=np.float64),
+        np.asarray(T, dtype=np.float64), np.asarray(r, dtype=np.float64),
+        np.asarray(q, dtype=np.float64), np.asarray(sigma, dtype=np.float64),
+        np.asarray(is_call, dtype=bool)
+    )
+    out = np.empty((6 if greeks else 1, S.shape[0]))
+    _bs_kernel(S, K, T, r, q, sigma, is_call, out, greeks)
+    
+    names = ('price', 'delta', 'gamma', 'theta', 'vega', 'rho') if greeks else ('price',)
+    return {name: out[row].reshape(shape) for row, name in enumerate(names)}
+
+
+def implied_volatility_compiled(prices, S, K, T, r, is_call, q=0.0, tolerance: float = 1e-8,
+                                max_iterations: int = 50, min_volatility: float = 1e-4,
+                                max_volatility: float = 5.0) -> np.ndarray:
+    """
+    Compiled counterpart of ImpliedVolatilitySolver.solve
+    
+    Returns:
+        Array of implied volatilities (NaN outside no-arbitrage bounds)
+    """
+    shape, (prices, S, K, T, r, q, is_call) = _flat_inputs(
+        np.asarray(prices, dtype=np.float64), np.asarray(S, dtype=np.float64),
+        np.asarray(K, dtype=np.float64), np.asarray(T, dtype=np.float64),
+        np.asarray(r, dtype=np.float64), np.asarray(q, dtype=np.float64),
+        np.asarray(is_call, dtype=bool)
+    )
+    out = np.empty(prices.shape[0])
+    _iv_kernel(prices, S, K, T, r, q, is_call, tolerance, max_iterations,
+               min_volatility, max_volatility, out)
+    return out.reshape(shape)
+
+
+def warmup():
+    """Compile (or load from the on-disk cache) every kernel on tiny inputs"""
+    if kernel_backend() != 'numba':
+        return
+    bs_greeks_compiled(636.0, np.array([630.0, 640.0]), 0.1, 0.05, 0.2, np.array([True, False]))
+    implied_volatility_compiled(np.array([15.0, 10.0]), 636.0, np.array([630.0, 640.0]), 0.1, 0.05,
+                                np.array([True, False]))
+
+
+def main():
+    """
+    Test the compiled kernels against the NumPy backend
+    """
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from options_backtesting.greeks_engine import BlackScholesCalculator
+    
+    print("=" * 80)
+    print("SPRINT 16: COMPILED PRICING KERNELS TEST")
+    print("=" * 80)
+    
+    print(f"numba installed: {NUMBA_AVAILABLE}, active backend: {kernel_backend()}")
+    if kernel_backend() != 'numba':
+        print("NumPy kernels in use (pip install numba for the compiled backend)")
+        print("\nCompiled Pricing Kernels test completed [SUCCESS]")
+        return
+        
+    start = datetime.now()
+    warmup()
+    print(f"Warm-up (compile or cache load): {(datetime.now() - start).total_seconds():.2f}s")
+    
+    rng = np.random.default_rng(16)
+    n = 1_000_000
+    spot = 636.0
+    strikes = np.round(rng.uniform(450, 820, n))
+    ttes = rng.integers(1, 730, n) / 365.0
+    vols = rng.uniform(0.05, 1.0, n)
+    is_call = rng.random(n) < 0.5
+    
+    timings = {}
+    for backend in ('numba', 'numpy'):
+        set_backend(backend)
+        start = datetime.now()
+        timings[backend] = BlackScholesCalculator.calculate_greeks_vectorized(spot, strikes, ttes, 0.05,
+                                                                              vols, is_call)
+        elapsed = (datetime.now() - start).total_seconds()
+        print(f"  {backend}: {n:,} prices + Greeks in {elapsed * 1000:.1f}ms ({n / elapsed / 1e6:.1f}M/s)")
+    set_backend('numba')
+    
+    reference = timings['numpy']
+    diff = max(np.abs(timings['numba'][name] - reference[name]).max() for name in reference)
+    print(f"  Max difference vs NumPy: {diff:.2e}")
+    
+    prices = reference['price']
+    start = datetime.now()
+    solved = implied_volatility_compiled(prices, spot, strikes, ttes, 0.05, is_call)
+    elapsed = (datetime.now() - start).total_seconds()
+    informative = reference['vega'] > 1e-4
+    print(f"  IV: {n:,} solves in {elapsed * 1000:.1f}ms, "
+          f"max error (vega > 1e-4) {np.nanmax(np.abs(solved - vols)[informative]):.2e}")
+
+    # A backtest pricing chains on the prefetch thread must still exit
+    import subprocess
+    script = (
+        "from datetime import datetime\n"
+        "from options_backtesting.core_engine import ChainPrefetcher\n"
+        "from options_backtesting.parallel_runner import SyntheticHistory\n"
+        "start, end = datetime(2024, 1, 2), datetime(2024, 1, 5)\n"
+        "days = ChainPrefetcher(SyntheticHistory(start, end), 'SPY', start, end, lookahead=0)\n"
+        "print(sum(1 for _ in days))\n"
+    )
+    start = datetime.now()
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, timeout=120,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            env={**os.environ, 'OPTIONS_KERNEL_BACKEND': 'numba'})
+    assert result.returncode == 0, result.stderr
+    print(f"  Prefetching run exited cleanly in {(datetime.now() - start).total_seconds():.1f}s "
+          f"({result.stdout.strip()} days)")
+
+    print("\nCompiled Pricing Kernels test completed [SUCCESS]")
+
+
+if __name__ == "__main__":
+    main()
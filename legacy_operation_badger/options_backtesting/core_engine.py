@@ -9,10 +9,13 @@ and volatility trading strategies. Built on research findings showing custom
 event-driven architecture outperforms traditional frameworks for options.
 
 Key Features:
-- Event-driven market data processing
+- Event-driven market data processing (timestamped priority queue)
+- Next-day chain prefetching on a background thread
 - Multi-layer separation (data/strategy/execution)
+- Expiry settlement and assignment of held-to-expiry positions
+- Strategy plugins and generic N-leg positions in one portfolio leg table
 - Greeks calculation integration
-- Performance analytics and risk management
+- Streaming performance analytics and risk management
 - Integration with existing Operation Badger infrastructure
 """
 
@@ -21,17 +24,24 @@ import sys
 import json
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple, Union, Any
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache
 from enum import Enum
-import threading
+import heapq
+import itertools
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from options_backtesting.compiled_kernels import kernel_backend
+from options_backtesting.fill_models import FillModel
+from options_backtesting.settlement import SettlementEngine
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -46,11 +56,14 @@ class PositionSide(Enum):
     LONG = 1
     SHORT = -1
 
-@dataclass
+@dataclass(slots=True)
 class OptionContract:
     """
     Standardized option contract representation
     Compatible with both Theta Data and yfinance formats
+    
+    Slotted to keep per-contract memory small; bulk chains live in
+    option_chain.OptionChain and contracts are created as views on demand.
     """
     symbol: str
     underlying: str
@@ -83,6 +96,24 @@ class OptionContract:
         if self.mid_price == 0:
             self.mid_price = (self.bid + self.ask) / 2 if (self.bid > 0 and self.ask > 0) else self.last
 
+@lru_cache(maxsize=4096)
+def expiry_day_number(expiration: str) -> int:
+    """Days since 1970-01-01 of an expiration label ('YYYY-MM-DD...'), -1 if unparseable"""
+    try:
+        return (datetime.strptime(expiration[:10], '%Y-%m-%d') - datetime(1970, 1, 1)).days
+    except (TypeError, ValueError):
+        return -1
+
+def contract_key(expiration: str, is_call: bool, strike: float) -> int:
+    """
+    int64 identity of a listed contract: expiry day, type bit and strike in
+    thousandths packed as (day << 33) | (call << 32) | strike
+    
+    Stable across daily chains, so a key computed once when a position is
+    opened finds the same contract in every later snapshot.
+    """
+    return (expiry_day_number(expiration) << 33) | (int(is_call) << 32) | int(round(strike * 1000))
+
 @dataclass
 class OptionPosition:
     """
@@ -94,7 +125,13 @@ class OptionPosition:
     entry_date: datetime
     exit_price: Optional[float] = None
     exit_date: Optional[datetime] = None
+    contract_key: int = field(init=False, default=0)
     
+    def __post_init__(self):
+        """Key used to locate the contract in later chains"""
+        self.contract_key = contract_key(self.contract.expiration, self.contract.option_type == OptionType.CALL,
+                                         self.contract.strike)
+                                         
     @property
     def is_open(self) -> bool:
         """Check if position is still open"""
@@ -136,6 +173,11 @@ class IronCondorPosition:
     breakeven_upper: float
     breakeven_lower: float
     
+    # Commissions paid on the opening and closing orders
+    entry_fees: float = 0.0
+    exit_fees: float = 0.0
+    position_id: int = -1  # Assigned by the engine
+    
     @property
     def is_open(self) -> bool:
         """Check if Iron Condor is still open"""
@@ -175,24 +217,72 @@ class IronCondorPosition:
     
     @property
     def total_pnl(self) -> float:
-        """Total P&L of the Iron Condor"""
-        return sum([pos.pnl for pos in [self.short_call, self.long_call, self.short_put, self.long_put]])
+        """Total P&L of the Iron Condor, net of fees"""
+        legs_pnl = sum([pos.pnl for pos in [self.short_call, self.long_call, self.short_put, self.long_put]])
+        return legs_pnl - self.entry_fees - self.exit_fees
     
     @property
     def net_premium_collected(self) -> float:
         """Net premium collected when opening the Iron Condor"""
         return (self.short_call.entry_price + self.short_put.entry_price - 
                 self.long_call.entry_price - self.long_put.entry_price) * 100
+                
+    @property
+    def legs(self) -> List[OptionPosition]:
+        """Legs in engine order: short call, long call, short put, long put"""
+        return [self.short_call, self.long_call, self.short_put, self.long_put]
+        
+    @property
+    def strategy_name(self) -> str:
+        return 'iron_condor'
+
+@dataclass
+class MultiLegPosition:
+    """
+    Generic N-leg option position (verticals, strangles, calendars, ...)
+    opened by a strategy plugin
+    """
+    strategy_name: str
+    legs: List[OptionPosition]
+    entry_date: datetime
+    expiration: str  # Nearest leg expiration
+    max_profit: float
+    max_loss: float
+    
+    # Commissions paid on the opening and closing orders
+    entry_fees: float = 0.0
+    exit_fees: float = 0.0
+    position_id: int = -1
+    
+    @property
+    def is_open(self) -> bool:
+        """Check if all legs are still open"""
+        return all(pos.is_open for pos in self.legs)
+        
+    @property
+    def days_to_expiration(self) -> int:
+        """Days to expiration of the nearest leg"""
+        return min(pos.contract.days_to_expiration for pos in self.legs)
+        
+    @property
+    def total_pnl(self) -> float:
+        """Total P&L of the position, net of fees"""
+        return sum(pos.pnl for pos in self.legs) - self.entry_fees - self.exit_fees
+        
+    @property
+    def net_premium_collected(self) -> float:
+        """Net premium collected (negative: debit paid) when opening"""
+        return -sum(pos.entry_price * pos.quantity for pos in self.legs) * 100
 
 class MarketDataEvent:
     """
     Market data event for event-driven processing
     """
-    def __init__(self, timestamp: datetime, symbol: str, data: Dict[str, Any]):
+    def __init__(self, timestamp: datetime, symbol: str, data: Dict[str, Any], options_chain: Any = None):
         self.timestamp = timestamp
         self.symbol = symbol
         self.data = data
-        self.options_chain: Optional[List[OptionContract]] = None
+        self.options_chain = options_chain  # OptionChain (or List[OptionContract])
 
 class StrategyEvent:
     """
@@ -220,128 +310,460 @@ class ExecutionEvent:
 class PerformanceTracker:
     """
     Performance analytics and metrics tracking
+    
+    Streaming: every daily record updates running statistics (Welford mean
+    and variance of daily returns, downside variance, peak and drawdown,
+    exposure), so get_performance_summary() is O(1) at any point of a run.
+    The equity, drawdown, exposure and Greeks series are kept in
+    preallocated numpy buffers that double when full.
     """
-    def __init__(self):
+    GREEK_NAMES = ('delta', 'gamma', 'theta', 'vega')
+    
+    def __init__(self, initial_capital: float = 100000.0, capacity: int = 512):
+        """
+        Initialize tracker
+        
+        Args:
+            initial_capital: Portfolio value before the first record
+            capacity: Initial number of days the buffers hold
+        """
+        self.initial_capital = initial_capital
         self.trades: List[Dict] = []
-        self.daily_pnl: List[Dict] = []
-        self.greeks_history: List[Dict] = []
+        
+        # Daily series
+        self.days = 0
+        self.dates = np.empty(capacity, dtype='datetime64[us]')
+        self.pnl = np.empty(capacity)
+        self.portfolio_values = np.empty(capacity)
+        self.returns = np.empty(capacity)
+        self.drawdowns = np.empty(capacity)
+        self.exposures = np.empty(capacity)
+        
+        # Greeks series
+        self.greeks_days = 0
+        self.greeks_dates = np.empty(capacity, dtype='datetime64[us]')
+        self.greeks = np.empty((capacity, len(self.GREEK_NAMES)))
+        
+        # Running statistics
+        self.peak_value = initial_capital
         self.max_drawdown = 0.0
-        self.peak_value = 0.0
+        self._return_mean = 0.0
+        self._return_m2 = 0.0
+        self._downside_sq = 0.0
+        self._exposure_sum = 0.0
+        self._days_exposed = 0
+        self._winning_trades = 0
+        self._trade_pnl_sum = 0.0
+        
+    @staticmethod
+    def _grown(buffer: np.ndarray) -> np.ndarray:
+        """Copy of a buffer with twice the rows"""
+        grown = np.empty((2 * len(buffer),) + buffer.shape[1:], dtype=buffer.dtype)
+        grown[:len(buffer)] = buffer
+        return grown
         
-    def record_trade(self, trade_data: Dict):
-        """Record a completed trade"""
+    def record_trade(self, trade_data: Dict, timestamp: Optional[datetime] = None):
+        """
+        Record a completed trade
+        
+        Args:
+            trade_data: Trade fields ('pnl', 'exit_date', ...)
+            timestamp: Simulation time of the trade (default its exit_date,
+                else the last recorded day)
+        """
+        if timestamp is None:
+            timestamp = trade_data.get('exit_date') or (self.last_date if self.days else None)
         self.trades.append({
-            'timestamp': datetime.now(),
+            'timestamp': timestamp,
             **trade_data
         })
+        pnl = trade_data.get('pnl', 0)
+        self._trade_pnl_sum += pnl
+        if pnl > 0:
+            self._winning_trades += 1
+            
+    def record_daily_pnl(self, date: datetime, pnl: float, portfolio_value: float, exposure: float = 0.0):
+        """
+        Record daily P&L
         
-    def record_daily_pnl(self, date: datetime, pnl: float, portfolio_value: float):
-        """Record daily P&L"""
-        self.daily_pnl.append({
-            'date': date,
-            'pnl': pnl,
-            'portfolio_value': portfolio_value,
-            'cumulative_return': (portfolio_value - 100000) / 100000  # Assuming $100k start
-        })
+        Args:
+            date: Day (or close timestamp)
+            pnl: Day-over-day P&L
+            portfolio_value: Portfolio value at the close
+            exposure: Capital at risk in open positions at the close
+        """
+        if self.days == len(self.dates):
+            self.dates, self.pnl, self.portfolio_values, self.returns, self.drawdowns, self.exposures = [
+                self._grown(b) for b in (self.dates, self.pnl, self.portfolio_values, self.returns,
+                                         self.drawdowns, self.exposures)
+            ]
+            
+        previous_value = portfolio_value - pnl
+        daily_return = pnl / previous_value if previous_value > 0 else 0.0
         
         # Update drawdown metrics
         if portfolio_value > self.peak_value:
             self.peak_value = portfolio_value
-        
-        current_drawdown = (self.peak_value - portfolio_value) / self.peak_value
+        current_drawdown = (self.peak_value - portfolio_value) / self.peak_value if self.peak_value > 0 else 0.0
         if current_drawdown > self.max_drawdown:
             self.max_drawdown = current_drawdown
             
+        i = self.days
+        self.dates[i] = date
+        self.pnl[i] = pnl
+        self.portfolio_values[i] = portfolio_value
+        self.returns[i] = daily_return
+        self.drawdowns[i] = current_drawdown
+        self.exposures[i] = exposure
+        self.days += 1
+        
+        # Welford update of the daily return mean and variance
+        delta = daily_return - self._return_mean
+        self._return_mean += delta / self.days
+        self._return_m2 += delta * (daily_return - self._return_mean)
+        if daily_return < 0:
+            self._downside_sq += daily_return * daily_return
+        self._exposure_sum += exposure
+        if exposure > 0:
+            self._days_exposed += 1
+            
     def record_greeks(self, date: datetime, greeks: Dict[str, float]):
         """Record portfolio Greeks"""
-        self.greeks_history.append({
-            'date': date,
-            **greeks
-        })
+        if self.greeks_days == len(self.greeks_dates):
+            self.greeks_dates = self._grown(self.greeks_dates)
+            self.greeks = self._grown(self.greeks)
+        self.greeks_dates[self.greeks_days] = date
+        self.greeks[self.greeks_days] = [greeks.get(name, 0.0) for name in self.GREEK_NAMES]
+        self.greeks_days += 1
+        
+    @property
+    def last_date(self) -> datetime:
+        """Most recently recorded day"""
+        return self.dates[self.days - 1].astype(datetime)
+        
+    @property
+    def daily_pnl(self) -> List[Dict]:
+        """Daily records as dicts (built on demand)"""
+        return [
+            {'date': date, 'pnl': pnl, 'portfolio_value': value, 'exposure': exposure,
+             'cumulative_return': (value - self.initial_capital) / self.initial_capital}
+            for date, pnl, value, exposure in zip(
+                self.dates[:self.days].astype(datetime).tolist(), self.pnl[:self.days].tolist(),
+                self.portfolio_values[:self.days].tolist(), self.exposures[:self.days].tolist()
+            )
+        ]
+        
+    @property
+    def greeks_history(self) -> List[Dict]:
+        """Greeks records as dicts (built on demand)"""
+        return [
+            {'date': date, **dict(zip(self.GREEK_NAMES, values))}
+            for date, values in zip(self.greeks_dates[:self.greeks_days].astype(datetime).tolist(),
+                                    self.greeks[:self.greeks_days].tolist())
+        ]
+        
+    def equity_curve(self) -> pd.DataFrame:
+        """Daily P&L, value, return, drawdown and exposure indexed by date"""
+        n = self.days
+        return pd.DataFrame({
+            'pnl': self.pnl[:n], 'portfolio_value': self.portfolio_values[:n], 'return': self.returns[:n],
+            'drawdown': self.drawdowns[:n], 'exposure': self.exposures[:n]
+        }, index=pd.DatetimeIndex(self.dates[:n], name='date'))
+        
+    def greeks_frame(self) -> pd.DataFrame:
+        """Portfolio Greeks indexed by date"""
+        return pd.DataFrame(self.greeks[:self.greeks_days], columns=list(self.GREEK_NAMES),
+                            index=pd.DatetimeIndex(self.greeks_dates[:self.greeks_days], name='date'))
+                            
+    def since(self, start: datetime) -> 'PerformanceTracker':
+        """
+        Copy holding only records on or after a date
+        
+        Used to drop a warm-up period; the equity path is rebuilt from the
+        remaining day-over-day P&L, so the copy is meant for merge().
+        """
+        tracker = PerformanceTracker(self.initial_capital)
+        start = np.datetime64(start, 'us')
+        days = np.flatnonzero(self.dates[:self.days] >= start)
+        first = days[0] if len(days) else self.days
+        for i in range(first, self.days):
+            tracker.record_daily_pnl(self.dates[i].astype(datetime), float(self.pnl[i]),
+                                     float(self.portfolio_values[i]), float(self.exposures[i]))
+        greeks_first = int(np.searchsorted(self.greeks_dates[:self.greeks_days], start))
+        for i in range(greeks_first, self.greeks_days):
+            tracker.record_greeks(self.greeks_dates[i].astype(datetime), dict(zip(self.GREEK_NAMES, self.greeks[i])))
+        for trade in self.trades:
+            if trade['timestamp'] is not None and trade['timestamp'] >= start.astype(datetime):
+                tracker.record_trade(trade, trade['timestamp'])
+        return tracker
+        
+    @classmethod
+    def merge(cls, trackers: List['PerformanceTracker'],
+              initial_capital: float = 100000.0) -> 'PerformanceTracker':
+        """
+        Combine trackers from consecutive date blocks of one backtest
+        
+        Daily P&L is concatenated in date order and the portfolio value,
+        peak and drawdown are replayed from it; trades and Greeks are pooled.
+        
+        Args:
+            trackers: Trackers of non-overlapping date blocks
+            initial_capital: Starting value of the combined run
+            
+        Returns:
+            Combined PerformanceTracker
+        """
+        merged = cls(initial_capital)
+        portfolio_value = initial_capital
+        for day in sorted((d for t in trackers for d in t.daily_pnl), key=lambda d: d['date']):
+            portfolio_value += day['pnl']
+            merged.record_daily_pnl(day['date'], day['pnl'], portfolio_value, day['exposure'])
+            
+        for trade in sorted((trade for t in trackers for trade in t.trades), key=lambda trade: trade['timestamp']):
+            merged.record_trade(trade, trade['timestamp'])
+        for greeks in sorted((g for t in trackers for g in t.greeks_history), key=lambda g: g['date']):
+            merged.record_greeks(greeks['date'], greeks)
+        return merged
         
     def get_performance_summary(self) -> Dict[str, Any]:
-        """Calculate comprehensive performance metrics"""
-        if not self.daily_pnl:
+        """Calculate comprehensive performance metrics from the running statistics (O(1))"""
+        if not self.days:
             return {}
             
-        df = pd.DataFrame(self.daily_pnl)
-        
-        # Calculate key metrics
-        total_return = df['cumulative_return'].iloc[-1] * 100
+        final_value = float(self.portfolio_values[self.days - 1])
+        total_return = (final_value - self.initial_capital) / self.initial_capital * 100
         
-        # Sharpe ratio calculation
-        daily_returns = df['pnl'] / 100000  # Convert to percentage
-        sharpe_ratio = (daily_returns.mean() / daily_returns.std()) * np.sqrt(252) if daily_returns.std() > 0 else 0
+        # Sharpe (sample std) and Sortino (downside deviation) of daily returns
+        return_std = float(np.sqrt(self._return_m2 / (self.days - 1))) if self.days > 1 else 0.0
+        downside_std = float(np.sqrt(self._downside_sq / self.days))
+        sharpe_ratio = self._return_mean / return_std * 252 ** 0.5 if return_std > 0 else 0
+        sortino_ratio = self._return_mean / downside_std * 252 ** 0.5 if downside_std > 0 else 0
         
         # Win rate
-        winning_trades = len([t for t in self.trades if t.get('pnl', 0) > 0])
         total_trades = len(self.trades)
-        win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
+        win_rate = (self._winning_trades / total_trades * 100) if total_trades > 0 else 0
         
         return {
             'total_return_pct': total_return,
-            'annualized_return_pct': total_return * (252 / len(df)) if len(df) > 0 else 0,
+            'annualized_return_pct': total_return * (252 / self.days),
             'sharpe_ratio': sharpe_ratio,
+            'sortino_ratio': sortino_ratio,
+            'volatility_pct': return_std * 252 ** 0.5 * 100,
             'max_drawdown_pct': self.max_drawdown * 100,
+            'current_drawdown_pct': float(self.drawdowns[self.days - 1]) * 100,
             'total_trades': total_trades,
             'win_rate_pct': win_rate,
-            'avg_trade_pnl': sum([t.get('pnl', 0) for t in self.trades]) / total_trades if total_trades > 0 else 0,
-            'final_portfolio_value': df['portfolio_value'].iloc[-1] if not df.empty else 100000
+            'avg_trade_pnl': self._trade_pnl_sum / total_trades if total_trades > 0 else 0,
+            'avg_exposure': self._exposure_sum / self.days,
+            'time_in_market_pct': self._days_exposed / self.days * 100,
+            'trading_days': self.days,
+            'final_portfolio_value': final_value
         }
 
+class ChainPrefetcher:
+    """
+    Iterator over (trading day, options chain) for a date range
+    
+    Weekdays only. While the caller processes one day, the next days'
+    chains are already loading on a background thread, so data I/O
+    overlaps with strategy compute. Days without data (exchange holidays)
+    are skipped.
+    """
+    
+    def __init__(self, data_manager: Any, symbol: str, start_date: datetime, end_date: datetime,
+                 lookahead: int = 1):
+        """
+        Initialize prefetcher
+        
+        Args:
+            data_manager: Object with get_options_chain(symbol, 'YYYY-MM-DD')
+                (HistoricalOptionsManager)
+            symbol: Underlying symbol
+            start_date: First day (inclusive)
+            end_date: Last day (inclusive)
+            lookahead: Number of days loaded ahead of the current one
+        """
+        self.data_manager = data_manager
+        self.symbol = symbol
+        self.trading_days = [d.to_pydatetime() for d in pd.bdate_range(start_date, end_date)]
+        self.lookahead = max(lookahead, 0)
+        self.days_loaded = 0
+        self.days_skipped = 0
+        
+    def _load(self, day: datetime):
+        return self.data_manager.get_options_chain(self.symbol, day.strftime('%Y-%m-%d'))
+        
+    def __len__(self) -> int:
+        return len(self.trading_days)
+        
+    def __iter__(self) -> Iterator[Tuple[datetime, Any]]:
+        # Chains are priced on the loader thread: start the kernels here first
+        kernel_backend()
+        days = iter(self.trading_days)
+        pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='chain-prefetch')
+        pending: deque = deque()
+        
+        def submit_next():
+            day = next(days, None)
+            if day is not None:
+                pending.append((day, pool.submit(self._load, day)))
+                
+        try:
+            for _ in range(self.lookahead + 1):
+                submit_next()
+                
+            while pending:
+                day, future = pending.popleft()
+                submit_next()
+                chain = future.result()
+                
+                if not chain:
+                    self.days_skipped += 1
+                    logger.debug(f"No options data for {day.date()}, skipping")
+                    continue
+                    
+                self.days_loaded += 1
+                yield day, chain
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
 class OptionsBacktestEngine:
     """
     Core options backtesting engine
     Event-driven architecture for multi-leg options strategies
     """
     
-    def __init__(self, initial_capital: float = 100000.0):
+    # Same-timestamp ordering: market data, then signals, then fills
+    EVENT_PRIORITY = {'MarketDataEvent': 0, 'StrategyEvent': 1, 'ExecutionEvent': 2}
+    
+    def __init__(self, initial_capital: float = 100000.0, data_manager: Any = None,
+                 strategy: Any = None, symbol: str = 'SPY', prefetch_days: int = 1,
+                 fill_model: Optional[FillModel] = None, settlement: Optional[SettlementEngine] = None,
+                 strategies: Optional[List[Any]] = None):
+        """
+        Initialize engine
+        
+        Args:
+            initial_capital: Starting cash
+            data_manager: HistoricalOptionsManager (default created on first run)
+            strategy: IronCondorStrategy (default created on first run, sharing
+                the data manager)
+            symbol: Underlying symbol
+            prefetch_days: Chains loaded ahead of the current day
+            fill_model: Prices multi-leg orders as packages (default fills
+                at the bid/ask with no fees)
+            settlement: Settles positions reaching expiry and detects early
+                assignment (default SettlementEngine())
+            strategies: StrategyPlugins run alongside the Iron Condor strategy
+                (with plugins and no strategy, no Iron Condor strategy is
+                created)
+        """
+        from options_backtesting.portfolio import LegTable
+        
         self.initial_capital = initial_capital
         self.current_capital = initial_capital
-        self.positions: List[IronCondorPosition] = []
-        self.performance = PerformanceTracker()
+        self.positions: List[Union[IronCondorPosition, MultiLegPosition]] = []
+        self.leg_table = LegTable()
+        self._position_ids = itertools.count()
+        self.underlying_price = 0.0
+        self.performance = PerformanceTracker(initial_capital)
+        
+        self.data_manager = data_manager
+        self.strategy = strategy
+        self.symbol = symbol
+        self.prefetch_days = prefetch_days
+        self.plugins: Dict[str, Any] = {plugin.name: plugin for plugin in strategies or []}
+        self.fill_model = fill_model or FillModel()
+        self.settlement = settlement or SettlementEngine()
+        self.positions_settled = 0
+        self.early_assignments = 0
         
-        # Event queues
-        self.market_data_queue: List[MarketDataEvent] = []
-        self.strategy_queue: List[StrategyEvent] = []
-        self.execution_queue: List[ExecutionEvent] = []
+        # Event queue: heap of (timestamp, priority, sequence, event)
+        self.event_queue: List[Tuple[datetime, int, int, Any]] = []
+        self._event_sequence = itertools.count()
+        self.events_processed = 0
+        self.last_portfolio_value = initial_capital
         
         logger.info(f"Options backtest engine initialized with ${initial_capital:,.2f}")
         
+    def _push_event(self, event: Any):
+        """Queue an event by timestamp, type priority and arrival order"""
+        priority = self.EVENT_PRIORITY[type(event).__name__]
+        heapq.heappush(self.event_queue, (event.timestamp, priority, next(self._event_sequence), event))
+        
     def add_market_data_event(self, event: MarketDataEvent):
         """Add market data event to processing queue"""
-        self.market_data_queue.append(event)
+        self._push_event(event)
         
     def add_strategy_event(self, event: StrategyEvent):
         """Add strategy event to processing queue"""
-        self.strategy_queue.append(event)
+        self._push_event(event)
         
     def add_execution_event(self, event: ExecutionEvent):
         """Add execution event to processing queue"""
-        self.execution_queue.append(event)
+        self._push_event(event)
         
-    def process_market_data(self, event: MarketDataEvent):
-        """Process market data event and update positions"""
-        # Update existing positions with new market data
-        for ic_position in self.positions:
-            if ic_position.is_open:
-                # Update contract prices with new market data
-                self._update_position_prices(ic_position, event)
-                
-        # Update portfolio metrics
-        portfolio_value = self._calculate_portfolio_value()
-        daily_pnl = portfolio_value - self.initial_capital
+    def process_events(self, until: Optional[datetime] = None):
+        """
+        Dispatch queued events in timestamp order
         
-        self.performance.record_daily_pnl(event.timestamp, daily_pnl, portfolio_value)
+        Handlers may queue further events (market data -> signal -> fills);
+        those are processed in the same pass if due.
         
-        # Record Greeks if options chain is available
-        if event.options_chain:
-            portfolio_greeks = self._calculate_portfolio_greeks()
-            self.performance.record_greeks(event.timestamp, portfolio_greeks)
+        Args:
+            until: Only process events at or before this time (default all)
+        """
+        while self.event_queue and (until is None or self.event_queue[0][0] <= until):
+            _, _, _, event = heapq.heappop(self.event_queue)
+            self.events_processed += 1
             
+            if isinstance(event, MarketDataEvent):
+                self.process_market_data(event)
+            elif isinstance(event, StrategyEvent):
+                self.process_strategy_event(event)
+            elif isinstance(event, ExecutionEvent):
+                self.process_execution_event(event)
+                
+    def process_market_data(self, event: MarketDataEvent):
+        """Process market data event: mark positions and ask the strategies for signals"""
+        self.underlying_price = event.data.get('underlying_price', self.underlying_price)
+        
+        # Update existing positions with new market data
+        self._update_position_prices(event)
+                
+        if self.strategy is not None and event.options_chain:
+            signal = self.strategy.generate_signal(event.timestamp, event.options_chain)
+            if signal.value != 'HOLD':
+                self.add_strategy_event(StrategyEvent(
+                    event.timestamp, 'iron_condor', signal.value,
+                    {'options_chain': event.options_chain}
+                ))
+                
+        if not event.options_chain:
+            return
+        for plugin in self.plugins.values():
+            closing = [position for position in plugin.active_positions
+                       if plugin.should_close(position, event.options_chain)]
+            if closing:
+                self.add_strategy_event(StrategyEvent(
+                    event.timestamp, plugin.name, 'CLOSE', {'positions': closing}
+                ))
+            for legs in plugin.generate_orders(event.timestamp, event.options_chain):
+                self.add_strategy_event(StrategyEvent(
+                    event.timestamp, plugin.name, 'OPEN', {'legs': legs}
+                ))
+                
     def process_strategy_event(self, event: StrategyEvent):
         """Process strategy signal and generate execution orders"""
-        if event.signal == 'OPEN' and event.strategy_name == 'iron_condor':
+        plugin = self.plugins.get(event.strategy_name)
+        if plugin is not None:
+            if event.signal == 'OPEN':
+                self._open_position(event, plugin)
+            elif event.signal == 'CLOSE':
+                for position in event.params['positions']:
+                    if position.is_open:
+                        self._exit_position(position, event.timestamp)
+        elif event.signal == 'OPEN' and event.strategy_name == 'iron_condor':
             self._open_iron_condor(event)
         elif event.signal == 'CLOSE':
             self._close_positions(event)
@@ -356,66 +778,299 @@ class OptionsBacktestEngine:
         else:  # SELL
             self.current_capital += (event.quantity * event.price * 100 - event.fees)
             
-        logger.info(f"Executed {event.order_type} {event.quantity} {event.symbol} @ ${event.price:.2f}")
-        
-    def _update_position_prices(self, ic_position: IronCondorPosition, event: MarketDataEvent):
-        """Update option contract prices based on new market data"""
-        if event.options_chain:
-            for contract in event.options_chain:
-                # Update prices for matching contracts
-                for pos in [ic_position.short_call, ic_position.long_call, 
-                           ic_position.short_put, ic_position.long_put]:
-                    if (pos.contract.strike == contract.strike and 
-                        pos.contract.option_type == contract.option_type and
-                        pos.contract.expiration == contract.expiration):
-                        # Update contract with new market data
-                        pos.contract.bid = contract.bid
-                        pos.contract.ask = contract.ask
-                        pos.contract.last = contract.last
-                        pos.contract.mid_price = contract.mid_price
-                        pos.contract.delta = contract.delta
-                        pos.contract.gamma = contract.gamma
-                        pos.contract.theta = contract.theta
-                        pos.contract.vega = contract.vega
-                        pos.contract.implied_volatility = contract.implied_volatility
-                        
+        logger.debug(f"Executed {event.order_type} {event.quantity} {event.symbol} @ ${event.price:.2f}")
+        
+    def _update_position_prices(self, event: MarketDataEvent):
+        """
+        Mark every open leg against the day's chain
+        
+        Legs carry int64 contract keys, so all of them are located in one
+        searchsorted and their quotes and Greeks gathered by fancy indexing:
+        O(legs log chain) instead of O(legs x chain). The portfolio leg
+        table is marked the same way.
+        """
+        if not event.options_chain:
+            return
+            
+        from options_backtesting.option_chain import OptionChain
+        chain = OptionChain.ensure(event.options_chain)
+        legs = [pos for position in self.positions if position.is_open for pos in position.legs]
+        found = chain.mark_legs(legs)
+        self.leg_table.mark(chain)
+        
+        # Legs not quoted today keep their last mark, but expiry still approaches
+        for pos, hit in zip(legs, found.tolist()):
+            if not hit:
+                day = expiry_day_number(pos.contract.expiration)
+                if day >= 0:
+                    pos.contract.days_to_expiration = day - (event.timestamp - datetime(1970, 1, 1)).days
+                    
     def _calculate_portfolio_value(self) -> float:
-        """Calculate total portfolio value"""
-        cash = self.current_capital
-        positions_value = sum([ic.total_pnl for ic in self.positions if ic.is_open])
-        return cash + positions_value
+        """Calculate total portfolio value: cash plus market value of open legs"""
+        return self.current_capital + self.leg_table.market_value()
+        
+    def _calculate_exposure(self) -> float:
+        """Capital at risk: margin requirement of all open positions"""
+        _, margins = self.leg_table.margin(self.underlying_price)
+        return float(margins.sum())
         
     def _calculate_portfolio_greeks(self) -> Dict[str, float]:
         """Calculate portfolio-level Greeks"""
-        total_delta = sum([ic.net_delta for ic in self.positions if ic.is_open])
-        total_gamma = sum([ic.net_gamma for ic in self.positions if ic.is_open])
-        total_theta = sum([ic.net_theta for ic in self.positions if ic.is_open])
-        total_vega = sum([ic.net_vega for ic in self.positions if ic.is_open])
+        return self.leg_table.greeks()
         
-        return {
-            'delta': total_delta,
-            'gamma': total_gamma,
-            'theta': total_theta,
-            'vega': total_vega
-        }
+    def _owner(self, position: Any) -> Any:
+        """Strategy (Iron Condor strategy or plugin) that manages a position"""
+        return self.plugins.get(position.strategy_name, self.strategy)
         
+    def _exit_levels(self, position: Any) -> Tuple[float, float]:
+        """Profit-target and stop-loss P&L levels of a position"""
+        owner = self._owner(position)
+        if position.strategy_name in self.plugins:
+            return owner.exit_levels(position)
+        return (position.max_profit * owner.params.profit_target,
+                -position.net_premium_collected * owner.params.stop_loss)
+                
+    def _add_position(self, position: Any):
+        """Register a newly opened position with the engine, its strategy and the leg table"""
+        position.position_id = next(self._position_ids)
+        self.positions.append(position)
+        self._owner(position).active_positions.append(position)
+        self.leg_table.add(position.position_id, position.legs)
+        
+    def _execute_legs(self, timestamp: datetime, position: Any, closing: bool, fees: List[float]):
+        """Queue one execution event per leg at its package fill price"""
+        for pos, leg_fees in zip(position.legs, fees):
+            buying = (pos.quantity > 0) != closing
+            price = pos.exit_price if closing else pos.entry_price
+            self.add_execution_event(ExecutionEvent(
+                timestamp, 'BUY' if buying else 'SELL', pos.contract.symbol, abs(pos.quantity), price, leg_fees
+            ))
+            
     def _open_iron_condor(self, event: StrategyEvent):
         """Open new Iron Condor position"""
-        params = event.params
+        chain = event.params['options_chain']
+        strikes = self.strategy._find_iron_condor_strikes(chain)
+        if not strikes:
+            return
+            
+        ic_position = self.strategy.create_iron_condor_position(strikes, chain)
+        if ic_position is None:
+            return
+        fees = self._fill_entry(ic_position)
+            
+        self._add_position(ic_position)
+        self.strategy.trades_opened += 1
+        self.strategy.total_premium_collected += ic_position.net_premium_collected
+        self._execute_legs(event.timestamp, ic_position, closing=False, fees=fees)
+        
+        logger.info(f"Opened Iron Condor at {event.timestamp.date()}: "
+                    f"{strikes['long_put_strike']:.0f}/{strikes['short_put_strike']:.0f}/"
+                    f"{strikes['short_call_strike']:.0f}/{strikes['long_call_strike']:.0f} "
+                    f"exp {strikes['expiration']}")
+                    
+    def _open_position(self, event: StrategyEvent, plugin: Any):
+        """
+        Open a plugin's N-leg position: fill the legs as a package, size its
+        max profit/loss from the fill and register it
+        """
+        from options_backtesting.portfolio import LegTable
         
-        # This would be implemented with actual order generation
-        # For now, we'll simulate the position creation
-        logger.info(f"Opening Iron Condor position at {event.timestamp}")
-        logger.info(f"Parameters: {params}")
+        legs = [OptionPosition(contract=contract, quantity=quantity, entry_price=contract.mid_price,
+                               entry_date=event.timestamp)
+                for contract, quantity in event.params['legs']]
+        fill = self.fill_model.fill_legs(legs, closing=False)
+        for pos, price in zip(legs, fill.prices.tolist()):
+            pos.entry_price = price
+            
+        max_profit, max_loss = LegTable.payoff_extremes(legs, self.underlying_price)
+        position = MultiLegPosition(
+            strategy_name=plugin.name,
+            legs=legs,
+            entry_date=event.timestamp,
+            expiration=min((pos.contract.expiration for pos in legs), key=expiry_day_number),
+            max_profit=max_profit,
+            max_loss=max_loss,
+            entry_fees=fill.total_fees
+        )
+        self._add_position(position)
+        plugin.trades_opened += 1
+        plugin.total_premium_collected += position.net_premium_collected
+        self._execute_legs(event.timestamp, position, closing=False, fees=fill.fees.tolist())
+        
+        logger.info(f"Opened {plugin.name} at {event.timestamp.date()}: "
+                    + ", ".join(f"{pos.quantity:+d} {pos.contract.strike:.0f}{pos.contract.option_type.value} "
+                                f"{pos.contract.expiration}" for pos in legs)
+                    + f" for ${position.net_premium_collected:,.2f}")
+                    
+    def _fill_entry(self, ic_position: IronCondorPosition) -> List[float]:
+        """
+        Fill the opening order as a package and reprice the position from it
+        
+        Returns:
+            Per-leg fees
+        """
+        legs = ic_position.legs
+        fill = self.fill_model.fill_legs(legs, closing=False)
+        for pos, price in zip(legs, fill.prices.tolist()):
+            pos.entry_price = price
+            
+        net_credit = ic_position.net_premium_collected / 100
+        ic_position.max_profit = net_credit * 100
+        ic_position.max_loss = (ic_position.wing_width - net_credit) * 100
+        ic_position.breakeven_upper = ic_position.short_call.contract.strike + net_credit
+        ic_position.breakeven_lower = ic_position.short_put.contract.strike - net_credit
+        ic_position.entry_fees = fill.total_fees
+        return fill.fees.tolist()
         
     def _close_positions(self, event: StrategyEvent):
-        """Close existing positions"""
-        logger.info(f"Closing positions at {event.timestamp}")
+        """Close existing positions that hit an exit rule"""
+        chain = event.params['options_chain']
+        
+        for ic_position in list(self.strategy.active_positions):
+            if self.strategy._should_close_position(ic_position, chain):
+                self._exit_position(ic_position, event.timestamp)
+                
+    def _exit_position(self, position: Any, timestamp: datetime,
+                       bids: Optional[np.ndarray] = None, asks: Optional[np.ndarray] = None,
+                       reason: str = 'signal'):
+        """
+        Exit all legs as a package, queue the fills and record the trade
+        
+        Args:
+            position: Position to close
+            timestamp: Exit time
+            bids: Per-leg bids in the position's leg order (Iron Condor:
+                short call, long call, short put, long put); default the
+                legs' last quotes
+            asks: Per-leg asks, as bids
+            reason: Exit reason recorded with the trade
+        """
+        fill = self.fill_model.fill_legs(position.legs, closing=True, bids=bids, asks=asks)
+        self._book_exit(position, timestamp, fill.prices.tolist(), fill.fees.tolist(), reason)
+        
+    def _book_exit(self, position: Any, timestamp: datetime, prices: List[float],
+                   fees: List[float], reason: str):
+        """Close all legs at given prices and fees, queue the fills and record the trade"""
+        for pos, price in zip(position.legs, prices):
+            pos.exit_price = price
+            pos.exit_date = timestamp
+        position.exit_fees = sum(fees)
+        self._execute_legs(timestamp, position, closing=True, fees=fees)
+        self.leg_table.close(position.position_id)
+        
+        pnl = position.total_pnl
+        owner = self._owner(position)
+        if position in owner.active_positions:
+            owner.active_positions.remove(position)
+        owner.closed_positions.append(position)
+        owner.trades_closed += 1
+        owner.total_pnl += pnl
+        self.performance.record_trade({
+            'strategy': position.strategy_name,
+            'entry_date': position.entry_date,
+            'exit_date': timestamp,
+            'expiration': position.expiration,
+            'premium_collected': position.net_premium_collected,
+            'fees': position.entry_fees + position.exit_fees,
+            'exit_reason': reason,
+            'pnl': pnl
+        }, timestamp)
+        logger.info(f"Closed {position.strategy_name} at {timestamp} ({reason}): P&L ${pnl:,.2f}")
+        
+    def _settle_positions(self, timestamp: datetime, spot: float):
+        """
+        Settle open positions at expiry and apply early assignments
         
+        Runs on the leg table: expiring and early-assigned legs are found
+        and valued for the whole book in one vectorized pass. Expiring legs
+        settle at intrinsic value against the day's underlying price;
+        early-assigned legs book intrinsic value. Any other legs of an
+        affected position (e.g. a calendar's back month) are unwound
+        through the fill model.
+        """
+        table = self.leg_table
+        rows = table.open_index()
+        if not len(rows):
+            return
+            
+        strikes = table.columns['strike'][rows]
+        is_call = table.columns['is_call'][rows]
+        quantities = table.columns['quantity'][rows]
+        expiring = table.columns['expiry_day'][rows] <= (timestamp - datetime(1970, 1, 1)).days
+        early = self.settlement.early_assignments(strikes, is_call, quantities, spot,
+                                                  table.columns['mid_price'][rows])
+        if not (expiring | early).any():
+            return
+            
+        settled = self.settlement.settle(strikes, is_call, quantities, spot)
+        intrinsic = SettlementEngine.intrinsic_values(strikes, is_call, spot)
+        assignment_fees = self.settlement.assignment_fee * np.abs(quantities)
+        position_ids = table.columns['position_id'][rows]
+        by_id = {position.position_id: position for position in self.positions if position.is_open}
+        
+        for position_id in np.unique(position_ids[expiring | early]).tolist():
+            position = by_id[position_id]
+            legs = position_ids == position_id
+            leg_expiring, leg_early = expiring[legs], early[legs]
+            prices = np.where(leg_expiring, settled.prices[legs], intrinsic[legs])
+            fees = np.where(leg_expiring, settled.fees[legs], assignment_fees[legs])
+            
+            # Legs neither expiring nor assigned are bought/sold back
+            unwound = ~(leg_expiring | leg_early)
+            if unwound.any():
+                fill = self.fill_model.fill_legs(position.legs, closing=True)
+                prices = np.where(unwound, fill.prices, prices)
+                fees = np.where(unwound, fill.fees, fees)
+                
+            if leg_expiring.any():
+                reason = 'expiration'
+                self.positions_settled += 1
+                shares = settled.shares[legs][leg_expiring].sum()
+                if shares:
+                    logger.info(f"Assignment/exercise at expiry delivered {shares:+.0f} shares, "
+                                f"liquidated at ${spot:.2f}")
+            else:
+                reason = 'early assignment'
+                self.early_assignments += 1
+            self._book_exit(position, timestamp, prices.tolist(), fees.tolist(), reason)
+            
     def _adjust_positions(self, event: StrategyEvent):
         """Adjust existing positions"""
         logger.info(f"Adjusting positions at {event.timestamp}")
         
+    def snapshot_state(self) -> Dict[str, Any]:
+        """Open positions and cash, for continuing this backtest in another engine"""
+        return {
+            'positions': [ic for ic in self.positions if ic.is_open],
+            'current_capital': self.current_capital,
+            'last_portfolio_value': self.last_portfolio_value
+        }
+        
+    def restore_state(self, state: Dict[str, Any]):
+        """Continue from a snapshot_state() of another engine"""
+        from options_backtesting.portfolio import LegTable
+        
+        self._ensure_components()
+        self.positions = list(state['positions'])
+        self.leg_table = LegTable()
+        for position in self.positions:
+            self.leg_table.add(position.position_id, position.legs)
+        self._position_ids = itertools.count(max((p.position_id for p in self.positions), default=-1) + 1)
+        for owner in [self.strategy] + list(self.plugins.values()):
+            if owner is not None:
+                owner.active_positions = [p for p in self.positions if self._owner(p) is owner]
+        self.current_capital = state['current_capital']
+        self.last_portfolio_value = state['last_portfolio_value']
+        
+    def _ensure_components(self):
+        """Create the default data manager and strategy if none were given"""
+        if self.data_manager is None:
+            from options_backtesting.historical_manager import HistoricalOptionsManager
+            self.data_manager = HistoricalOptionsManager()
+        if self.strategy is None and not self.plugins:
+            from options_backtesting.iron_condor_strategy import IronCondorStrategy
+            self.strategy = IronCondorStrategy(data_manager=self.data_manager)
+            
     def run_backtest(self, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
         """
         Run complete backtest for the specified date range
@@ -428,15 +1083,14 @@ class OptionsBacktestEngine:
             Dictionary with backtest results
         """
         logger.info(f"Starting backtest from {start_date} to {end_date}")
+        self._ensure_components()
         
-        # Process events chronologically
-        current_date = start_date
+        # Process events chronologically, one trading day at a time
+        days = ChainPrefetcher(self.data_manager, self.symbol, start_date, end_date,
+                               lookahead=self.prefetch_days)
         
-        while current_date <= end_date:
-            # Process events for current date
-            self._process_events_for_date(current_date)
-            
-            current_date += timedelta(days=1)
+        for current_date, options_chain in days:
+            self._process_trading_day(current_date, options_chain)
             
         # Generate final performance report
         performance_summary = self.performance.get_performance_summary()
@@ -449,15 +1103,42 @@ class OptionsBacktestEngine:
             'initial_capital': self.initial_capital,
             'final_value': self._calculate_portfolio_value(),
             'performance_metrics': performance_summary,
+            'trading_days': days.days_loaded,
+            'days_without_data': days.days_skipped,
+            'events_processed': self.events_processed,
             'total_positions': len(self.positions),
+            'positions_settled': self.positions_settled,
+            'early_assignments': self.early_assignments,
             'open_positions': len([ic for ic in self.positions if ic.is_open])
         }
         
-    def _process_events_for_date(self, date: datetime):
-        """Process all events for a specific date"""
-        # This would be enhanced with actual data loading and strategy logic
-        # For now, it's a placeholder for the event processing framework
-        pass
+    def _process_trading_day(self, date: datetime, options_chain: Any):
+        """One trading day of the backtest (daily mode: the chain snapshot only)"""
+        self._process_events_for_date(date, options_chain)
+        
+    def _process_events_for_date(self, date: datetime, options_chain: Any):
+        """
+        Process all events for a specific date
+        
+        Queues the day's market data event, drains the queue (marks, signal,
+        fills), then records end-of-day value, P&L and Greeks.
+        """
+        spot = options_chain[0].underlying_price
+        self.add_market_data_event(MarketDataEvent(
+            date, self.symbol, {'underlying_price': spot}, options_chain
+        ))
+        self.process_events(until=date)
+        
+        # Positions reaching expiry settle at today's underlying price
+        self._settle_positions(date, spot)
+        self.process_events(until=date)
+        
+        # End of day: day-over-day P&L against the previous close
+        portfolio_value = self._calculate_portfolio_value()
+        self.performance.record_daily_pnl(date, portfolio_value - self.last_portfolio_value, portfolio_value,
+                                          self._calculate_exposure())
+        self.last_portfolio_value = portfolio_value
+        self.performance.record_greeks(date, self._calculate_portfolio_greeks())
 
 
 def main():
@@ -468,25 +1149,26 @@ def main():
     print("SPRINT 16: OPTIONS BACKTESTING ENGINE TEST")
     print("=" * 80)
     
-    # Initialize backtesting engine
+    # Initialize backtesting engine (default data manager and Iron Condor strategy)
     engine = OptionsBacktestEngine(initial_capital=100000.0)
     
     # Test basic functionality
     start_date = datetime(2024, 1, 1)
-    end_date = datetime(2024, 12, 31)
+    end_date = datetime(2024, 3, 31)
     
-    print(f"Testing backtest framework from {start_date.date()} to {end_date.date()}")
+    print(f"Testing backtest from {start_date.date()} to {end_date.date()}")
     
-    # Run basic backtest (currently just framework test)
+    start = datetime.now()
     results = engine.run_backtest(start_date, end_date)
+    elapsed = (datetime.now() - start).total_seconds()
     
     print("\nBacktest Results:")
     for key, value in results.items():
         print(f"  {key}: {value}")
+    print(f"  runtime: {elapsed:.1f}s")
     
-    print("\nCore engine architecture validated [SUCCESS]")
-    print("Ready for Iron Condor strategy implementation")
+    print("\nCore engine event loop validated [SUCCESS]")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Sprint 16: Options Fill Models
+Package fills, spread haircuts, size impact and commissions for multi-leg orders
+
+Filling every leg at the touch with zero fees flatters short-premium
+strategies: wide wings cost more than their quote suggests, large orders
+move the market, and every contract pays a commission. A FillModel prices
+a whole multi-leg order in one vectorized pass and returns per-leg fills
+whose sum is the package's net price.
+
+Key Features:
+- Mid plus a fraction of the spread (0.5 = bid/ask, 0 = mid)
+- Extra haircut on legs with wide relative spreads
+- Size-vs-liquidity impact curve (volume and open interest)
+- Package price improvement on the net concession
+- Per-contract and per-order commissions
+"""
+
+import os
+import sys
+import numpy as np
+from dataclasses import dataclass
+from typing import Any, List, Optional
+import logging
+
+# Add parent directory for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@dataclass
+class PackageFill:
+    """
+    Fill of a multi-leg order
+    """
+    prices: np.ndarray  # Per-leg fill prices
+    fees: np.ndarray  # Per-leg fees (per-order fee on the first leg)
+    net_price: float  # Net debit (positive) or credit (negative) per package
+    
+    @property
+    def total_fees(self) -> float:
+        """Fees for the whole order"""
+        return float(self.fees.sum())
+
+@dataclass
+class FillModel:
+    """
+    Vectorized fill model for multi-leg options orders
+    
+    Each leg's concession from mid, as a fraction of its bid/ask spread, is
+    
+        spread_fraction
+        + wide_spread_haircut * min(spread / mid, 1)
+        + impact_coefficient * (size / liquidity) ** impact_exponent
+        
+    capped at max_spread_fraction, where liquidity is volume plus
+    open_interest_weight * open interest. Buys fill above mid and sells
+    below it. Filling as a package saves package_improvement of the total
+    concession.
+    
+    The defaults reproduce legged fills at the bid/ask with no fees.
+    """
+    spread_fraction: float = 0.5
+    wide_spread_haircut: float = 0.0
+    impact_coefficient: float = 0.0
+    impact_exponent: float = 0.5
+    open_interest_weight: float = 0.1
+    max_spread_fraction: float = 1.0
+    package_improvement: float = 0.0
+    commission_per_contract: float = 0.0
+    fee_per_order: float = 0.0
+    
+    @classmethod
+    def realistic(cls) -> 'FillModel':
+        """Retail-broker style defaults for liquid index options"""
+        return cls(spread_fraction=0.3, wide_spread_haircut=0.25, impact_coefficient=0.5,
+                   package_improvement=0.1, commission_per_contract=0.65)
+                   
+    def fill(self, bids: np.ndarray, asks: np.ndarray, sides: np.ndarray, sizes: np.ndarray,
+             volumes: Optional[np.ndarray] = None, open_interest: Optional[np.ndarray] = None) -> PackageFill:
+        """
+        Fill one multi-leg order as a package
+        
+        Args:
+            bids: Leg bid prices
+            asks: Leg ask prices
+            sides: +1 to buy the leg, -1 to sell it
+            sizes: Contracts per leg (positive)
+            volumes: Leg day volumes (default: no size impact)
+            open_interest: Leg open interest
+            
+        Returns:
+            PackageFill with per-leg prices and fees and the net price
+        """
+        bids = np.asarray(bids, dtype=np.float64)
+        asks = np.asarray(asks, dtype=np.float64)
+        sides = np.asarray(sides, dtype=np.float64)
+        sizes = np.asarray(sizes, dtype=np.float64)
+        
+        mid = (bids + asks) / 2
+        spread = np.maximum(asks - bids, 0.0)
+        
+        fraction = np.full(mid.shape, self.spread_fraction)
+        if self.wide_spread_haircut:
+            fraction += self.wide_spread_haircut * np.minimum(spread / np.maximum(mid, 0.01), 1.0)
+        if self.impact_coefficient and volumes is not None:
+            liquidity = np.asarray(volumes, dtype=np.float64)
+            if open_interest is not None:
+                liquidity = liquidity + self.open_interest_weight * np.asarray(open_interest, dtype=np.float64)
+            fraction += self.impact_coefficient * (sizes / np.maximum(liquidity, 1.0)) ** self.impact_exponent
+        concession = np.minimum(fraction, self.max_spread_fraction) * spread * (1.0 - self.package_improvement)
+        
+        prices = np.maximum(mid + sides * concession, 0.0)
+        fees = self.commission_per_contract * sizes
+        if len(fees):
+            fees[0] += self.fee_per_order
+        return PackageFill(prices=prices, fees=fees, net_price=float(np.dot(sides * sizes, prices)))
+        
+    def fill_legs(self, legs: List[Any], closing: bool, bids: Optional[np.ndarray] = None,
+                  asks: Optional[np.ndarray] = None) -> PackageFill:
+        """
+        Fill opening or closing orders for OptionPosition legs
+        
+        Args:
+            legs: OptionPosition legs of one package
+            closing: True to close the legs, False to open them
+            bids: Bid prices overriding the legs' current quotes
+            asks: Ask prices overriding the legs' current quotes
+            
+        Returns:
+            PackageFill for the legs, in order
+        """
+        contracts = [leg.contract for leg in legs]
+        quantities = np.array([leg.quantity for leg in legs], dtype=np.float64)
+        sides = np.sign(quantities) * (-1.0 if closing else 1.0)
+        if bids is None:
+            bids = np.array([contract.bid for contract in contracts])
+        if asks is None:
+            asks = np.array([contract.ask for contract in contracts])
+        return self.fill(
+            bids, asks, sides, np.abs(quantities),
+            volumes=np.array([contract.volume for contract in contracts]),
+            open_interest=np.array([contract.open_interest for contract in contracts])
+        )
+
+
+def main():
+    """
+    Test options fill models
+    """
+    import time
+    
+    print("=" * 80)
+    print("SPRINT 16: OPTIONS FILL MODELS TEST")
+    print("=" * 80)
+    
+    # Iron Condor: short call, long call, short put, long put
+    bids = np.array([2.10, 0.85, 2.40, 1.00])
+    asks = np.array([2.20, 0.95, 2.55, 1.20])
+    sides = np.array([-1, 1, -1, 1])
+    volumes = np.array([1500, 400, 2200, 300])
+    open_interest = np.array([12000, 5000, 15000, 4000])
+    
+    models = {
+        'natural (bid/ask)': FillModel(),
+        'mid': FillModel(spread_fraction=0.0),
+        'realistic': FillModel.realistic(),
+    }
+    for size in [1, 10, 100]:
+        print(f"\n{size} lot(s):")
+        for name, model in models.items():
+            result = model.fill(bids, asks, sides, np.full(4, size), volumes, open_interest)
+            print(f"  {name:<18} net credit ${-result.net_price / size:.3f}/condor, "
+                  f"fees ${result.total_fees:.2f}, legs {np.round(result.prices, 3).tolist()}")
+                  
+    model = FillModel.realistic()
+    n = 10000
+    start = time.perf_counter()
+    for _ in range(n):
+        model.fill(bids, asks, sides, np.ones(4), volumes, open_interest)
+    elapsed = time.perf_counter() - start
+    print(f"\nPackage fill: {elapsed / n * 1e6:.1f} us per order")
+    
+    print("\nOptions Fill Models test completed [SUCCESS]")
+
+
+if __name__ == "__main__":
+    main()
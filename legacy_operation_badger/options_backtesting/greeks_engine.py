@@ -10,28 +10,41 @@ with real-time risk management capabilities.
 
 Key Features:
 - Black-Scholes Greeks calculation with volatility surface
+- Per-expiry SVI smile fits with arbitrage checks
+- Surface cache keyed by chain snapshot with incremental slice refits
 - Delta hedging simulation
 - Gamma risk monitoring
 - Theta decay modeling (1-minute granularity)
 - Vega sensitivity analysis
+- Vectorized pricing and Greeks over whole option chains
+- Optional American pricing (Barone-Adesi-Whaley or binomial lattice)
 - Integration with historical options data
 """
 
 import os
 import sys
+import math
+from bisect import bisect_left
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any, Union
 import logging
+import hashlib
+from collections import OrderedDict
 from scipy.stats import norm
-from scipy.interpolate import griddata, interp2d
+from scipy.special import erfc
+from scipy.optimize import least_squares
 import warnings
 
 # Add parent directory for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from options_backtesting.core_engine import OptionContract, OptionType
+from options_backtesting.option_chain import OptionChain
+from options_backtesting.american_pricing import AmericanOptionPricer
+from options_backtesting.rate_curves import CarryCurves
+from options_backtesting.compiled_kernels import kernel_backend, bs_greeks_compiled
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -40,16 +53,147 @@ logger = logging.getLogger(__name__)
 # Suppress scipy interpolation warnings
 warnings.filterwarnings('ignore', category=RuntimeWarning)
 
+SQRT_2 = np.sqrt(2.0)
+INV_SQRT_2PI = 1.0 / np.sqrt(2.0 * np.pi)
+
+# Per-contract Greeks aggregated into portfolio_<name> totals
+FIRST_ORDER_GREEKS = ('delta', 'gamma', 'theta', 'vega', 'rho')
+HIGHER_ORDER_GREEKS = ('vanna', 'volga', 'charm', 'speed', 'color')
+PORTFOLIO_GREEKS = FIRST_ORDER_GREEKS + HIGHER_ORDER_GREEKS
+
+def norm_cdf(x: np.ndarray) -> np.ndarray:
+    """Standard normal CDF via erfc (accurate in both tails, ufunc speed)"""
+    return 0.5 * erfc(-x / SQRT_2)
+
+def norm_pdf(x: np.ndarray) -> np.ndarray:
+    """Standard normal PDF"""
+    return INV_SQRT_2PI * np.exp(-0.5 * x * x)
+
+def option_type_mask(option_types) -> np.ndarray:
+    """
+    Boolean call mask from OptionType values, 'call'/'put' strings or bools
+    
+    Args:
+        option_types: Sequence of OptionType, strings or booleans
+        
+    Returns:
+        Array that is True for calls
+    """
+    values = np.asarray(option_types)
+    if values.dtype == bool:
+        return values
+    return np.array([
+        (t.value if isinstance(t, OptionType) else str(t)).lower() == 'call'
+        for t in values.ravel()
+    ], dtype=bool).reshape(values.shape)
+
+def svi_total_variance(params: np.ndarray, k: np.ndarray) -> np.ndarray:
+    """
+    Raw SVI total implied variance w(k) = a + b * (rho * (k - m) + sqrt((k - m)^2 + sigma^2))
+    
+    Args:
+        params: (..., 5) array of [a, b, rho, m, sigma], broadcast against k
+        k: Log-moneyness ln(K/S)
+        
+    Returns:
+        Total variance (implied variance times years)
+    """
+    a, b, rho, m, sigma = np.moveaxis(np.asarray(params, dtype=np.float64), -1, 0)
+    x = k - m
+    return a + b * (rho * x + np.sqrt(x * x + sigma * sigma))
+
+def svi_butterfly_density(params: np.ndarray, k: np.ndarray) -> np.ndarray:
+    """
+    Gatheral's g(k) for one SVI slice; negative values are butterfly arbitrage
+    
+    Args:
+        params: [a, b, rho, m, sigma]
+        k: Log-moneyness grid
+        
+    Returns:
+        g(k) evaluated on the grid
+    """
+    a, b, rho, m, sigma = params
+    x = k - m
+    root = np.sqrt(x * x + sigma * sigma)
+    w = a + b * (rho * x + root)
+    w1 = b * (rho + x / root)
+    w2 = b * sigma * sigma / root ** 3
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (1 - k * w1 / (2 * w)) ** 2 - (w1 * w1 / 4) * (1 / w + 0.25) + w2 / 2
+
+def fit_svi_slice(k: np.ndarray, w: np.ndarray, weights: Optional[np.ndarray] = None,
+                  x0: Optional[np.ndarray] = None) -> Tuple[np.ndarray, float]:
+    """
+    Least-squares fit of one expiry's smile in total-variance space
+    
+    Args:
+        k: Log-moneyness of the quotes
+        w: Observed total variance (iv^2 * T)
+        weights: Optional per-quote weights
+        x0: Starting parameters (e.g. the previous fit, for warm starts)
+        
+    Returns:
+        Tuple of (params [a, b, rho, m, sigma], RMSE in implied volatility
+        points scaled by sqrt(T) -- i.e. in total-variance units)
+    """
+    k = np.asarray(k, dtype=np.float64)
+    w = np.asarray(w, dtype=np.float64)
+    sqrt_weights = np.sqrt(weights) if weights is not None else np.ones_like(w)
+    w_max = float(w.max())
+    k_span = max(float(k.max() - k.min()), 1e-3)
+    
+    lower = np.array([-w_max, 0.0, -0.999, float(k.min()) - k_span, 1e-4])
+    upper = np.array([w_max, 10.0, 0.999, float(k.max()) + k_span, 10.0])
+    
+    if x0 is None:
+        x0 = np.array([0.5 * float(w.min()), 0.1, -0.5, float(k[np.argmin(w)]), 0.1])
+    x0 = np.clip(x0, lower + 1e-9, upper - 1e-9)
+    
+    def residuals(p):
+        a, b, rho, m, sigma = p
+        fit = sqrt_weights * (svi_total_variance(p, k) - w)
+        # Penalty keeps the minimum variance a + b*sigma*sqrt(1 - rho^2) non-negative
+        floor = min(0.0, a + b * sigma * np.sqrt(1 - rho * rho))
+        return np.append(fit, 100.0 * floor)
+        
+    solution = least_squares(residuals, x0, bounds=(lower, upper), method='trf', x_scale='jac')
+    rmse = float(np.sqrt(np.mean((svi_total_variance(solution.x, k) - w) ** 2)))
+    return solution.x, rmse
+
 class VolatilitySurface:
     """
     Volatility surface modeling for improved Greeks calculation
+    
+    Each expiry's smile is fitted once per chain update with raw SVI in
+    log-moneyness ln(K/S). Between expiries total variance is interpolated
+    linearly in time (flat volatility beyond the first and last expiry).
+    Lookups only evaluate the cached parameters, so arrays of points are
+    priced in a single vectorized pass.
     """
     
+    MIN_POINTS_PER_SLICE = 5
+    
     def __init__(self):
         self.surface_data: Optional[pd.DataFrame] = None
-        self.interpolator = None
         self.last_update = None
         
+        # Per-expiry fits keyed by days to expiration
+        self.slices: Dict[int, Dict[str, Any]] = {}
+        self.slice_hashes: Dict[int, str] = {}
+        self.chain_key: Optional[str] = None
+        
+        # Compiled arrays for evaluation (sorted by expiry)
+        self.slice_tte = np.empty(0)
+        self.slice_params = np.empty((0, 5))
+        self._slice_tte_list: List[float] = []
+        self._slice_params_list: List[Tuple[float, ...]] = []
+        self.arbitrage_report: Dict[str, Any] = {}
+        
+    @property
+    def is_built(self) -> bool:
+        return len(self.slice_tte) > 0
+        
     def build_surface(self, contracts: List[OptionContract]) -> bool:
         """
         Build volatility surface from options contracts
@@ -64,52 +208,225 @@ class VolatilitySurface:
             if not contracts:
                 return False
                 
-            # Extract surface data
-            surface_points = []
-            
-            for contract in contracts:
-                if (contract.implied_volatility > 0 and 
-                    contract.days_to_expiration > 0 and
-                    contract.underlying_price > 0):
-                    
-                    # Calculate moneyness (Strike/Spot)
-                    moneyness = contract.strike / contract.underlying_price
-                    
-                    # Time to expiration in years
-                    tte = contract.days_to_expiration / 365.0
-                    
-                    surface_points.append({
-                        'moneyness': moneyness,
-                        'time_to_expiration': tte,
-                        'implied_volatility': contract.implied_volatility,
-                        'strike': contract.strike,
-                        'days_to_expiration': contract.days_to_expiration
-                    })
-            
-            if len(surface_points) < 10:  # Need minimum points for interpolation
+            surface_data = self._surface_points(contracts)
+            if len(surface_data) < 10:  # Need minimum points for a surface
                 logger.warning("Insufficient data points for volatility surface")
                 return False
                 
-            self.surface_data = pd.DataFrame(surface_points)
+            self.surface_data = surface_data
+            self.slices = {}
+            self.slice_hashes = {}
+            self.chain_key = None
+            for dte, group in surface_data.groupby('days_to_expiration', sort=True):
+                self.fit_slice(int(dte), group)
+                
+            return self._compile()
             
-            # Create interpolator
-            points = self.surface_data[['moneyness', 'time_to_expiration']].values
-            values = self.surface_data['implied_volatility'].values
+        except Exception as e:
+            logger.error(f"Failed to build volatility surface: {e}")
+            return False
             
-            # Use griddata for flexible interpolation
-            self.interpolator = lambda m, t: griddata(
-                points, values, (m, t), method='linear', fill_value=np.nan
-            )
+    @staticmethod
+    def _surface_points(contracts: List[OptionContract]) -> pd.DataFrame:
+        """Usable (strike, expiry, IV) quotes as a DataFrame"""
+        if isinstance(contracts, OptionChain):
+            strikes, spots = contracts.strike, contracts.underlying_price
+            ivs, dtes = contracts.implied_volatility, contracts.days_to_expiration
+        else:
+            n = len(contracts)
+            strikes = np.fromiter((c.strike for c in contracts), dtype=np.float64, count=n)
+            spots = np.fromiter((c.underlying_price for c in contracts), dtype=np.float64, count=n)
+            ivs = np.fromiter((c.implied_volatility for c in contracts), dtype=np.float64, count=n)
+            dtes = np.fromiter((c.days_to_expiration for c in contracts), dtype=np.int64, count=n)
+        
+        usable = (ivs > 0) & (dtes > 0) & (spots > 0)
+        strikes, spots, ivs, dtes = strikes[usable], spots[usable], ivs[usable], dtes[usable]
+        tte = dtes / 365.0
+        moneyness = strikes / spots
+        
+        return pd.DataFrame({
+            'moneyness': moneyness,
+            'time_to_expiration': tte,
+            'implied_volatility': ivs,
+            'strike': strikes,
+            'days_to_expiration': dtes,
+            'log_moneyness': np.log(moneyness),
+            'total_variance': ivs * ivs * tte
+        })
+        
+    def update_surface(self, contracts: List[OptionContract],
+                       cache: Optional['SurfaceCache'] = None) -> bool:
+        """
+        Incrementally update the surface for a new chain snapshot
+        
+        Each expiry's quotes are hashed. A snapshot already in the cache is
+        restored without fitting; otherwise only expiries whose quotes
+        changed are refit, warm-started from the previous fit of the same
+        (or nearest) expiry. Unchanged expiries keep their parameters.
+        
+        Args:
+            contracts: List of option contracts
+            cache: Optional SurfaceCache shared across updates
+            
+        Returns:
+            True if a surface is available
+        """
+        try:
+            if not contracts:
+                return False
+                
+            surface_data = self._surface_points(contracts)
+            if len(surface_data) < 10:
+                logger.warning("Insufficient data points for volatility surface")
+                return False
+                
+            groups = {int(dte): group for dte, group in surface_data.groupby('days_to_expiration', sort=True)}
+            slice_hashes = {dte: SurfaceCache.slice_hash(dte, group) for dte, group in groups.items()}
+            chain_key = SurfaceCache.chain_hash(slice_hashes)
+            self.surface_data = surface_data
             
-            self.last_update = datetime.now()
+            if chain_key == self.chain_key and self.is_built:
+                if cache is not None:
+                    cache.hits += 1
+                return True
+                
+            cached = cache.get(chain_key) if cache is not None else None
+            if cached is not None:
+                self.slices = dict(cached['slices'])
+                self.slice_hashes = slice_hashes
+                self.chain_key = chain_key
+                return self._compile(arbitrage_report=cached['arbitrage_report'])
+                
+            previous = self.slices
+            refit = 0
+            self.slices = {}
+            for dte, group in groups.items():
+                if self.slice_hashes.get(dte) == slice_hashes[dte] and dte in previous:
+                    self.slices[dte] = previous[dte]
+                    continue
+                    
+                self.fit_slice(dte, group, x0=self._warm_start(previous, dte))
+                refit += 1
+                
+            self.slice_hashes = slice_hashes
+            self.chain_key = chain_key
+            built = self._compile()
             
-            logger.info(f"Built volatility surface with {len(surface_points)} points")
-            return True
+            if cache is not None:
+                cache.record_refits(refit, len(groups) - refit)
+                if built:
+                    cache.put(chain_key, self.slices, self.arbitrage_report)
+                    
+            return built
             
         except Exception as e:
-            logger.error(f"Failed to build volatility surface: {e}")
+            logger.error(f"Failed to update volatility surface: {e}")
             return False
-    
+            
+    @staticmethod
+    def _warm_start(previous: Dict[int, Dict[str, Any]], dte: int) -> Optional[np.ndarray]:
+        """Previous parameters of the same expiry, else the nearest one"""
+        if not previous:
+            return None
+        if dte in previous:
+            return previous[dte]['params']
+        nearest = min(previous, key=lambda d: abs(d - dte))
+        return previous[nearest]['params']
+        
+    def fit_slice(self, dte: int, quotes: pd.DataFrame, x0: Optional[np.ndarray] = None) -> bool:
+        """
+        Fit (or refit) the SVI smile for one expiry
+        
+        Args:
+            dte: Days to expiration of the slice
+            quotes: Rows of surface_data for that expiry
+            x0: Optional warm-start parameters
+            
+        Returns:
+            True if the slice was fitted
+        """
+        if len(quotes) < self.MIN_POINTS_PER_SLICE:
+            self.slices.pop(dte, None)
+            return False
+            
+        params, rmse = fit_svi_slice(quotes['log_moneyness'].to_numpy(),
+                                     quotes['total_variance'].to_numpy(), x0=x0)
+        self.slices[dte] = {
+            'tte': dte / 365.0,
+            'params': params,
+            'rmse': rmse,
+            'points': len(quotes),
+            'k_range': (float(quotes['log_moneyness'].min()), float(quotes['log_moneyness'].max()))
+        }
+        return True
+        
+    def _compile(self, arbitrage_report: Optional[Dict[str, Any]] = None) -> bool:
+        """Stack slice parameters for evaluation and run arbitrage checks"""
+        if not self.slices:
+            self.slice_tte = np.empty(0)
+            self.slice_params = np.empty((0, 5))
+            logger.warning("No expiry had enough quotes for an SVI fit")
+            return False
+            
+        dtes = sorted(self.slices)
+        self.slice_tte = np.array([self.slices[d]['tte'] for d in dtes])
+        self.slice_params = np.vstack([self.slices[d]['params'] for d in dtes])
+        self._slice_tte_list = self.slice_tte.tolist()
+        self._slice_params_list = [tuple(p) for p in self.slice_params.tolist()]
+        self.arbitrage_report = arbitrage_report if arbitrage_report is not None else self.check_arbitrage()
+        self.last_update = datetime.now()
+        
+        if not self.arbitrage_report['arbitrage_free']:
+            logger.warning(f"Volatility surface arbitrage: "
+                           f"butterfly {self.arbitrage_report['butterfly_violations']}, "
+                           f"calendar {self.arbitrage_report['calendar_violations']}")
+                           
+        logger.info(f"Built SVI volatility surface: {len(dtes)} expiries, "
+                    f"{sum(s['points'] for s in self.slices.values())} points")
+        return True
+        
+    def check_arbitrage(self, k_grid: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """
+        Static arbitrage checks on the fitted surface
+        
+        Butterfly: g(k) >= 0 on each slice. Calendar: total variance
+        non-decreasing in expiry at every log-moneyness. Only quoted
+        log-moneyness is checked (each slice's fitted range, and the overlap
+        of both ranges for a calendar pair): extrapolated SVI wings of short
+        expiries say nothing about the quotes.
+        
+        Args:
+            k_grid: Log-moneyness grid (default 101 points spanning each range)
+            
+        Returns:
+            Dict with violating expiries (DTE) and an overall flag
+        """
+        def quoted_grid(lo: float, hi: float) -> np.ndarray:
+            if k_grid is None:
+                return np.linspace(lo, hi, 101)
+            return k_grid[(k_grid >= lo) & (k_grid <= hi)]
+            
+        dtes = sorted(self.slices)
+        butterfly = []
+        for d in dtes:
+            k = quoted_grid(*self.slices[d]['k_range'])
+            if len(k) and np.nanmin(svi_butterfly_density(self.slices[d]['params'], k)) < -1e-8:
+                butterfly.append(d)
+                
+        calendar = []
+        for near, far in zip(dtes, dtes[1:]):
+            k = quoted_grid(max(self.slices[near]['k_range'][0], self.slices[far]['k_range'][0]),
+                            min(self.slices[near]['k_range'][1], self.slices[far]['k_range'][1]))
+            if len(k) and (svi_total_variance(self.slices[far]['params'], k)
+                           - svi_total_variance(self.slices[near]['params'], k) < -1e-8).any():
+                calendar.append((near, far))
+                
+        return {
+            'butterfly_violations': butterfly,
+            'calendar_violations': calendar,
+            'arbitrage_free': not butterfly and not calendar
+        }
+        
     def get_implied_volatility(self, strike: float, tte: float, underlying_price: float) -> float:
         """
         Get interpolated implied volatility
@@ -122,37 +439,162 @@ class VolatilitySurface:
         Returns:
             Interpolated implied volatility
         """
-        if self.interpolator is None:
+        if not self.is_built:
             return 0.2  # Default 20% volatility
             
-        try:
-            moneyness = strike / underlying_price
-            iv = self.interpolator(moneyness, tte)
+        # Scalar path in plain floats: no array allocation per query
+        k = math.log(strike / underlying_price)
+        t = max(tte, 1.0 / (365.0 * 24 * 60))
+        ttes = self._slice_tte_list
+        if len(ttes) == 1:
+            # Single expiry: flat volatility in time
+            total_variance = self._svi_scalar(self._slice_params_list[0], k) * t / ttes[0]
+            iv = math.sqrt(max(total_variance, 0.0) / t)
+            return min(max(iv, 0.01), 5.0)
             
-            # Handle NaN or extreme values
-            if np.isnan(iv) or iv <= 0 or iv > 5.0:
-                # Fallback to nearest neighbor or default
-                return self._get_fallback_volatility(moneyness, tte)
-                
-            return float(iv)
+        upper = min(max(bisect_left(ttes, t), 1), len(ttes) - 1)
+        lower = upper - 1
+        
+        w_lo = self._svi_scalar(self._slice_params_list[lower], k)
+        if t <= ttes[0]:
+            total_variance = w_lo * t / ttes[0]
+        elif t >= ttes[-1]:
+            total_variance = self._svi_scalar(self._slice_params_list[upper], k) * t / ttes[-1]
+        else:
+            w_hi = self._svi_scalar(self._slice_params_list[upper], k)
+            total_variance = w_lo + (t - ttes[lower]) / (ttes[upper] - ttes[lower]) * (w_hi - w_lo)
             
-        except Exception as e:
-            logger.warning(f"Volatility interpolation failed: {e}")
-            return 0.2  # Default volatility
-    
-    def _get_fallback_volatility(self, moneyness: float, tte: float) -> float:
-        """Get fallback volatility when interpolation fails"""
-        if self.surface_data is None or self.surface_data.empty:
-            return 0.2
-            
-        # Find nearest point in surface
-        distances = np.sqrt(
-            (self.surface_data['moneyness'] - moneyness) ** 2 +
-            (self.surface_data['time_to_expiration'] - tte) ** 2
-        )
+        iv = math.sqrt(max(total_variance, 0.0) / t)
+        return min(max(iv, 0.01), 5.0)
+        
+    @staticmethod
+    def _svi_scalar(params: Tuple[float, ...], k: float) -> float:
+        a, b, rho, m, sigma = params
+        x = k - m
+        return a + b * (rho * x + math.sqrt(x * x + sigma * sigma))
+        
+    def get_implied_volatilities(self, strikes: np.ndarray, ttes: np.ndarray,
+                                 underlying_price: float) -> np.ndarray:
+        """
+        Implied volatilities for many points at once
+        
+        Args:
+            strikes: Strike prices
+            ttes: Times to expiration in years
+            underlying_price: Current underlying price
+            
+        Returns:
+            Array of implied volatilities
+        """
+        strikes = np.asarray(strikes, dtype=np.float64)
+        ttes = np.broadcast_to(np.asarray(ttes, dtype=np.float64), strikes.shape)
         
-        nearest_idx = distances.idxmin()
-        return self.surface_data.loc[nearest_idx, 'implied_volatility']
+        if not self.is_built:
+            return np.full(strikes.shape, 0.2)
+            
+        k = np.log(strikes / underlying_price)
+        t = np.maximum(ttes, 1.0 / (365.0 * 24 * 60))  # At least one minute
+        n = len(self.slice_tte)
+        
+        if n == 1:
+            # Single expiry: flat volatility in time
+            total_variance = svi_total_variance(self.slice_params[0], k) * t / self.slice_tte[0]
+            return np.clip(np.sqrt(np.maximum(total_variance, 0.0) / t), 0.01, 5.0)
+            
+        # Neighbouring expiries and linear weight in time
+        upper = np.clip(np.searchsorted(self.slice_tte, t), 1, n - 1)
+        lower = upper - 1
+        t_lo, t_hi = self.slice_tte[lower], self.slice_tte[upper]
+        
+        w_lo = svi_total_variance(self.slice_params[lower], k)
+        w_hi = svi_total_variance(self.slice_params[upper], k)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weight = np.where(t_hi > t_lo, (t - t_lo) / (t_hi - t_lo), 0.0)
+        total_variance = w_lo + np.clip(weight, 0.0, 1.0) * (w_hi - w_lo)
+        
+        # Flat volatility outside the fitted expiries
+        total_variance = np.where(t < self.slice_tte[0], w_lo * t / self.slice_tte[0], total_variance)
+        total_variance = np.where(t > self.slice_tte[-1], w_hi * t / self.slice_tte[-1], total_variance)
+        
+        iv = np.sqrt(np.maximum(total_variance, 0.0) / t)
+        return np.clip(iv, 0.01, 5.0)
+
+class SurfaceCache:
+    """
+    Small LRU of fitted surfaces keyed by chain snapshot hash
+    
+    Snapshot keys are blake2b digests of the per-expiry quote hashes, so a
+    chain seen before (e.g. re-evaluating signals on the same bar) restores
+    its SVI parameters without fitting.
+    """
+    
+    def __init__(self, max_entries: int = 8):
+        """
+        Initialize cache
+        
+        Args:
+            max_entries: Snapshots kept before evicting the least recently used
+        """
+        self.max_entries = max_entries
+        self.entries: OrderedDict = OrderedDict()
+        
+        self.hits = 0
+        self.misses = 0
+        self.slices_refit = 0
+        self.slices_reused = 0
+        
+    @staticmethod
+    def slice_hash(dte: int, quotes: pd.DataFrame) -> str:
+        """Digest of one expiry's (log-moneyness, total variance) quotes"""
+        ordered = quotes.sort_values('log_moneyness', kind='stable')
+        digest = hashlib.blake2b(str(dte).encode(), digest_size=16)
+        digest.update(np.ascontiguousarray(ordered['log_moneyness'].to_numpy()).tobytes())
+        digest.update(np.ascontiguousarray(ordered['total_variance'].to_numpy()).tobytes())
+        return digest.hexdigest()
+        
+    @staticmethod
+    def chain_hash(slice_hashes: Dict[int, str]) -> str:
+        """Digest of a whole chain snapshot from its slice hashes"""
+        digest = hashlib.blake2b(digest_size=16)
+        for dte in sorted(slice_hashes):
+            digest.update(slice_hashes[dte].encode())
+        return digest.hexdigest()
+        
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached fit for a snapshot (marks it most recently used)"""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+            
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+        
+    def put(self, key: str, slices: Dict[int, Dict[str, Any]], arbitrage_report: Dict[str, Any]):
+        """Store a fitted snapshot"""
+        self.entries[key] = {'slices': dict(slices), 'arbitrage_report': arbitrage_report}
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            
+    def record_refits(self, refit: int, reused: int):
+        """Count slices refit vs reused by an incremental update"""
+        self.slices_refit += refit
+        self.slices_reused += reused
+        
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache effectiveness counters"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'slices_refit': self.slices_refit,
+            'slices_reused': self.slices_reused
+        }
 
 class BlackScholesCalculator:
     """
@@ -258,40 +700,196 @@ class BlackScholesCalculator:
             logger.warning(f"Greeks calculation failed: {e}")
             return {'delta': 0.0, 'gamma': 0.0, 'theta': 0.0, 'vega': 0.0, 'rho': 0.0}
 
+    @staticmethod
+    def calculate_option_prices(S, K, T, r, sigma, is_call, q=0.0) -> np.ndarray:
+        """
+        Black-Scholes prices for arrays of contracts
+        
+        All arguments broadcast against each other. Contracts with
+        non-positive time, volatility, spot or strike price at 0, as in
+        calculate_option_price.
+        
+        Args:
+            S: Underlying price(s)
+            K: Strike prices
+            T: Times to expiration (years)
+            r: Risk-free rate(s)
+            sigma: Volatilities
+            is_call: Boolean call mask (see option_type_mask)
+            q: Continuous dividend yield(s)
+            
+        Returns:
+            Array of option prices
+        """
+        return BlackScholesCalculator.calculate_greeks_vectorized(
+            S, K, T, r, sigma, is_call, q=q, greeks=False
+        )['price']
+        
+    @staticmethod
+    def calculate_greeks_vectorized(S, K, T, r, sigma, is_call, q=0.0, greeks: bool = True,
+                                    higher_order: bool = False) -> Dict[str, np.ndarray]:
+        """
+        Black-Scholes price and Greeks for a whole option chain in one pass
+        
+        d1, d2, the normal PDF/CDF values and the discount factors are
+        computed once and shared by every output. With a dividend yield q
+        the forward is S*exp((r - q)T). Units match calculate_greeks: theta
+        per day, vega and rho per 1% move. Higher-order Greeks reuse the same
+        intermediates: vanna (delta per 1% vol), volga (vega per 1% vol),
+        charm (delta change per day), speed (gamma per $1) and color (gamma
+        change per day). Runs the compiled kernel when the numba backend is
+        active (see compiled_kernels) and higher-order Greeks are not needed.
+        
+        Args:
+            S: Underlying price(s)
+            K: Strike prices
+            T: Times to expiration (years)
+            r: Risk-free rate(s)
+            sigma: Volatilities
+            is_call: Boolean call mask (see option_type_mask)
+            q: Continuous dividend yield(s), e.g. per expiry from CarryCurves
+            greeks: Also compute delta/gamma/theta/vega/rho
+            higher_order: Also compute vanna/volga/charm/speed/color
+            
+        Returns:
+            Dict of arrays: price (and delta, gamma, theta, vega, rho, and
+            vanna, volga, charm, speed, color)
+        """
+        if kernel_backend() == 'numba' and not higher_order:
+            return bs_greeks_compiled(S, K, T, r, sigma, is_call, q=q, greeks=greeks)
+            
+        S, K, T, r, q, sigma, is_call = np.broadcast_arrays(
+            np.asarray(S, dtype=np.float64), np.asarray(K, dtype=np.float64),
+            np.asarray(T, dtype=np.float64), np.asarray(r, dtype=np.float64),
+            np.asarray(q, dtype=np.float64), np.asarray(sigma, dtype=np.float64),
+            np.asarray(is_call, dtype=bool)
+        )
+        
+        valid = (T > 0) & (sigma > 0) & (S > 0) & (K > 0)
+        # Substitute harmless values so invalid rows never produce NaN/inf
+        T_safe = np.where(valid, T, 1.0)
+        sigma_safe = np.where(valid, sigma, 1.0)
+        S_safe = np.where(valid, S, 1.0)
+        K_safe = np.where(valid, K, 1.0)
+        
+        sqrt_t = np.sqrt(T_safe)
+        sig_sqrt_t = sigma_safe * sqrt_t
+        d1 = (np.log(S_safe / K_safe) + (r - q + 0.5 * sigma_safe * sigma_safe) * T_safe) / sig_sqrt_t
+        d2 = d1 - sig_sqrt_t
+        
+        # Sign flips puts onto the call formulas: N(sign*d)
+        sign = np.where(is_call, 1.0, -1.0)
+        cdf_d1 = norm_cdf(sign * d1)
+        cdf_d2 = norm_cdf(sign * d2)
+        k_disc = K_safe * np.exp(-r * T_safe)
+        s_disc = S_safe * np.exp(-q * T_safe)
+        
+        price = sign * (s_disc * cdf_d1 - k_disc * cdf_d2)
+        result = {'price': np.where(valid, np.maximum(price, 0.0), 0.0)}
+        
+        if not greeks:
+            return result
+            
+        pdf_d1 = norm_pdf(d1)
+        s_pdf = s_disc * pdf_d1
+        
+        delta = sign * (s_disc / S_safe) * cdf_d1
+        gamma = s_pdf / (S_safe * S_safe * sig_sqrt_t)
+        theta = (-(s_pdf * sigma_safe) / (2 * sqrt_t) - sign * r * k_disc * cdf_d2
+                 + sign * q * s_disc * cdf_d1) / 365
+        vega = s_pdf * sqrt_t / 100
+        rho = sign * T_safe * k_disc * cdf_d2 / 100
+        
+        outputs = [('delta', delta), ('gamma', gamma), ('theta', theta), ('vega', vega), ('rho', rho)]
+        
+        if higher_order:
+            q_pdf = s_pdf / S_safe  # exp(-qT) * N'(d1)
+            # d(d1)/dt as time passes, shared by charm and color
+            drift = (2 * (r - q) * T_safe - d2 * sig_sqrt_t) / (2 * T_safe * sig_sqrt_t)
+            
+            vanna = -q_pdf * d2 / sigma_safe / 100
+            volga = s_pdf * sqrt_t * d1 * d2 / sigma_safe / 10000
+            charm = (sign * q * (s_disc / S_safe) * cdf_d1 - q_pdf * drift) / 365
+            speed = -gamma / S_safe * (d1 / sig_sqrt_t + 1)
+            color = q_pdf / (2 * S_safe * T_safe * sig_sqrt_t) * (2 * q * T_safe + 1 + 2 * T_safe * drift * d1) / 365
+            outputs += [('vanna', vanna), ('volga', volga), ('charm', charm), ('speed', speed), ('color', color)]
+            
+        for name, values in outputs:
+            result[name] = np.where(valid, values, 0.0)
+            
+        return result
+
 class GreeksEngine:
     """
     Advanced Greeks calculation engine with volatility surface modeling
     """
     
-    def __init__(self, risk_free_rate: float = 0.05):
+    PRICING_MODELS = ('black_scholes', 'baw', 'binomial')
+    
+    def __init__(self, risk_free_rate: float = 0.05, pricing_model: str = 'black_scholes',
+                 dividend_yield: float = 0.0, binomial_steps: int = 200,
+                 carry_curves: Optional[CarryCurves] = None):
         """
         Initialize Greeks engine
         
         Args:
             risk_free_rate: Risk-free interest rate (default 5%)
+            pricing_model: 'black_scholes' (European), 'baw' or 'binomial' (American)
+            dividend_yield: Flat continuous dividend yield
+            binomial_steps: Lattice steps for the binomial model
+            carry_curves: Term-structure rates and dividends; overrides the
+                flat rate and dividend yield for chain pricing
         """
+        if pricing_model not in self.PRICING_MODELS:
+            raise ValueError(f"Unknown pricing model '{pricing_model}' (choose from {self.PRICING_MODELS})")
+            
         self.risk_free_rate = risk_free_rate
+        self.dividend_yield = dividend_yield
+        self.carry_curves = carry_curves
+        self.valuation_date: Optional[datetime] = None  # Set by the strategy each trading day
+        self.pricing_model = pricing_model
         self.volatility_surface = VolatilitySurface()
         self.bs_calculator = BlackScholesCalculator()
+        self.american_pricer = None
+        if pricing_model != 'black_scholes':
+            self.american_pricer = AmericanOptionPricer(model=pricing_model, steps=binomial_steps,
+                                                        dividend_yield=dividend_yield)
+        self.iv_solver = None  # Created on first use (see solve_implied_volatilities)
+        self.surface_cache = SurfaceCache()
+        self._surface_snapshot_id = None
         
         # Risk monitoring thresholds
         self.delta_neutral_threshold = 0.1  # +/- 10 delta
         self.gamma_risk_threshold = 50.0    # Gamma exposure limit
         self.vega_risk_threshold = 100.0    # Vega exposure limit
+        self.vanna_risk_threshold = 5.0     # Delta change per 1% vol move
+        self.charm_risk_threshold = 2.0     # Delta drift per day
         
-        logger.info(f"Greeks Engine initialized with risk-free rate: {risk_free_rate:.2%}")
+        logger.info(f"Greeks Engine initialized with risk-free rate: {risk_free_rate:.2%} ({pricing_model})")
         
-    def update_volatility_surface(self, contracts: List[OptionContract]) -> bool:
+    def update_volatility_surface(self, contracts: List[OptionContract],
+                                  snapshot_id: Any = None) -> bool:
         """
         Update volatility surface with new options data
         
+        Fits are cached by chain snapshot and only changed expiries are refit.
+        
         Args:
             contracts: List of option contracts
+            snapshot_id: Optional cheap snapshot identifier (e.g. the quote
+                timestamp); a repeat id skips even hashing the chain
             
         Returns:
             True if surface updated successfully
         """
-        return self.volatility_surface.build_surface(contracts)
+        if (snapshot_id is not None and snapshot_id == self._surface_snapshot_id
+                and self.volatility_surface.is_built):
+            self.surface_cache.hits += 1
+            return True
+            
+        updated = self.volatility_surface.update_surface(contracts, self.surface_cache)
+        self._surface_snapshot_id = snapshot_id if updated else None
+        return updated
         
     def calculate_enhanced_greeks(self, contract: OptionContract, 
                                 current_underlying_price: float) -> Dict[str, float]:
@@ -311,6 +909,9 @@ class GreeksEngine:
             
             if tte <= 0:
                 return {'delta': 0.0, 'gamma': 0.0, 'theta': 0.0, 'vega': 0.0, 'rho': 0.0}
+                
+            if self.american_pricer is not None or self.carry_curves is not None or self.dividend_yield:
+                return self.calculate_chain_greeks([contract], current_underlying_price).iloc[0].to_dict()
             
             # Get interpolated volatility from surface
             sigma = self.volatility_surface.get_implied_volatility(
@@ -347,6 +948,125 @@ class GreeksEngine:
             # Fallback to basic calculation
             return self._calculate_basic_greeks(contract, current_underlying_price)
     
+    def calculate_chain_greeks(self, contracts: Union[List[OptionContract], OptionChain],
+                               current_underlying_price: float,
+                               use_surface: bool = True) -> pd.DataFrame:
+        """
+        Price and Greeks for an entire chain in one vectorized pass
+        
+        Uses the engine's pricing model; American models take Greeks by
+        finite differences over one stacked batch of bumped inputs.
+        Higher-order Greeks (vanna, volga, charm, speed, color) come from the
+        Black-Scholes kernel in the same pass (a European approximation
+        under the American models).
+        
+        Args:
+            contracts: Option contracts or an OptionChain (columns read directly)
+            current_underlying_price: Current underlying price
+            use_surface: Take volatility from the surface (default) instead
+                of each contract's own implied volatility
+                
+        Returns:
+            DataFrame aligned with contracts: delta, gamma, theta, vega, rho,
+            vanna, volga, charm, speed, color, theoretical_price and
+            implied_volatility_used
+        """
+        if not contracts:
+            return pd.DataFrame(columns=list(PORTFOLIO_GREEKS) + ['theoretical_price', 'implied_volatility_used'])
+                                         
+        if isinstance(contracts, OptionChain):
+            strikes, tte, is_call = contracts.strike, contracts.tte, contracts.is_call
+        else:
+            strikes = np.fromiter((c.strike for c in contracts), dtype=np.float64, count=len(contracts))
+            tte = np.fromiter((c.days_to_expiration for c in contracts), dtype=np.float64,
+                              count=len(contracts)) / 365.0
+            is_call = np.fromiter((c.option_type == OptionType.CALL for c in contracts), dtype=bool,
+                                  count=len(contracts))
+                                  
+        if use_surface:
+            sigma = self.volatility_surface.get_implied_volatilities(strikes, tte, current_underlying_price)
+        else:
+            if isinstance(contracts, OptionChain):
+                sigma = contracts.implied_volatility
+            else:
+                sigma = np.fromiter((c.implied_volatility for c in contracts), dtype=np.float64,
+                                    count=len(contracts))
+            sigma = np.where(sigma > 0, sigma, 0.2)
+            
+        r, q = self.carry_terms(tte, current_underlying_price)
+        greeks = self.bs_calculator.calculate_greeks_vectorized(
+            current_underlying_price, strikes, tte, r, sigma, is_call, q=q, higher_order=True
+        )
+        if self.american_pricer is not None:
+            greeks.update(self.american_pricer.calculate_greeks(
+                current_underlying_price, strikes, tte, r, sigma, is_call, q=q
+            ))
+            
+        columns = {name: greeks[name] for name in PORTFOLIO_GREEKS}
+        columns['theoretical_price'] = greeks['price']
+        columns['implied_volatility_used'] = sigma
+        return pd.DataFrame(columns)
+        
+    def carry_terms(self, tte: np.ndarray, current_underlying_price: float,
+                    as_of: Optional[datetime] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Per-contract risk-free rate and carry (dividend) yield
+        
+        Args:
+            tte: Times to expiration (years)
+            current_underlying_price: Current underlying price
+            as_of: Valuation date for carry curves (default valuation_date)
+            
+        Returns:
+            Tuple of (r, q) arrays; the flat rate and dividend yield unless
+            carry curves are configured
+        """
+        if self.carry_curves is not None:
+            as_of = as_of if as_of is not None else self.valuation_date
+            if as_of is None:
+                raise ValueError("Carry curves need a valuation date (set valuation_date or pass as_of)")
+            return self.carry_curves.carry(tte, current_underlying_price, as_of)
+        tte = np.asarray(tte, dtype=np.float64)
+        return np.full(tte.shape, self.risk_free_rate), np.full(tte.shape, self.dividend_yield)
+        
+    def solve_implied_volatilities(self, contracts: List[OptionContract],
+                                   current_underlying_price: Optional[float] = None,
+                                   update_contracts: bool = False) -> np.ndarray:
+        """
+        Back out implied volatility for a chain from mid prices
+        
+        Uses the same per-contract (r, q) as chain pricing (carry_terms), so
+        the solved IVs and any surface fitted to them reprice the quotes.
+        
+        Args:
+            contracts: Option contracts
+            current_underlying_price: Spot override (default each contract's underlying_price)
+            update_contracts: Write solved IVs back to the contracts
+            
+        Returns:
+            Array of implied volatilities aligned with contracts (NaN if unsolvable)
+        """
+        from options_backtesting.implied_volatility import ImpliedVolatilitySolver
+        
+        if self.iv_solver is None:
+            self.iv_solver = ImpliedVolatilitySolver()
+            
+        if current_underlying_price is None:
+            spot = np.fromiter((c.underlying_price for c in contracts), dtype=np.float64, count=len(contracts))
+        else:
+            spot = current_underlying_price
+        tte = np.fromiter((c.days_to_expiration for c in contracts), dtype=np.float64,
+                          count=len(contracts)) / 365.0
+        r, q = self.carry_terms(tte, spot)
+        ivs = self.iv_solver.solve_contracts(contracts, r, current_underlying_price, dividend_yield=q)
+        
+        if update_contracts:
+            for contract, iv in zip(contracts, ivs):
+                if np.isfinite(iv):
+                    contract.implied_volatility = float(iv)
+                    
+        return ivs
+        
     def _calculate_basic_greeks(self, contract: OptionContract, 
                               current_underlying_price: float) -> Dict[str, float]:
         """Fallback basic Greeks calculation"""
@@ -377,32 +1097,18 @@ class GreeksEngine:
         Returns:
             Portfolio Greeks dictionary
         """
-        total_delta = 0.0
-        total_gamma = 0.0
-        total_theta = 0.0
-        total_vega = 0.0
-        total_rho = 0.0
-        
-        for position in positions:
-            contract = position['contract']
-            quantity = position['quantity']
-            
-            # Calculate Greeks for this contract
-            greeks = self.calculate_enhanced_greeks(contract, current_underlying_price)
+        if not positions:
+            return {f"portfolio_{name}": 0.0 for name in PORTFOLIO_GREEKS}
             
-            # Add to portfolio totals (multiply by quantity)
-            total_delta += greeks['delta'] * quantity
-            total_gamma += greeks['gamma'] * quantity
-            total_theta += greeks['theta'] * quantity
-            total_vega += greeks['vega'] * quantity
-            total_rho += greeks['rho'] * quantity
+        # All legs in one vectorized pass, then quantity-weighted sums
+        contracts = [position['contract'] for position in positions]
+        quantity = np.fromiter((position['quantity'] for position in positions), dtype=np.float64,
+                               count=len(positions))
+        greeks = self.calculate_chain_greeks(contracts, current_underlying_price)
         
         return {
-            'portfolio_delta': total_delta,
-            'portfolio_gamma': total_gamma,
-            'portfolio_theta': total_theta,
-            'portfolio_vega': total_vega,
-            'portfolio_rho': total_rho
+            f"portfolio_{name}": float(greeks[name].to_numpy() @ quantity)
+            for name in PORTFOLIO_GREEKS
         }
     
     def analyze_risk_metrics(self, portfolio_greeks: Dict[str, float]) -> Dict[str, Any]:
@@ -418,6 +1124,8 @@ class GreeksEngine:
         delta = portfolio_greeks.get('portfolio_delta', 0)
         gamma = portfolio_greeks.get('portfolio_gamma', 0)
         vega = portfolio_greeks.get('portfolio_vega', 0)
+        vanna = portfolio_greeks.get('portfolio_vanna', 0)
+        charm = portfolio_greeks.get('portfolio_charm', 0)
         
         risk_analysis = {
             'delta_neutral': abs(delta) <= self.delta_neutral_threshold,
@@ -437,6 +1145,13 @@ class GreeksEngine:
         
         if abs(vega) > self.vega_risk_threshold:
             risk_analysis['risk_warnings'].append(f"High vega exposure: {vega:.2f}")
+            
+        # Delta instability: how fast delta moves with volatility and time
+        if abs(vanna) > self.vanna_risk_threshold:
+            risk_analysis['risk_warnings'].append(f"High vanna exposure: delta moves {vanna:.2f} per vol point")
+            
+        if abs(charm) > self.charm_risk_threshold:
+            risk_analysis['risk_warnings'].append(f"High charm exposure: delta drifts {charm:.2f} per day")
         
         return risk_analysis
     
@@ -453,6 +1168,9 @@ class GreeksEngine:
         """
         Simulate portfolio P&L impact from underlying price changes
         
+        Delta/gamma/theta approximation only; use risk_engine.BatchRiskEngine
+        for full revaluation over spot x vol x time grids.
+        
         Args:
             portfolio_greeks: Portfolio Greeks
             price_changes: List of price change scenarios (percentage)
@@ -518,6 +1236,79 @@ def main():
     for greek, value in greeks.items():
         print(f"  {greek.capitalize()}: {value:.4f}")
     
+    # Test vectorized chain pricing against the scalar path
+    print(f"\nTesting vectorized chain Greeks:")
+    
+    rng = np.random.default_rng(16)
+    n = 20000
+    strikes = np.round(rng.uniform(500, 770, n))
+    ttes = rng.integers(1, 365, n) / 365.0
+    sigmas = rng.uniform(0.1, 0.6, n)
+    is_call = rng.random(n) < 0.5
+    
+    start = datetime.now()
+    chain = engine.bs_calculator.calculate_greeks_vectorized(636.0, strikes, ttes, 0.05, sigmas, is_call)
+    vector_ms = (datetime.now() - start).total_seconds() * 1000
+    
+    sample = 500
+    start = datetime.now()
+    max_error = 0.0
+    for i in range(sample):
+        option_type = OptionType.CALL if is_call[i] else OptionType.PUT
+        scalar = engine.bs_calculator.calculate_greeks(636.0, strikes[i], ttes[i], 0.05, sigmas[i], option_type)
+        max_error = max(max_error, *(abs(scalar[g] - chain[g][i]) for g in scalar))
+    scalar_ms = (datetime.now() - start).total_seconds() * 1000 * n / sample
+    
+    print(f"  {n:,} contracts: vectorized {vector_ms:.1f}ms vs scalar ~{scalar_ms:,.0f}ms")
+    print(f"  Max abs difference vs scalar: {max_error:.2e}")
+    
+    # Test SVI surface fit on a synthetic skewed chain
+    print(f"\nTesting SVI volatility surface:")
+    
+    true_params = {14: [0.001, 0.03, -0.6, 0.01, 0.06], 45: [0.005, 0.05, -0.6, 0.01, 0.09],
+                   90: [0.010, 0.07, -0.5, 0.02, 0.11]}
+    contracts = []
+    for dte, params in true_params.items():
+        for strike in range(560, 720, 5):
+            total_variance = svi_total_variance(np.array(params), np.log(strike / 636.0))
+            iv = float(np.sqrt(total_variance / (dte / 365.0)))
+            option_type = OptionType.PUT if strike < 636 else OptionType.CALL
+            contracts.append(OptionContract(
+                symbol=f"SPY{dte}{option_type.value}{strike}", underlying='SPY', strike=float(strike),
+                expiration='', option_type=option_type, bid=1.0, ask=1.1, last=1.05, volume=100,
+                open_interest=100, delta=0.0, gamma=0.0, theta=0.0, vega=0.0, implied_volatility=iv,
+                mid_price=0.0, days_to_expiration=dte, underlying_price=636.0, moneyness=strike / 636.0
+            ))
+            
+    engine.update_volatility_surface(contracts)
+    surface = engine.volatility_surface
+    fit_error = max(abs(surface.get_implied_volatility(c.strike, c.days_to_expiration / 365.0, 636.0)
+                        - c.implied_volatility) for c in contracts)
+    print(f"  Expiries fitted: {sorted(surface.slices)}")
+    print(f"  Max IV error at quotes: {fit_error:.2e}")
+    print(f"  Arbitrage free: {surface.arbitrage_report['arbitrage_free']}")
+    
+    start = datetime.now()
+    surface.get_implied_volatilities(strikes, ttes, 636.0)
+    lookup_ms = (datetime.now() - start).total_seconds() * 1000
+    print(f"  {n:,} surface lookups: {lookup_ms:.1f}ms")
+    
+    # Same snapshot again, then a quote change in the front expiry only
+    engine.update_volatility_surface(contracts)
+    for contract in contracts:
+        if contract.days_to_expiration == 14:
+            contract.implied_volatility *= 1.02
+    engine.update_volatility_surface(contracts)
+    print(f"  Surface cache: {engine.surface_cache.get_stats()}")
+
+    # A single fitted expiry scales its smile flat in time
+    single = GreeksEngine(risk_free_rate=0.05)
+    single.update_volatility_surface([c for c in contracts if c.days_to_expiration == 45])
+    single_ivs = single.volatility_surface.get_implied_volatilities(strikes, ttes, 636.0)
+    single_error = max(abs(single.volatility_surface.get_implied_volatility(strikes[i], ttes[i], 636.0)
+                           - single_ivs[i]) for i in range(sample))
+    print(f"  Single expiry: vector vs scalar max difference {single_error:.2e}")
+
     # Test risk analysis
     print(f"\nTesting portfolio risk analysis:")
     
@@ -526,7 +1317,9 @@ def main():
         'portfolio_gamma': 15.8,
         'portfolio_theta': 12.4,
         'portfolio_vega': -35.6,
-        'portfolio_rho': 8.1
+        'portfolio_rho': 8.1,
+        'portfolio_vanna': -6.3,
+        'portfolio_charm': 2.7
     }
     
     risk_analysis = engine.analyze_risk_metrics(portfolio_greeks)
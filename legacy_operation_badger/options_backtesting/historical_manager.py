@@ -22,7 +22,7 @@ import json
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, Optional, Tuple, Any
 import logging
 import sqlite3
 from pathlib import Path
@@ -34,7 +34,9 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from options_data.theta_data_client import ThetaDataClient
 from options_data.yfinance_options_client import YFinanceOptionsClient
-from options_backtesting.core_engine import OptionContract, OptionType
+from options_backtesting.option_chain import OptionChain
+from options_backtesting.implied_volatility import ImpliedVolatilitySolver
+from options_backtesting.rate_curves import CarryCurves
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -52,13 +54,19 @@ class HistoricalOptionsManager:
     Integrates multiple data sources with intelligent caching
     """
     
-    def __init__(self, cache_dir: str = "options_cache", enable_cache: bool = True):
+    def __init__(self, cache_dir: str = "options_cache", enable_cache: bool = True,
+                 risk_free_rate: float = 0.05, dividend_yield: float = 0.0,
+                 carry_curves: Optional[CarryCurves] = None):
         """
         Initialize historical options manager
         
         Args:
             cache_dir: Directory for caching options data
             enable_cache: Whether to enable local caching
+            risk_free_rate: Rate used when re-solving implied volatility
+            dividend_yield: Flat dividend yield used when re-solving implied volatility
+            carry_curves: Term-structure rates and dividends; overrides the
+                flat rate and dividend yield (use the pricing engine's curves)
         """
         self.cache_dir = Path(cache_dir)
         self.enable_cache = enable_cache
@@ -78,6 +86,12 @@ class HistoricalOptionsManager:
         self.max_spread_pct = 0.5  # 50% max bid-ask spread
         self.min_open_interest = 5
         
+        # Re-solve missing or garbage vendor IVs from mid prices
+        self.risk_free_rate = risk_free_rate
+        self.dividend_yield = dividend_yield
+        self.carry_curves = carry_curves
+        self.iv_solver = ImpliedVolatilitySolver()
+        
         logger.info("Historical Options Manager initialized")
         logger.info(f"Cache directory: {self.cache_dir}")
         logger.info(f"Cache enabled: {enable_cache}")
@@ -130,7 +144,7 @@ class HistoricalOptionsManager:
         return hashlib.md5(key_string.encode()).hexdigest()
         
     def get_options_chain(self, symbol: str, date: str, 
-                         prefer_theta: bool = True) -> List[OptionContract]:
+                         prefer_theta: bool = True) -> OptionChain:
         """
         Get options chain for a specific symbol and date
         
@@ -140,7 +154,7 @@ class HistoricalOptionsManager:
             prefer_theta: Whether to prefer Theta Data over yfinance
             
         Returns:
-            List of OptionContract objects
+            OptionChain (list-compatible; empty if no data)
         """
         logger.info(f"Requesting options chain for {symbol} on {date}")
         
@@ -159,7 +173,7 @@ class HistoricalOptionsManager:
                 if source == DataSource.THETA_DATA:
                     raw_data = self._get_theta_data(symbol, date)
                     if raw_data is not None and not raw_data.empty:
-                        contracts = self._convert_to_contracts(raw_data, DataSource.THETA_DATA)
+                        contracts = self._convert_to_chain(raw_data, DataSource.THETA_DATA)
                         break
                         
                 elif source == DataSource.YFINANCE:
@@ -167,7 +181,7 @@ class HistoricalOptionsManager:
                     if self._is_recent_date(date):
                         raw_data = self._get_yfinance_data(symbol)
                         if raw_data is not None and not raw_data.empty:
-                            contracts = self._convert_to_contracts(raw_data, DataSource.YFINANCE)
+                            contracts = self._convert_to_chain(raw_data, DataSource.YFINANCE)
                             break
                     else:
                         logger.info(f"Date {date} too old for yfinance, skipping")
@@ -178,10 +192,10 @@ class HistoricalOptionsManager:
                 continue
         else:
             logger.error(f"Failed to retrieve options data for {symbol} on {date}")
-            return []
+            return OptionChain.from_contracts([])
         
         # Validate and filter data quality
-        contracts = self._validate_data_quality(contracts)
+        contracts = self._validate_data_quality(contracts, date)
         
         # Cache the results
         if self.enable_cache and contracts:
@@ -214,90 +228,58 @@ class HistoricalOptionsManager:
         except:
             return False
             
-    def _convert_to_contracts(self, df: pd.DataFrame, source: DataSource) -> List[OptionContract]:
-        """Convert DataFrame to OptionContract objects"""
-        contracts = []
+    def _convert_to_chain(self, df: pd.DataFrame, source: DataSource) -> OptionChain:
+        """
+        Convert a Theta Data / yfinance / cache DataFrame to an OptionChain
         
-        for _, row in df.iterrows():
-            try:
-                # Handle different column naming between sources
-                if source == DataSource.THETA_DATA:
-                    option_type = OptionType.CALL if row.get('option_type', 'C') == 'C' else OptionType.PUT
-                else:  # yfinance
-                    option_type = OptionType.CALL if row.get('option_type', 'C') == 'C' else OptionType.PUT
-                
-                contract = OptionContract(
-                    symbol=row.get('contract_symbol', f"{row.get('underlying', 'SPY')}{row.get('expiration', '')}{option_type.value}{int(row.get('strike', 0)*1000):08d}"),
-                    underlying=row.get('underlying', 'SPY'),
-                    strike=float(row.get('strike', 0)),
-                    expiration=row.get('expiration', ''),
-                    option_type=option_type,
-                    
-                    # Market data (handle NaN values)
-                    bid=float(row.get('bid', 0)) if pd.notna(row.get('bid', 0)) else 0.0,
-                    ask=float(row.get('ask', 0)) if pd.notna(row.get('ask', 0)) else 0.0,
-                    last=float(row.get('last', 0)) if pd.notna(row.get('last', 0)) else 0.0,
-                    volume=int(row.get('volume', 0)) if pd.notna(row.get('volume', 0)) else 0,
-                    open_interest=int(row.get('open_interest', 0)) if pd.notna(row.get('open_interest', 0)) else 0,
-                    
-                    # Greeks (handle NaN values)
-                    delta=float(row.get('delta', 0)) if pd.notna(row.get('delta', 0)) else 0.0,
-                    gamma=float(row.get('gamma', 0)) if pd.notna(row.get('gamma', 0)) else 0.0,
-                    theta=float(row.get('theta', 0)) if pd.notna(row.get('theta', 0)) else 0.0,
-                    vega=float(row.get('vega', 0)) if pd.notna(row.get('vega', 0)) else 0.0,
-                    implied_volatility=float(row.get('implied_volatility', 0)) if pd.notna(row.get('implied_volatility', 0)) else 0.0,
-                    
-                    # Derived fields (handle NaN values)
-                    mid_price=float(row.get('mid_price', 0)) if pd.notna(row.get('mid_price', 0)) else 0.0,
-                    days_to_expiration=int(row.get('days_to_expiration', 0)) if pd.notna(row.get('days_to_expiration', 0)) else 0,
-                    underlying_price=float(row.get('underlying_price', 0)) if pd.notna(row.get('underlying_price', 0)) else 0.0,
-                    moneyness=float(row.get('moneyness', 1.0)) if pd.notna(row.get('moneyness', 1.0)) else 1.0
-                )
-                
-                contracts.append(contract)
-                
-            except Exception as e:
-                logger.warning(f"Failed to convert row to contract: {e}")
-                continue
-                
-        return contracts
+        Both sources share column names; conversion is columnar (no per-row
+        OptionContract construction).
+        """
+        return OptionChain.from_dataframe(df)
         
-    def _validate_data_quality(self, contracts: List[OptionContract]) -> List[OptionContract]:
+    def _validate_data_quality(self, chain: OptionChain, date: str) -> OptionChain:
         """Filter contracts based on data quality criteria"""
-        if not contracts:
-            return contracts
+        if not len(chain):
+            return chain
             
-        initial_count = len(contracts)
+        initial_count = len(chain)
+        bid, ask, mid = chain.bid, chain.ask, chain.mid_price
         
-        # Filter criteria
-        quality_contracts = []
+        # Skip if no bid/ask or wide spreads
+        keep = (bid > 0) & (ask > 0)
+        spread_pct = np.divide(ask - bid, mid, out=np.ones_like(mid), where=mid > 0)
+        keep &= spread_pct <= self.max_spread_pct
         
-        for contract in contracts:
-            # Skip if no bid/ask or wide spreads
-            if contract.bid <= 0 or contract.ask <= 0:
-                continue
-                
-            spread_pct = (contract.ask - contract.bid) / contract.mid_price if contract.mid_price > 0 else 1.0
-            if spread_pct > self.max_spread_pct:
-                continue
-                
-            # Skip low volume/open interest (except for very short DTE)
-            if contract.days_to_expiration > 7:
-                if contract.volume < self.min_volume_threshold and contract.open_interest < self.min_open_interest:
-                    continue
-            
-            # Skip if IV is unreasonable
-            if contract.implied_volatility <= 0 or contract.implied_volatility > 5.0:  # 500% IV cap
-                continue
-                
-            quality_contracts.append(contract)
+        # Skip low volume/open interest (except for very short DTE)
+        keep &= ~((chain.days_to_expiration > 7) & (chain.volume < self.min_volume_threshold)
+                  & (chain.open_interest < self.min_open_interest))
+        chain = chain.select(keep)
+        
+        # Back out IV from mid prices where the vendor IV is unreasonable
+        # (one batched solve instead of dropping the contracts)
+        ivs = chain.implied_volatility
+        bad_iv = ~((ivs > 0) & (ivs <= 5.0))  # 500% IV cap
+        if bad_iv.any():
+            spot, tte = chain.underlying_price[bad_iv], chain.tte[bad_iv]
+            if self.carry_curves is not None:
+                r, q = self.carry_curves.carry(tte, spot, date)
+            else:
+                r, q = self.risk_free_rate, self.dividend_yield
+            solved = self.iv_solver.solve(chain.mid_price[bad_iv], spot, chain.strike[bad_iv], tte, r,
+                                          chain.is_call[bad_iv], q=q)
+            ivs = ivs.copy()
+            ivs[bad_iv] = np.where(np.isfinite(solved), solved, 0.0)
+            chain.set_column('implied_volatility', ivs)
+            repaired = int(np.isfinite(solved).sum())
+            logger.info(f"Re-solved implied volatility for {repaired}/{int(bad_iv.sum())} contracts with bad vendor IV")
+            chain = chain.select((ivs > 0) & (ivs <= 5.0))
             
-        filtered_count = len(quality_contracts)
+        filtered_count = len(chain)
         logger.info(f"Data quality filter: {initial_count} -> {filtered_count} contracts ({(filtered_count/initial_count*100):.1f}% kept)")
         
-        return quality_contracts
+        return chain
         
-    def _get_from_cache(self, symbol: str, date: str) -> Optional[List[OptionContract]]:
+    def _get_from_cache(self, symbol: str, date: str) -> Optional[OptionChain]:
         """Retrieve options chain from cache"""
         if not self.enable_cache:
             return None
@@ -322,14 +304,14 @@ class HistoricalOptionsManager:
                 # Load cached data
                 if os.path.exists(file_path):
                     df = pd.read_csv(file_path)
-                    return self._convert_to_contracts(df, DataSource(data_source))
+                    return self._convert_to_chain(df, DataSource(data_source))
                     
         except Exception as e:
             logger.warning(f"Cache retrieval error: {e}")
             
         return None
         
-    def _save_to_cache(self, symbol: str, date: str, contracts: List[OptionContract], source: DataSource):
+    def _save_to_cache(self, symbol: str, date: str, contracts: OptionChain, source: DataSource):
         """Save options chain to cache"""
         if not self.enable_cache or not contracts:
             return
@@ -337,32 +319,8 @@ class HistoricalOptionsManager:
         try:
             cache_key = self._generate_cache_key(symbol, date, source.value)
             
-            # Convert contracts back to DataFrame for storage
-            df_data = []
-            for contract in contracts:
-                df_data.append({
-                    'symbol': contract.symbol,
-                    'underlying': contract.underlying,
-                    'strike': contract.strike,
-                    'expiration': contract.expiration,
-                    'option_type': contract.option_type.value,
-                    'bid': contract.bid,
-                    'ask': contract.ask,
-                    'last': contract.last,
-                    'volume': contract.volume,
-                    'open_interest': contract.open_interest,
-                    'delta': contract.delta,
-                    'gamma': contract.gamma,
-                    'theta': contract.theta,
-                    'vega': contract.vega,
-                    'implied_volatility': contract.implied_volatility,
-                    'mid_price': contract.mid_price,
-                    'days_to_expiration': contract.days_to_expiration,
-                    'underlying_price': contract.underlying_price,
-                    'moneyness': contract.moneyness
-                })
-                
-            df = pd.DataFrame(df_data)
+            # Columnar chain -> DataFrame without per-contract dicts
+            df = contracts.to_dataframe()
             
             # Save to file
             file_path = self.cache_dir / f"{cache_key}.csv"
@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Sprint 16: Implied Volatility Solver
+Batched implied volatility inversion for entire option chains
+
+Vendor implied volatilities (especially yfinance) are frequently zero or
+stale. This module backs IV out of mid prices for a whole chain at once so
+contracts with bad vendor IV stay usable and IV can be re-solved cheaply at
+every timestamp of a backtest.
+
+Key Features:
+- Corrado-Miller rational initial guess (usually within a few vol points)
+- Vectorized Halley iterations using the shared d1/d2 intermediates
+- Per-contract bracketing with bisection fallback when a step leaves the bracket
+- Arbitrage-bound checks (prices outside no-arbitrage bounds return NaN)
+- Only unconverged contracts are iterated
+- Compiled per-contract kernel when the numba backend is active
+"""
+
+import os
+import sys
+import numpy as np
+from datetime import datetime
+from typing import List, Optional
+import logging
+
+# Add parent directory for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from options_backtesting.core_engine import OptionContract, OptionType
+from options_backtesting.greeks_engine import BlackScholesCalculator, norm_cdf, norm_pdf, option_type_mask
+from options_backtesting.compiled_kernels import kernel_backend, implied_volatility_compiled
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ImpliedVolatilitySolver:
+    """
+    Vectorized Black-Scholes implied volatility solver
+    """
+    
+    def __init__(self, tolerance: float = 1e-8, max_iterations: int = 50,
+                 min_volatility: float = 1e-4, max_volatility: float = 5.0):
+        """
+        Initialize solver
+        
+        Args:
+            tolerance: Absolute price tolerance for convergence
+            max_iterations: Maximum Halley/bisection iterations
+            min_volatility: Lower end of the search bracket
+            max_volatility: Upper end of the search bracket (500% IV cap)
+        """
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        self.min_volatility = min_volatility
+        self.max_volatility = max_volatility
+        
+    def solve(self, prices, S, K, T, r, is_call, q=0.0) -> np.ndarray:
+        """
+        Implied volatilities for arrays of option prices
+        
+        All arguments broadcast against each other. Pass the same (r, q)
+        the pricer uses (GreeksEngine.carry_terms) so solved IVs reprice
+        the quotes exactly.
+        
+        Args:
+            prices: Option prices (typically mids)
+            S: Underlying price(s)
+            K: Strike prices
+            T: Times to expiration (years)
+            r: Risk-free rate(s)
+            is_call: Boolean call mask (see option_type_mask)
+            q: Continuous dividend (carry) yield(s)
+            
+        Returns:
+            Array of implied volatilities; NaN where the price violates
+            no-arbitrage bounds or the inputs are invalid
+        """
+        if kernel_backend() == 'numba':
+            return implied_volatility_compiled(prices, S, K, T, r, is_call, q=q, tolerance=self.tolerance,
+                                               max_iterations=self.max_iterations,
+                                               min_volatility=self.min_volatility,
+                                               max_volatility=self.max_volatility)
+                                               
+        prices, S, K, T, r, q, is_call = np.broadcast_arrays(
+            np.asarray(prices, dtype=np.float64), np.asarray(S, dtype=np.float64),
+            np.asarray(K, dtype=np.float64), np.asarray(T, dtype=np.float64),
+            np.asarray(r, dtype=np.float64), np.asarray(q, dtype=np.float64),
+            np.asarray(is_call, dtype=bool)
+        )
+        result = np.full(prices.shape, np.nan)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Black-Scholes with yield q is Black-Scholes on the spot net of carry
+            S = S * np.exp(-q * T)
+            discounted_k = K * np.exp(-r * T)
+            
+            # No-arbitrage bounds: intrinsic < price < S*exp(-qT) (call) or K*exp(-rT) (put)
+            lower = np.where(is_call, np.maximum(S - discounted_k, 0.0), np.maximum(discounted_k - S, 0.0))
+            upper = np.where(is_call, S, discounted_k)
+            valid = ((T > 0) & (S > 0) & (K > 0) & np.isfinite(prices)
+                     & (prices > lower) & (prices < upper))
+                     
+        idx = np.flatnonzero(valid.ravel())
+        if idx.size == 0:
+            return result
+            
+        target = prices.ravel()[idx]
+        s = S.ravel()[idx]
+        k = K.ravel()[idx]
+        t = T.ravel()[idx]
+        rate = r.ravel()[idx]
+        calls = is_call.ravel()[idx]
+        x = discounted_k.ravel()[idx]
+        
+        sigma = self._initial_guess(target, s, x, t, calls)
+        lo = np.full(idx.size, self.min_volatility)
+        hi = np.full(idx.size, self.max_volatility)
+        solved = np.full(idx.size, np.nan)
+        active = np.arange(idx.size)
+        
+        for _ in range(self.max_iterations):
+            a_sigma = sigma[active]
+            price, vega, volga = self._price_vega_volga(s[active], k[active], t[active], rate[active],
+                                                        a_sigma, calls[active])
+            diff = price - target[active]
+            
+            converged = np.abs(diff) < self.tolerance
+            solved[active[converged]] = a_sigma[converged]
+            
+            # Tighten the bracket: price is increasing in sigma
+            too_high = diff > 0
+            hi[active] = np.where(too_high, np.minimum(hi[active], a_sigma), hi[active])
+            lo[active] = np.where(too_high, lo[active], np.maximum(lo[active], a_sigma))
+            
+            # Halley step, falling back to bisection outside the bracket
+            with np.errstate(divide='ignore', invalid='ignore'):
+                step = 2 * diff * vega / (2 * vega * vega - diff * volga)
+                candidate = a_sigma - step
+            a_lo, a_hi = lo[active], hi[active]
+            bad_step = ~np.isfinite(candidate) | (candidate <= a_lo) | (candidate >= a_hi)
+            sigma[active] = np.where(bad_step, 0.5 * (a_lo + a_hi), candidate)
+            
+            active = active[~converged]
+            if active.size == 0:
+                break
+                
+        # Accept bracket-collapsed solutions for flat-vega contracts (deep ITM/OTM)
+        if active.size:
+            collapsed = (hi[active] - lo[active]) < 1e-6
+            solved[active[collapsed]] = sigma[active[collapsed]]
+            
+        result.ravel()[idx] = solved
+        return result
+        
+    def solve_contracts(self, contracts: List[OptionContract], risk_free_rate=0.05,
+                        underlying_price: Optional[float] = None,
+                        prices: Optional[np.ndarray] = None,
+                        dividend_yield=0.0) -> np.ndarray:
+        """
+        Implied volatilities for a list of contracts from their mid prices
+        
+        Args:
+            contracts: Option contracts
+            risk_free_rate: Risk-free rate (scalar or per contract)
+            underlying_price: Spot override (default each contract's underlying_price)
+            prices: Price override (default each contract's mid_price)
+            dividend_yield: Continuous dividend (carry) yield (scalar or per contract)
+            
+        Returns:
+            Array of implied volatilities aligned with contracts (NaN if unsolvable)
+        """
+        n = len(contracts)
+        if n == 0:
+            return np.empty(0)
+            
+        if prices is None:
+            prices = np.fromiter((c.mid_price for c in contracts), dtype=np.float64, count=n)
+        if underlying_price is None:
+            spot = np.fromiter((c.underlying_price for c in contracts), dtype=np.float64, count=n)
+        else:
+            spot = underlying_price
+        strikes = np.fromiter((c.strike for c in contracts), dtype=np.float64, count=n)
+        tte = np.fromiter((c.days_to_expiration for c in contracts), dtype=np.float64, count=n) / 365.0
+        is_call = np.fromiter((c.option_type == OptionType.CALL for c in contracts), dtype=bool, count=n)
+        
+        return self.solve(prices, spot, strikes, tte, risk_free_rate, is_call, q=dividend_yield)
+        
+    def _initial_guess(self, price: np.ndarray, S: np.ndarray, X: np.ndarray,
+                       T: np.ndarray, is_call: np.ndarray) -> np.ndarray:
+        """Corrado-Miller approximation on the call-equivalent price"""
+        # Put-call parity: C = P + S - K*exp(-rT)
+        call_price = np.where(is_call, price, price + S - X)
+        half_gap = 0.5 * (S - X)
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            radicand = np.maximum((call_price - half_gap) ** 2 - (S - X) ** 2 / np.pi, 0.0)
+            guess = (np.sqrt(2 * np.pi / T) / (S + X)) * (call_price - half_gap + np.sqrt(radicand))
+            
+        guess = np.where(np.isfinite(guess) & (guess > 0), guess, 0.2)
+        return np.clip(guess, self.min_volatility * 10, self.max_volatility * 0.9)
+        
+    @staticmethod
+    def _price_vega_volga(S, K, T, r, sigma, is_call):
+        """Price with raw (per unit vol) vega and volga from one d1/d2 evaluation"""
+        sqrt_t = np.sqrt(T)
+        sig_sqrt_t = sigma * sqrt_t
+        d1 = (np.log(S / K) + (r + 0.5 * sigma * sigma) * T) / sig_sqrt_t
+        d2 = d1 - sig_sqrt_t
+        sign = np.where(is_call, 1.0, -1.0)
+        
+        price = sign * (S * norm_cdf(sign * d1) - K * np.exp(-r * T) * norm_cdf(sign * d2))
+        vega = S * norm_pdf(d1) * sqrt_t
+        volga = vega * d1 * d2 / sigma
+        return price, vega, volga
+
+
+def main():
+    """
+    Test the implied volatility solver
+    """
+    print("=" * 80)
+    print("SPRINT 16: IMPLIED VOLATILITY SOLVER TEST")
+    print("=" * 80)
+    
+    solver = ImpliedVolatilitySolver()
+    rng = np.random.default_rng(16)
+    
+    n = 50000
+    spot = 636.0
+    strikes = np.round(rng.uniform(450, 820, n))
+    ttes = rng.integers(1, 730, n) / 365.0
+    true_vols = rng.uniform(0.05, 1.5, n)
+    is_call = rng.random(n) < 0.5
+    
+    prices = BlackScholesCalculator.calculate_option_prices(spot, strikes, ttes, 0.05, true_vols, is_call)
+    
+    start = datetime.now()
+    solved = solver.solve(prices, spot, strikes, ttes, 0.05, is_call)
+    elapsed_ms = (datetime.now() - start).total_seconds() * 1000
+    
+    # Contracts with essentially zero vega carry no volatility information
+    vega = BlackScholesCalculator.calculate_greeks_vectorized(spot, strikes, ttes, 0.05, true_vols, is_call)['vega']
+    informative = vega > 1e-4
+    errors = np.abs(solved - true_vols)[informative]
+    
+    print(f"Solved {n:,} implied volatilities in {elapsed_ms:.1f}ms")
+    print(f"  Solved (finite): {np.isfinite(solved).mean():.1%}")
+    print(f"  Max abs error (vega > 1e-4): {np.nanmax(errors):.2e}")
+    
+    # With a dividend yield the solve must use the same q as the pricer
+    q = 0.013
+    dividend_prices = BlackScholesCalculator.calculate_option_prices(spot, strikes, ttes, 0.05, true_vols,
+                                                                     is_call, q=q)
+    dividend_solved = solver.solve(dividend_prices, spot, strikes, ttes, 0.05, is_call, q=q)
+    print(f"  Max abs error with q={q:.3f} (vega > 1e-4): "
+          f"{np.nanmax(np.abs(dividend_solved - true_vols)[informative]):.2e}")
+    
+    # Arbitrage violations come back as NaN
+    bad = solver.solve([0.0, 700.0, 5.0], spot, [600.0, 640.0, 500.0], 30 / 365, 0.05,
+                       option_type_mask(['call', 'call', 'call']))
+    print(f"  Bound violations (zero, above spot, below intrinsic): {bad}")
+    
+    print("\nImplied Volatility Solver test completed [SUCCESS]")
+
+
+if __name__ == "__main__":
+    main()
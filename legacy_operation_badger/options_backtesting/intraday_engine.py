@@ -0,0 +1,309 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Sprint 16: Intraday Backtesting Mode
+Minute-level repricing of open Iron Condors between daily chain snapshots
+
+The daily engine only sees the market at each chain snapshot, so profit
+targets and stops fire at the close even when they were hit at 10:15. In
+intraday mode every session is replayed minute by minute from an underlying
+price series: open legs are repriced with the vectorized Black-Scholes
+pricer, their volatilities interpolated in time between the previous and
+the current snapshot, and profit-target / stop-loss checks run on every
+minute. Minute data and chains are streamed one day at a time, so memory
+stays flat over any date range.
+
+Key Features:
+- Pluggable minute sources: per-day CSV files, or a Brownian bridge
+  between consecutive closes when no minute history is available
+- One (minutes x legs) pricing call per day
+- Leg volatilities interpolated between snapshots (quoted IV, else surface)
+- Intraday exits through the engine's fill model, quoting the last
+  spread around the model price
+- Daily signals, entries and accounting unchanged (run at each close)
+"""
+
+import os
+import sys
+import numpy as np
+import pandas as pd
+from datetime import datetime, time as dtime, timedelta
+from typing import Any, Dict, List, Optional
+import logging
+
+# Add parent directory for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from options_backtesting.core_engine import OptionsBacktestEngine, expiry_day_number
+from options_backtesting.option_chain import OptionChain
+from options_backtesting.greeks_engine import GreeksEngine, BlackScholesCalculator
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SESSION_OPEN = dtime(9, 30)
+SESSION_CLOSE = dtime(16, 0)
+EPOCH = datetime(1970, 1, 1)
+
+class CsvMinuteSource:
+    """
+    Minute closes from one CSV file per day
+    
+    Files are named {symbol}_{YYYY-MM-DD}.csv and hold a timestamp column
+    and a close column; only the requested day is read.
+    """
+    
+    def __init__(self, directory: str, timestamp_column: str = 'timestamp', price_column: str = 'close'):
+        self.directory = directory
+        self.timestamp_column = timestamp_column
+        self.price_column = price_column
+        
+    def get_minute_prices(self, symbol: str, date: datetime, previous_close: float,
+                          close: float) -> Optional[pd.Series]:
+        """Minute closes for one session (None if the file is missing)"""
+        path = os.path.join(self.directory, f"{symbol}_{date.strftime('%Y-%m-%d')}.csv")
+        if not os.path.exists(path):
+            return None
+        bars = pd.read_csv(path, usecols=[self.timestamp_column, self.price_column],
+                           parse_dates=[self.timestamp_column])
+        if not pd.api.types.is_datetime64_any_dtype(bars[self.timestamp_column]):
+            # Mixed UTC offsets (e.g. a DST change) are left unparsed
+            bars[self.timestamp_column] = pd.to_datetime(bars[self.timestamp_column], utc=True)
+        prices = bars.set_index(self.timestamp_column)[self.price_column].sort_index()
+
+        # Session bounds are naive exchange time; align offset-stamped files to them
+        if prices.index.tz is not None:
+            prices.index = prices.index.tz_convert('America/New_York').tz_localize(None)
+        return prices
+
+class BridgeMinuteSource:
+    """
+    Brownian bridge from the previous close to the session close
+    
+    Stand-in path when no minute history exists: it pins both snapshot
+    prices and fills the session with diffusion at a given volatility, so
+    intraday checks see plausible excursions rather than a straight line.
+    """
+    
+    def __init__(self, volatility: float = 0.15, bar_minutes: int = 1, seed: int = 16):
+        self.volatility = volatility
+        self.bar_minutes = bar_minutes
+        self.rng = np.random.default_rng(seed)
+        
+    def get_minute_prices(self, symbol: str, date: datetime, previous_close: float,
+                          close: float) -> Optional[pd.Series]:
+        """Bridged minute closes for one session"""
+        session_open = datetime.combine(date.date(), SESSION_OPEN)
+        session_close = datetime.combine(date.date(), SESSION_CLOSE)
+        times = pd.date_range(session_open + timedelta(minutes=self.bar_minutes), session_close,
+                              freq=f"{self.bar_minutes}min")
+        n = len(times)
+        
+        step_sd = self.volatility * np.sqrt(self.bar_minutes / (252 * 390))
+        walk = np.cumsum(self.rng.normal(0.0, step_sd, n))
+        fraction = np.arange(1, n + 1) / n
+        log_path = np.log(previous_close) + fraction * np.log(close / previous_close) + walk - fraction * walk[-1]
+        return pd.Series(np.exp(log_path), index=times)
+
+class IntradayBacktestEngine(OptionsBacktestEngine):
+    """
+    Options backtest engine with minute-level exits between daily snapshots
+    """
+    
+    def __init__(self, initial_capital: float = 100000.0, data_manager: Any = None,
+                 strategy: Any = None, symbol: str = 'SPY', prefetch_days: int = 1,
+                 fill_model: Any = None, settlement: Any = None, strategies: Optional[List[Any]] = None,
+                 minute_source: Any = None, interpolate_surface: bool = True):
+        """
+        Initialize engine
+        
+        Args:
+            initial_capital: Starting cash
+            data_manager: HistoricalOptionsManager (daily chain snapshots)
+            strategy: IronCondorStrategy
+            symbol: Underlying symbol
+            prefetch_days: Chains loaded ahead of the current day
+            fill_model: FillModel for entries and exits (default bid/ask)
+            settlement: SettlementEngine for expiring positions
+            strategies: StrategyPlugins run alongside the Iron Condor strategy
+            minute_source: Object with get_minute_prices(symbol, date,
+                previous_close, close) -> pd.Series of minute closes
+                (default BridgeMinuteSource)
+            interpolate_surface: Interpolate leg volatilities from the
+                previous to the current snapshot during the session; if
+                False, volatilities stay at the previous snapshot
+        """
+        super().__init__(initial_capital, data_manager, strategy, symbol, prefetch_days, fill_model, settlement,
+                         strategies)
+        self.minute_source = minute_source or BridgeMinuteSource()
+        self.interpolate_surface = interpolate_surface
+        self.minutes_replayed = 0
+        self.intraday_exits = 0
+        self._pricing_engine: Optional[GreeksEngine] = None
+        
+    @property
+    def pricing_engine(self) -> GreeksEngine:
+        """Carry terms and volatility surface: the Iron Condor strategy's, else a default engine"""
+        if self.strategy is not None:
+            return self.strategy.greeks_engine
+        if self._pricing_engine is None:
+            self._pricing_engine = GreeksEngine()
+        return self._pricing_engine
+        
+    def _process_trading_day(self, date: datetime, options_chain: Any):
+        """Replay the session for open positions, then process the closing snapshot"""
+        session_close = datetime.combine(date.date(), SESSION_CLOSE)
+        self._replay_session(date, OptionChain.ensure(options_chain))
+        self._process_events_for_date(session_close, options_chain)
+        
+    def _replay_session(self, date: datetime, chain: OptionChain):
+        """
+        Reprice open legs on every minute and exit positions that hit their
+        profit target or stop
+        
+        Legs are marked as of the previous snapshot. All legs of all open
+        positions are priced in one (minutes x legs) call and summed into
+        (minutes x positions) P&L by a bincount group-by; each position's
+        first breaching minute, if any, becomes its exit.
+        """
+        positions = [position for position in self.positions if position.is_open]
+        if not positions or not chain:
+            return
+            
+        legs = [pos for position in positions for pos in position.legs]
+        counts = [len(position.legs) for position in positions]
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        group = np.repeat(np.arange(len(positions)), counts)
+        previous_close = legs[0].contract.underlying_price
+        minutes = self.minute_source.get_minute_prices(self.symbol, date, previous_close, chain.spot)
+        if minutes is None or len(minutes) == 0:
+            return
+            
+        times = minutes.index
+        spots = minutes.to_numpy(dtype=np.float64)
+        self.minutes_replayed += len(spots)
+        
+        strikes = np.array([pos.contract.strike for pos in legs])
+        is_call = np.array([pos.contract.option_type.value == 'C' for pos in legs])
+        quantities = np.array([pos.quantity for pos in legs], dtype=np.float64)
+        entry_prices = np.array([pos.entry_price for pos in legs])
+        half_spreads = np.array([max(pos.contract.ask - pos.contract.bid, 0.0) / 2 for pos in legs])
+        
+        sigma = self._session_volatilities(legs, chain, times)
+        
+        # Time to expiry per minute, expiring at the expiration day's close
+        session_close = SESSION_CLOSE.hour * 60 + SESSION_CLOSE.minute
+        expiry_minutes = np.array([expiry_day_number(pos.contract.expiration) * 1440.0 + session_close
+                                   for pos in legs])
+        minute_stamps = ((times - pd.Timestamp(EPOCH)) / pd.Timedelta(minutes=1)).to_numpy(dtype=np.float64)
+        tte = np.maximum(expiry_minutes[None, :] - minute_stamps[:, None], 1.0) / (365.0 * 1440.0)
+        
+        r, q = self.pricing_engine.carry_terms(tte, float(spots[0]), as_of=date)
+        prices = BlackScholesCalculator.calculate_option_prices(
+            spots[:, None], strikes[None, :], tte, r, sigma, is_call[None, :], q=q
+        )
+        
+        # Position P&L per minute: group-by over (minute, position) pairs
+        leg_pnl = (prices - entry_prices) * quantities * 100
+        n = len(positions)
+        flat = (group[None, :] + n * np.arange(len(times))[:, None]).ravel()
+        pnl = np.bincount(flat, leg_pnl.ravel(), minlength=len(times) * n).reshape(len(times), n)
+        targets, stops = np.array([self._exit_levels(position) for position in positions]).T
+        breached = (pnl >= targets) | (pnl <= stops)
+        
+        for p in np.flatnonzero(breached.any(axis=0)).tolist():
+            minute = int(np.argmax(breached[:, p]))
+            leg_slice = slice(offsets[p], offsets[p + 1])
+            # Quote each leg's last spread around its model price
+            model_prices = prices[minute, leg_slice]
+            bids = np.maximum(model_prices - half_spreads[leg_slice], 0.0)
+            asks = model_prices + half_spreads[leg_slice]
+            reason = 'profit target' if pnl[minute, p] >= targets[p] else 'stop loss'
+            logger.info(f"Intraday {reason} at {times[minute]} (spot ${spots[minute]:.2f}, "
+                        f"model P&L ${pnl[minute, p]:,.2f})")
+            self._exit_position(positions[p], times[minute].to_pydatetime(), bids=bids, asks=asks,
+                                reason=f'intraday {reason}')
+            self.intraday_exits += 1
+            
+    def _session_volatilities(self, legs: List[Any], chain: OptionChain, times: pd.DatetimeIndex) -> np.ndarray:
+        """
+        Leg volatilities per minute, interpolated from the previous snapshot's
+        to the current snapshot's
+        
+        The current snapshot's vol is the leg's quoted IV if it is listed,
+        else the fitted surface at its strike and expiry, else the previous
+        vol. Interpolation is linear in session time.
+        """
+        previous = np.array([pos.contract.implied_volatility for pos in legs])
+        previous = np.where(previous > 0, previous, 0.2)
+        if not self.interpolate_surface:
+            return np.broadcast_to(previous, (len(times), len(legs)))
+            
+        rows = chain.locate(np.array([pos.contract_key for pos in legs], dtype=np.int64))
+        current = np.where(rows >= 0, chain.implied_volatility[rows], 0.0)
+        
+        missing = current <= 0
+        surface = self.pricing_engine.volatility_surface
+        if missing.any() and surface.is_built:
+            strikes = np.array([pos.contract.strike for pos in legs])[missing]
+            tte = np.array([max(pos.contract.days_to_expiration, 1) for pos in legs])[missing] / 365.0
+            current[missing] = surface.get_implied_volatilities(strikes, tte, chain.spot)
+        current = np.where(current > 0, current, previous)
+        
+        session_open = pd.Timestamp(datetime.combine(times[0].date(), SESSION_OPEN))
+        session_length = (SESSION_CLOSE.hour - SESSION_OPEN.hour) * 60 + SESSION_CLOSE.minute - SESSION_OPEN.minute
+        weight = np.clip(((times - session_open) / pd.Timedelta(minutes=1)).to_numpy(dtype=np.float64)
+                         / session_length, 0.0, 1.0)
+        return previous[None, :] + weight[:, None] * (current - previous)[None, :]
+        
+    def run_backtest(self, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
+        """
+        Run the backtest with intraday exits
+        
+        Returns:
+            Daily results plus minutes replayed and intraday exits
+        """
+        results = super().run_backtest(start_date, end_date)
+        results['minutes_replayed'] = self.minutes_replayed
+        results['intraday_exits'] = self.intraday_exits
+        return results
+
+
+def main():
+    """
+    Test intraday backtesting mode
+    """
+    from options_backtesting.parallel_runner import SyntheticHistory
+    from options_backtesting.iron_condor_strategy import IronCondorStrategy, IronCondorParameters
+    
+    print("=" * 80)
+    print("SPRINT 16: INTRADAY BACKTESTING MODE TEST")
+    print("=" * 80)
+    
+    logging.getLogger().setLevel(logging.WARNING)
+    start_date, end_date = datetime(2023, 1, 2), datetime(2023, 6, 30)
+    history = SyntheticHistory(start_date, end_date)
+    parameters = IronCondorParameters(min_premium_collected=0.1)
+    
+    results = {}
+    for mode, engine_class in [('daily', OptionsBacktestEngine), ('intraday', IntradayBacktestEngine)]:
+        strategy = IronCondorStrategy(parameters=parameters, data_manager=history)
+        engine = engine_class(data_manager=history, strategy=strategy)
+        start = datetime.now()
+        results[mode] = engine.run_backtest(start_date, end_date)
+        results[mode]['runtime'] = (datetime.now() - start).total_seconds()
+        
+    for mode, result in results.items():
+        metrics = result['performance_metrics']
+        print(f"{mode:>8}: {metrics['total_trades']} trades, win rate {metrics['win_rate_pct']:.1f}%, "
+              f"return {metrics['total_return_pct']:.2f}%, max DD {metrics['max_drawdown_pct']:.2f}%, "
+              f"{result['runtime']:.1f}s")
+    print(f"Intraday: {results['intraday']['minutes_replayed']:,} minutes replayed, "
+          f"{results['intraday']['intraday_exits']} intraday exits")
+          
+    print("\nIntraday Backtesting Mode test completed [SUCCESS]")
+
+
+if __name__ == "__main__":
+    main()
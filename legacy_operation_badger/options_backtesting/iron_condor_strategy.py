@@ -27,7 +27,7 @@ import sys
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any, Union
 import logging
 from dataclasses import dataclass, field
 from enum import Enum
@@ -40,6 +40,7 @@ from options_backtesting.core_engine import (
     OptionsBacktestEngine, MarketDataEvent, StrategyEvent, ExecutionEvent
 )
 from options_backtesting.historical_manager import HistoricalOptionsManager
+from options_backtesting.option_chain import OptionChain, ChainIndex
 from options_backtesting.greeks_engine import GreeksEngine
 
 # Configure logging
@@ -79,10 +80,13 @@ class IronCondorParameters:
     max_delta: float = 10.0              # Maximum portfolio delta
     max_gamma: float = 50.0              # Maximum gamma exposure
     max_vega: float = 100.0              # Maximum vega exposure
+    max_vanna: float = 5.0               # Maximum delta change per 1% vol move
+    max_charm: float = 2.0               # Maximum delta drift per day
     
     # Timing
     min_dte_close: int = 7               # Close position if DTE <= 7
     max_dte_open: int = 45               # Don't open if DTE > 45
+    hold_to_expiration: bool = False     # Ignore min_dte_close; let the engine settle at expiry
     
     # Position management
     max_positions: int = 5               # Maximum concurrent positions
@@ -136,27 +140,31 @@ class IronCondorStrategy:
         logger.info(f"Short deltas: Call {self.params.delta_short_call}, Put {self.params.delta_short_put}")
         logger.info(f"Wing width: ${self.params.wing_width}")
         
-    def generate_signal(self, date: datetime, options_chain: List[OptionContract]) -> IronCondorSignal:
+    def generate_signal(self, date: datetime,
+                        options_chain: Union[OptionChain, List[OptionContract]]) -> IronCondorSignal:
         """
         Generate trading signal based on market conditions
         
         Args:
             date: Current date
-            options_chain: Available options contracts
+            options_chain: Available options (OptionChain, or a contract list
+                which is converted once)
             
         Returns:
             Trading signal
         """
         self.current_date = date
+        self.greeks_engine.valuation_date = date
+        options_chain = OptionChain.ensure(options_chain)
         
         if not options_chain:
             return IronCondorSignal.HOLD
         
         # Update underlying price
-        self.underlying_price = options_chain[0].underlying_price
+        self.underlying_price = options_chain.spot
         
-        # Update Greeks engine with current options data
-        self.greeks_engine.update_volatility_surface(options_chain)
+        # Update Greeks engine with current options data (cached per snapshot)
+        self.greeks_engine.update_volatility_surface(options_chain, snapshot_id=date)
         
         # Check existing positions first
         if self.active_positions:
@@ -174,7 +182,7 @@ class IronCondorStrategy:
         
         return IronCondorSignal.HOLD
     
-    def _should_open_new_position(self, options_chain: List[OptionContract]) -> bool:
+    def _should_open_new_position(self, options_chain: OptionChain) -> bool:
         """Check if conditions are right for opening new Iron Condor"""
         
         # Find suitable options for Iron Condor
@@ -198,11 +206,12 @@ class IronCondorStrategy:
         return True
     
     def _should_close_position(self, position: IronCondorPosition, 
-                             options_chain: List[OptionContract]) -> bool:
+                             options_chain: OptionChain) -> bool:
         """Check if position should be closed"""
         
-        # Close if approaching expiration
-        if position.short_call.contract.days_to_expiration <= self.params.min_dte_close:
+        # Close if approaching expiration (held positions are settled by the engine)
+        if (not self.params.hold_to_expiration
+                and position.short_call.contract.days_to_expiration <= self.params.min_dte_close):
             logger.info(f"Closing position due to DTE: {position.short_call.contract.days_to_expiration}")
             return True
         
@@ -228,7 +237,7 @@ class IronCondorStrategy:
         return False
     
     def _should_adjust_position(self, position: IronCondorPosition, 
-                              options_chain: List[OptionContract]) -> bool:
+                              options_chain: OptionChain) -> bool:
         """Check if position needs adjustment"""
         
         # Calculate current portfolio Greeks
@@ -250,10 +259,20 @@ class IronCondorStrategy:
         if abs(portfolio_greeks['portfolio_gamma']) > self.params.max_gamma:
             logger.info(f"Gamma adjustment needed: {portfolio_greeks['portfolio_gamma']:.2f}")
             return True
+            
+        # Delta that is about to move: vol spikes (vanna) and decay into expiry (charm)
+        if abs(portfolio_greeks['portfolio_vanna']) > self.params.max_vanna:
+            logger.info(f"Vanna adjustment needed: {portfolio_greeks['portfolio_vanna']:.2f}")
+            return True
+            
+        if abs(portfolio_greeks['portfolio_charm']) > self.params.max_charm:
+            logger.info(f"Charm adjustment needed: {portfolio_greeks['portfolio_charm']:.2f}")
+            return True
         
         return False
     
-    def _find_iron_condor_strikes(self, options_chain: List[OptionContract]) -> Optional[Dict[str, float]]:
+    def _find_iron_condor_strikes(self, options_chain: Union[OptionChain, List[OptionContract]]
+                                  ) -> Optional[Dict[str, float]]:
         """
         Find suitable strikes for Iron Condor based on delta targets
         
@@ -263,32 +282,23 @@ class IronCondorStrategy:
         Returns:
             Dictionary with strike levels or None if not found
         """
+        index = OptionChain.ensure(options_chain).index
         
-        # Filter to target expiration
-        target_contracts = []
-        
-        for contract in options_chain:
-            dte_diff = abs(contract.days_to_expiration - self.params.target_dte)
-            if dte_diff <= 7:  # Within 7 days of target
-                target_contracts.append(contract)
-        
-        if not target_contracts:
-            return None
-        
-        # Separate calls and puts
-        calls = [c for c in target_contracts if c.option_type == OptionType.CALL]
-        puts = [c for c in target_contracts if c.option_type == OptionType.PUT]
-        
-        if not calls or not puts:
+        # All four legs come from one expiry: the listed expiry closest to
+        # the target DTE, if within 7 days of it
+        expiration = index.nearest_expiry(self.params.target_dte, max_distance=7)
+        if expiration is None:
             return None
         
         # Find short call (target delta around 0.15)
-        short_call = self._find_closest_delta_option(calls, self.params.delta_short_call)
+        short_call = self._find_closest_delta_option(index, expiration, OptionType.CALL,
+                                                     self.params.delta_short_call)
         if not short_call:
             return None
         
         # Find short put (target delta around -0.15)
-        short_put = self._find_closest_delta_option(puts, self.params.delta_short_put)
+        short_put = self._find_closest_delta_option(index, expiration, OptionType.PUT,
+                                                    self.params.delta_short_put)
         if not short_put:
             return None
         
@@ -297,8 +307,8 @@ class IronCondorStrategy:
         long_put_strike = short_put.strike - self.params.wing_width
         
         # Verify long options exist
-        long_call = self._find_option_by_strike(calls, long_call_strike)
-        long_put = self._find_option_by_strike(puts, long_put_strike)
+        long_call = index.contract(expiration, OptionType.CALL, long_call_strike)
+        long_put = index.contract(expiration, OptionType.PUT, long_put_strike)
         
         if not long_call or not long_put:
             return None
@@ -312,104 +322,85 @@ class IronCondorStrategy:
             'days_to_expiration': short_call.days_to_expiration
         }
     
-    def _find_closest_delta_option(self, contracts: List[OptionContract], 
+    def _find_closest_delta_option(self, index: ChainIndex, expiration: str, option_type: OptionType,
                                  target_delta: float) -> Optional[OptionContract]:
-        """Find option with delta closest to target"""
-        best_contract = None
-        best_delta_diff = float('inf')
-        
-        # If no contracts have meaningful delta, use moneyness as approximation
-        contracts_with_delta = [c for c in contracts if abs(c.delta) > 0.01]
-        
-        if not contracts_with_delta:
-            # Fallback to moneyness-based selection
+        """Find option of one expiry and type with delta closest to target"""
+        chain = index.chain
+        row = index.nearest_delta(expiration, option_type, target_delta)
+        
+        if row is None:
+            # No contracts have meaningful delta: fallback to moneyness-based selection
+            rows = index.rows(expiration, option_type)
+            moneyness = chain.moneyness[rows]
             if target_delta > 0:  # Call option - want OTM (moneyness > 1)
-                valid_contracts = [c for c in contracts if c.moneyness > 1.0 and c.bid > 0]
-                if valid_contracts:
-                    # Pick contract with moneyness closest to desired level
-                    target_moneyness = 1.0 + abs(target_delta) * 0.5  # Rough approximation
-                    best_contract = min(valid_contracts, 
-                                      key=lambda c: abs(c.moneyness - target_moneyness))
+                valid = (moneyness > 1.0) & (chain.bid[rows] > 0)
+                target_moneyness = 1.0 + abs(target_delta) * 0.5  # Rough approximation
             else:  # Put option - want OTM (moneyness < 1)
-                valid_contracts = [c for c in contracts if c.moneyness < 1.0 and c.bid > 0]
-                if valid_contracts:
-                    # Pick contract with moneyness closest to desired level
-                    target_moneyness = 1.0 - abs(target_delta) * 0.5  # Rough approximation
-                    best_contract = min(valid_contracts, 
-                                      key=lambda c: abs(c.moneyness - target_moneyness))
-        else:
-            # Use delta-based selection
-            for contract in contracts_with_delta:
-                delta_diff = abs(contract.delta - target_delta)
-                if delta_diff < best_delta_diff:
-                    best_delta_diff = delta_diff
-                    best_contract = contract
-        
-        return best_contract
+                valid = (moneyness < 1.0) & (chain.bid[rows] > 0)
+                target_moneyness = 1.0 - abs(target_delta) * 0.5  # Rough approximation
+                
+            if not valid.any():
+                return None
+            # Pick contract with moneyness closest to desired level
+            candidates = rows[valid]
+            row = candidates[np.argmin(np.abs(moneyness[valid] - target_moneyness))]
+            
+        return chain.contract(int(row))
     
-    def _find_option_by_strike(self, contracts: List[OptionContract], 
-                             target_strike: float) -> Optional[OptionContract]:
-        """Find option contract by strike price"""
-        for contract in contracts:
-            if abs(contract.strike - target_strike) < 0.01:  # Allow small rounding errors
-                return contract
-        return None
+    def _find_condor_legs(self, strikes: Dict[str, float],
+                          options_chain: Union[OptionChain, List[OptionContract]]
+                          ) -> Optional[Dict[str, OptionContract]]:
+        """
+        Look up the four leg contracts of a strike set in the chain's index
+        
+        Args:
+            strikes: Strike levels dictionary (with expiration)
+            options_chain: Available options contracts
+            
+        Returns:
+            Dictionary short_call/long_call/short_put/long_put -> contract,
+            or None if any leg is missing
+        """
+        index = OptionChain.ensure(options_chain).index
+        legs = {}
+        
+        for leg, option_type in [('short_call', OptionType.CALL), ('long_call', OptionType.CALL),
+                                 ('short_put', OptionType.PUT), ('long_put', OptionType.PUT)]:
+            contract = index.contract(strikes['expiration'], option_type, strikes[f'{leg}_strike'])
+            if contract is None:
+                return None
+            legs[leg] = contract
+            
+        return legs
     
     def _estimate_premium_collected(self, strikes: Dict[str, float], 
-                                  options_chain: List[OptionContract]) -> float:
+                                  options_chain: Union[OptionChain, List[OptionContract]]) -> float:
         """Estimate net premium that would be collected"""
         
         # Find contracts for each leg
-        short_call = self._find_option_by_strike(
-            [c for c in options_chain if c.option_type == OptionType.CALL],
-            strikes['short_call_strike']
-        )
-        
-        short_put = self._find_option_by_strike(
-            [c for c in options_chain if c.option_type == OptionType.PUT],
-            strikes['short_put_strike']
-        )
-        
-        long_call = self._find_option_by_strike(
-            [c for c in options_chain if c.option_type == OptionType.CALL],
-            strikes['long_call_strike']
-        )
+        legs = self._find_condor_legs(strikes, options_chain)
         
-        long_put = self._find_option_by_strike(
-            [c for c in options_chain if c.option_type == OptionType.PUT],
-            strikes['long_put_strike']
-        )
-        
-        if not all([short_call, short_put, long_call, long_put]):
+        if not legs:
             return 0.0
         
         # Calculate net credit (sell short options, buy long options)
-        net_credit = (short_call.bid + short_put.bid - long_call.ask - long_put.ask)
+        net_credit = (legs['short_call'].bid + legs['short_put'].bid -
+                      legs['long_call'].ask - legs['long_put'].ask)
         
         return net_credit
     
     def _validate_data_quality(self, strikes: Dict[str, float], 
-                             options_chain: List[OptionContract]) -> bool:
+                             options_chain: Union[OptionChain, List[OptionContract]]) -> bool:
         """Validate data quality for Iron Condor legs"""
         
         # Find all leg contracts
-        legs = []
+        legs = self._find_condor_legs(strikes, options_chain)
         
-        for option_type, strike_key in [(OptionType.CALL, 'short_call_strike'),
-                                       (OptionType.CALL, 'long_call_strike'),
-                                       (OptionType.PUT, 'short_put_strike'),
-                                       (OptionType.PUT, 'long_put_strike')]:
-            
-            contracts = [c for c in options_chain if c.option_type == option_type]
-            leg = self._find_option_by_strike(contracts, strikes[strike_key])
-            
-            if not leg:
-                return False
-            
-            legs.append(leg)
+        if not legs:
+            return False
         
         # Validate each leg
-        for leg in legs:
+        for leg in legs.values():
             # Check bid-ask spread
             if leg.ask > 0 and leg.bid > 0:
                 spread_pct = (leg.ask - leg.bid) / leg.mid_price if leg.mid_price > 0 else 1.0
@@ -429,30 +420,14 @@ class IronCondorStrategy:
         return True
     
     def _update_position_prices(self, position: IronCondorPosition, 
-                              options_chain: List[OptionContract]):
-        """Update position prices with current market data"""
-        
-        for pos in [position.short_call, position.long_call, position.short_put, position.long_put]:
-            # Find matching contract in current chain
-            for contract in options_chain:
-                if (contract.strike == pos.contract.strike and
-                    contract.option_type == pos.contract.option_type and
-                    contract.expiration == pos.contract.expiration):
-                    
-                    # Update prices
-                    pos.contract.bid = contract.bid
-                    pos.contract.ask = contract.ask
-                    pos.contract.last = contract.last
-                    pos.contract.mid_price = contract.mid_price
-                    pos.contract.delta = contract.delta
-                    pos.contract.gamma = contract.gamma
-                    pos.contract.theta = contract.theta
-                    pos.contract.vega = contract.vega
-                    pos.contract.implied_volatility = contract.implied_volatility
-                    break
+                              options_chain: Union[OptionChain, List[OptionContract]]):
+        """Update position prices with current market data (one keyed gather for all legs)"""
+        OptionChain.ensure(options_chain).mark_legs(
+            [position.short_call, position.long_call, position.short_put, position.long_put]
+        )
     
     def create_iron_condor_position(self, strikes: Dict[str, float], 
-                                  options_chain: List[OptionContract]) -> Optional[IronCondorPosition]:
+                                  options_chain: Union[OptionChain, List[OptionContract]]) -> Optional[IronCondorPosition]:
         """
         Create Iron Condor position from strike information
         
@@ -465,17 +440,16 @@ class IronCondorStrategy:
         """
         try:
             # Find all leg contracts
-            calls = [c for c in options_chain if c.option_type == OptionType.CALL]
-            puts = [c for c in options_chain if c.option_type == OptionType.PUT]
+            legs = self._find_condor_legs(strikes, options_chain)
             
-            short_call_contract = self._find_option_by_strike(calls, strikes['short_call_strike'])
-            long_call_contract = self._find_option_by_strike(calls, strikes['long_call_strike'])
-            short_put_contract = self._find_option_by_strike(puts, strikes['short_put_strike'])
-            long_put_contract = self._find_option_by_strike(puts, strikes['long_put_strike'])
-            
-            if not all([short_call_contract, long_call_contract, short_put_contract, long_put_contract]):
+            if not legs:
                 logger.error("Could not find all required option contracts")
                 return None
+                
+            short_call_contract = legs['short_call']
+            long_call_contract = legs['long_call']
+            short_put_contract = legs['short_put']
+            long_put_contract = legs['long_put']
             
             # Create option positions
             short_call_pos = OptionPosition(
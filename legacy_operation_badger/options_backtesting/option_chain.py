@@ -0,0 +1,621 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Sprint 16: Columnar Option Chain
+Struct-of-arrays option chain for fast filtering, pricing and caching
+
+Chains used to travel as List[OptionContract], one dataclass per row built
+with DataFrame.iterrows(). OptionChain keeps every field as a NumPy column
+(option type and expiry as small integer codes), sorted once by
+expiry/type/strike, and only materializes OptionContract objects for the
+rows a caller actually touches. It is list-compatible (len, iteration,
+integer indexing), so existing consumers keep working unchanged.
+
+Key Features:
+- Float/int columns plus categorical option type and expiry codes
+- Pre-sorted by days to expiration, expiry, type (puts first), strike
+- Zero-copy conversion to and from pandas DataFrames
+- Boolean-mask / index selection returns sub-chains without copying rows
+- Lazily created, cached OptionContract views
+- ChainIndex: expiry -> type -> sorted strikes, built once per chain, with
+  binary-search strike lookups and nearest-delta search
+"""
+
+import os
+import sys
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+import logging
+
+# Add parent directory for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from options_backtesting.core_engine import OptionContract, OptionPosition, OptionType, expiry_day_number
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class OptionChain:
+    """
+    Columnar option chain for a single underlying
+    """
+    
+    FLOAT_COLUMNS = ('strike', 'bid', 'ask', 'last', 'delta', 'gamma', 'theta', 'vega',
+                     'implied_volatility', 'mid_price', 'underlying_price', 'moneyness')
+    INT_COLUMNS = ('volume', 'open_interest', 'days_to_expiration')
+    
+    # Fields copied onto open position legs when they are marked
+    MARK_COLUMNS = ('bid', 'ask', 'last', 'mid_price', 'delta', 'gamma', 'theta', 'vega',
+                    'implied_volatility', 'days_to_expiration', 'underlying_price')
+                    
+    def __init__(self, columns: Dict[str, np.ndarray], is_call: np.ndarray, expiry_codes: np.ndarray,
+                 expirations: np.ndarray, underlying: str = 'SPY', symbols: Optional[np.ndarray] = None,
+                 presorted: bool = False):
+        """
+        Initialize chain from columns
+        
+        Args:
+            columns: FLOAT_COLUMNS (float64) and INT_COLUMNS (int64) arrays
+            is_call: Boolean call mask (the option type category)
+            expiry_codes: Index of each row's expiration in expirations
+            expirations: Expiration labels (e.g. 'YYYY-MM-DD')
+            underlying: Underlying symbol
+            symbols: Contract symbols (default generated on demand)
+            presorted: Rows are already in expiry/type/strike order
+        """
+        self.columns = columns
+        self.is_call = is_call
+        self.expiry_codes = expiry_codes
+        self.expirations = expirations
+        self.underlying = underlying
+        self.symbols = symbols
+        self._views: Dict[int, OptionContract] = {}
+        self._index: Optional['ChainIndex'] = None
+        self._key_lookup: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        
+        if not presorted and len(is_call) > 1:
+            order = np.lexsort((columns['strike'], is_call, expiry_codes, columns['days_to_expiration']))
+            if not np.array_equal(order, np.arange(len(order))):
+                self._reorder(order)
+                
+    def _reorder(self, order: np.ndarray):
+        """Apply a row permutation to every column"""
+        self.columns = {name: values[order] for name, values in self.columns.items()}
+        self.is_call = self.is_call[order]
+        self.expiry_codes = self.expiry_codes[order]
+        if self.symbols is not None:
+            self.symbols = self.symbols[order]
+        self._views = {}
+        self._index = None
+        self._key_lookup = None
+        
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, underlying: Optional[str] = None) -> 'OptionChain':
+        """
+        Build a chain from a vendor/cache DataFrame without per-row work
+        
+        Missing columns and NaN values default like the old row-by-row
+        conversion (0, moneyness 1.0, option type 'C'). Columns that are
+        already float64/int64 and in order are used without copying.
+        
+        Args:
+            df: DataFrame with OptionContract field names (contract_symbol or
+                symbol for the contract symbol)
+            underlying: Underlying override (default the first row's, else 'SPY')
+        """
+        n = len(df)
+        columns = {}
+        for name in cls.FLOAT_COLUMNS + cls.INT_COLUMNS:
+            dtype = np.float64 if name in cls.FLOAT_COLUMNS else np.int64
+            default = 1.0 if name == 'moneyness' else 0
+            if name in df.columns:
+                values = pd.to_numeric(df[name], errors='coerce')
+                if values.hasnans:
+                    values = values.fillna(default)
+                columns[name] = values.to_numpy(dtype=dtype)
+            else:
+                columns[name] = np.full(n, default, dtype=dtype)
+                
+        # mid_price of 0 falls back to bid/ask mid, else last (as OptionContract.__post_init__)
+        bid, ask, mid = columns['bid'], columns['ask'], columns['mid_price']
+        if (mid == 0).any():
+            fallback = np.where((bid > 0) & (ask > 0), (bid + ask) / 2, columns['last'])
+            columns['mid_price'] = np.where(mid == 0, fallback, mid)
+            
+        if 'option_type' in df.columns:
+            is_call = df['option_type'].astype(str).str.upper().str.startswith('C').to_numpy(dtype=bool)
+        else:
+            is_call = np.ones(n, dtype=bool)
+            
+        if 'expiration' in df.columns:
+            codes, expirations = pd.factorize(df['expiration'].astype(str), sort=True)
+            expiry_codes = codes.astype(np.int32)
+            expirations = np.asarray(expirations, dtype=object)
+        else:
+            expiry_codes = np.zeros(n, dtype=np.int32)
+            expirations = np.array([''], dtype=object)
+            
+        symbol_column = 'contract_symbol' if 'contract_symbol' in df.columns else 'symbol'
+        symbols = df[symbol_column].to_numpy(dtype=object) if symbol_column in df.columns else None
+        
+        if underlying is None:
+            underlying = str(df['underlying'].iloc[0]) if 'underlying' in df.columns and n else 'SPY'
+            
+        return cls(columns, is_call, expiry_codes, expirations, underlying, symbols)
+        
+    @classmethod
+    def from_contracts(cls, contracts: List[OptionContract]) -> 'OptionChain':
+        """Build a chain from OptionContract objects"""
+        n = len(contracts)
+        columns = {name: np.fromiter((getattr(c, name) for c in contracts), dtype=np.float64, count=n)
+                   for name in cls.FLOAT_COLUMNS}
+        columns.update({name: np.fromiter((getattr(c, name) for c in contracts), dtype=np.int64, count=n)
+                        for name in cls.INT_COLUMNS})
+        is_call = np.fromiter((c.option_type == OptionType.CALL for c in contracts), dtype=bool, count=n)
+        codes, expirations = pd.factorize(pd.Series([c.expiration for c in contracts], dtype=object), sort=True)
+        symbols = np.array([c.symbol for c in contracts], dtype=object)
+        underlying = contracts[0].underlying if n else 'SPY'
+        return cls(columns, is_call, codes.astype(np.int32), np.asarray(expirations, dtype=object),
+                   underlying, symbols)
+                   
+    @classmethod
+    def ensure(cls, chain: Union['OptionChain', List[OptionContract]]) -> 'OptionChain':
+        """Pass OptionChains through, convert contract lists"""
+        return chain if isinstance(chain, OptionChain) else cls.from_contracts(list(chain or []))
+        
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        DataFrame with OptionContract field names
+        
+        Numeric columns share memory with the chain; option type and
+        expiration become pandas Categoricals over the existing codes.
+        """
+        data: Dict[str, Any] = {
+            'symbol': self.symbols if self.symbols is not None else self._generated_symbols(),
+            'underlying': pd.Categorical.from_codes(np.zeros(len(self), dtype=np.int8), [self.underlying]),
+            'expiration': pd.Categorical.from_codes(self.expiry_codes, self.expirations),
+            'option_type': pd.Categorical.from_codes(self.is_call.view(np.int8), ['P', 'C'])
+        }
+        data.update(self.columns)
+        return pd.DataFrame(data, copy=False)
+        
+    def _generated_symbols(self) -> np.ndarray:
+        """OCC-style symbols for chains loaded without a symbol column"""
+        return np.array([self._symbol(i) for i in range(len(self))], dtype=object)
+        
+    def _symbol(self, i: int) -> str:
+        if self.symbols is not None:
+            return self.symbols[i]
+        option_type = 'C' if self.is_call[i] else 'P'
+        return (f"{self.underlying}{self.expirations[self.expiry_codes[i]]}{option_type}"
+                f"{int(self.columns['strike'][i] * 1000):08d}")
+                
+    def __len__(self) -> int:
+        return len(self.is_call)
+        
+    def __iter__(self) -> Iterator[OptionContract]:
+        for i in range(len(self)):
+            yield self.contract(i)
+            
+    def __getitem__(self, key):
+        """Integer -> contract view; slice, mask or index array -> sub-chain"""
+        if isinstance(key, (int, np.integer)):
+            return self.contract(int(key))
+        return self.take(key)
+        
+    def __getattr__(self, name: str) -> np.ndarray:
+        """Column access as attributes (chain.strike, chain.delta, ...)"""
+        if not name.startswith('_') and name != 'columns' and name in self.__dict__.get('columns', {}):
+            return self.columns[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        
+    def contract(self, i: int) -> OptionContract:
+        """
+        OptionContract view of row i (created once, then cached)
+        
+        The view is a snapshot: later edits to the view do not change the
+        chain columns, and vice versa.
+        """
+        if i < 0:
+            i += len(self)
+        view = self._views.get(i)
+        if view is None:
+            cols = self.columns
+            view = OptionContract(
+                symbol=self._symbol(i),
+                underlying=self.underlying,
+                strike=float(cols['strike'][i]),
+                expiration=self.expirations[self.expiry_codes[i]],
+                option_type=OptionType.CALL if self.is_call[i] else OptionType.PUT,
+                bid=float(cols['bid'][i]),
+                ask=float(cols['ask'][i]),
+                last=float(cols['last'][i]),
+                volume=int(cols['volume'][i]),
+                open_interest=int(cols['open_interest'][i]),
+                delta=float(cols['delta'][i]),
+                gamma=float(cols['gamma'][i]),
+                theta=float(cols['theta'][i]),
+                vega=float(cols['vega'][i]),
+                implied_volatility=float(cols['implied_volatility'][i]),
+                mid_price=float(cols['mid_price'][i]),
+                days_to_expiration=int(cols['days_to_expiration'][i]),
+                underlying_price=float(cols['underlying_price'][i]),
+                moneyness=float(cols['moneyness'][i])
+            )
+            self._views[i] = view
+        return view
+        
+    def contracts(self, indices: Optional[np.ndarray] = None) -> List[OptionContract]:
+        """Contract views for the given rows (default all)"""
+        rows = range(len(self)) if indices is None else np.asarray(indices).tolist()
+        return [self.contract(i) for i in rows]
+        
+    def take(self, key) -> 'OptionChain':
+        """Sub-chain from a boolean mask, slice or index array (order preserved)"""
+        if isinstance(key, slice):
+            index = np.arange(len(self))[key]
+        else:
+            index = np.asarray(key)
+            index = np.flatnonzero(index) if index.dtype == bool else np.sort(index)
+        return OptionChain(
+            {name: values[index] for name, values in self.columns.items()},
+            self.is_call[index], self.expiry_codes[index], self.expirations, self.underlying,
+            self.symbols[index] if self.symbols is not None else None, presorted=True
+        )
+        
+    def select(self, mask: np.ndarray) -> 'OptionChain':
+        """Rows where mask is True"""
+        return self.take(np.asarray(mask, dtype=bool))
+        
+    def calls(self) -> 'OptionChain':
+        return self.take(self.is_call)
+        
+    def puts(self) -> 'OptionChain':
+        return self.take(~self.is_call)
+        
+    def set_column(self, name: str, values: np.ndarray):
+        """Replace a numeric column (e.g. re-solved implied volatilities)"""
+        if name not in self.columns:
+            raise KeyError(f"Unknown column '{name}'")
+        self.columns[name] = np.asarray(values, dtype=self.columns[name].dtype)
+        self._views = {}
+        self._index = None
+        self._key_lookup = None
+        
+    @property
+    def keys(self) -> np.ndarray:
+        """int64 contract key per row (see core_engine.contract_key)"""
+        expiry_days = np.array([expiry_day_number(e) for e in self.expirations.tolist()], dtype=np.int64)
+        strikes = np.rint(self.columns['strike'] * 1000).astype(np.int64)
+        return (expiry_days[self.expiry_codes] << 33) | (self.is_call.astype(np.int64) << 32) | strikes
+        
+    def locate(self, keys: np.ndarray) -> np.ndarray:
+        """
+        Rows of contracts by contract key
+        
+        The chain's keys are sorted once; every later batch is one
+        searchsorted over all requested keys.
+        
+        Args:
+            keys: int64 contract keys
+            
+        Returns:
+            Row per key, -1 where the contract is not in the chain
+        """
+        if self._key_lookup is None:
+            chain_keys = self.keys
+            order = np.argsort(chain_keys, kind='stable')
+            self._key_lookup = (chain_keys[order], order)
+            
+        sorted_keys, order = self._key_lookup
+        keys = np.asarray(keys, dtype=np.int64)
+        if len(sorted_keys) == 0:
+            return np.full(keys.shape, -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+        return np.where(sorted_keys[pos] == keys, order[pos], -1)
+        
+    def mark_legs(self, legs: List[Any]) -> np.ndarray:
+        """
+        Copy current quotes and Greeks onto position legs
+        
+        One locate for all legs, then one fancy-index gather per column.
+        
+        Args:
+            legs: OptionPosition objects (with contract_key)
+            
+        Returns:
+            Boolean mask of the legs found in this chain
+        """
+        if not legs:
+            return np.zeros(0, dtype=bool)
+            
+        rows = self.locate(np.fromiter((leg.contract_key for leg in legs), dtype=np.int64, count=len(legs)))
+        found = rows >= 0
+        rows = rows[found]
+        marks = [self.columns[name][rows].tolist() for name in self.MARK_COLUMNS]
+        
+        for leg, values in zip([leg for leg, hit in zip(legs, found.tolist()) if hit], zip(*marks)):
+            contract = leg.contract
+            (contract.bid, contract.ask, contract.last, contract.mid_price, contract.delta, contract.gamma,
+             contract.theta, contract.vega, contract.implied_volatility, contract.days_to_expiration,
+             contract.underlying_price) = values
+        return found
+        
+    @property
+    def index(self) -> 'ChainIndex':
+        """Strike/expiry lookup index (built on first use, shared afterwards)"""
+        if self._index is None:
+            self._index = ChainIndex(self)
+        return self._index
+        
+    @property
+    def option_types(self) -> np.ndarray:
+        """'C'/'P' labels per row"""
+        return np.where(self.is_call, 'C', 'P')
+        
+    @property
+    def tte(self) -> np.ndarray:
+        """Time to expiration in years"""
+        return self.columns['days_to_expiration'] / 365.0
+        
+    @property
+    def spot(self) -> float:
+        """Underlying price of the snapshot (first row)"""
+        return float(self.columns['underlying_price'][0]) if len(self) else 0.0
+        
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the column arrays"""
+        total = sum(values.nbytes for values in self.columns.values())
+        total += self.is_call.nbytes + self.expiry_codes.nbytes
+        if self.symbols is not None:
+            total += self.symbols.nbytes + sum(len(s) + 49 for s in self.symbols.tolist())
+        return total
+        
+    def __repr__(self) -> str:
+        return (f"OptionChain({self.underlying}, {len(self)} contracts, "
+                f"{len(np.unique(self.expiry_codes))} expiries)")
+
+class ChainIndex:
+    """
+    Expiry -> option type -> strike-sorted rows of an OptionChain
+    
+    Built with one lexsort; each (expiry, type) pair is then a contiguous
+    block of a row permutation, so a strike lookup is a binary search inside
+    one block instead of a scan over the chain. Delta-sorted copies of a
+    block are built the first time a delta search asks for them.
+    """
+    
+    def __init__(self, chain: OptionChain):
+        """
+        Build the index
+        
+        Args:
+            chain: Chain to index (use chain.index to share one per chain)
+        """
+        self.chain = chain
+        self.order = np.lexsort((chain.strike, chain.is_call, chain.expiry_codes))
+        self.strikes = chain.strike[self.order]
+        
+        # Block boundaries where the (expiry, type) key changes
+        keys = chain.expiry_codes[self.order].astype(np.int64) * 2 + chain.is_call[self.order]
+        starts = np.flatnonzero(np.diff(keys, prepend=-1)) if len(keys) else np.array([], dtype=np.int64)
+        stops = np.append(starts[1:], len(keys))
+        
+        self._blocks: Dict[str, Dict[OptionType, Tuple[int, int]]] = {}
+        self.days_to_expiration: Dict[str, int] = {}
+        for start, stop in zip(starts.tolist(), stops.tolist()):
+            row = self.order[start]
+            expiration = chain.expirations[chain.expiry_codes[row]]
+            option_type = OptionType.CALL if chain.is_call[row] else OptionType.PUT
+            self._blocks.setdefault(expiration, {})[option_type] = (start, stop)
+            self.days_to_expiration[expiration] = int(chain.days_to_expiration[row])
+            
+        # (expiry, type) -> (sorted deltas, chain rows) for rows with usable deltas
+        self._delta_blocks: Dict[Tuple[str, OptionType], Tuple[np.ndarray, np.ndarray]] = {}
+        
+    @property
+    def expirations(self) -> List[str]:
+        """Indexed expirations, nearest first"""
+        return sorted(self.days_to_expiration, key=self.days_to_expiration.get)
+        
+    def nearest_expiry(self, target_dte: int, max_distance: Optional[int] = None) -> Optional[str]:
+        """
+        Expiration whose days to expiration is closest to a target
+        
+        Args:
+            target_dte: Target days to expiration
+            max_distance: Maximum allowed |DTE - target| (default unlimited)
+            
+        Returns:
+            Expiration label or None
+        """
+        if not self.days_to_expiration:
+            return None
+        expiration = min(self.expirations, key=lambda e: abs(self.days_to_expiration[e] - target_dte))
+        if max_distance is not None and abs(self.days_to_expiration[expiration] - target_dte) > max_distance:
+            return None
+        return expiration
+        
+    def _block(self, expiration: str, option_type: OptionType) -> Tuple[int, int]:
+        return self._blocks.get(expiration, {}).get(option_type, (0, 0))
+        
+    def rows(self, expiration: str, option_type: OptionType) -> np.ndarray:
+        """Chain rows of one expiry and type, in strike order"""
+        start, stop = self._block(expiration, option_type)
+        return self.order[start:stop]
+        
+    def strikes_for(self, expiration: str, option_type: OptionType) -> np.ndarray:
+        """Sorted strikes of one expiry and type"""
+        start, stop = self._block(expiration, option_type)
+        return self.strikes[start:stop]
+        
+    def find_strike(self, expiration: str, option_type: OptionType, strike: float,
+                    tolerance: float = 0.01) -> Optional[int]:
+        """
+        Row of the contract at a strike (binary search)
+        
+        Args:
+            expiration: Expiration label
+            option_type: Call or put
+            strike: Target strike
+            tolerance: Maximum |strike difference| accepted as a match
+            
+        Returns:
+            Chain row or None
+        """
+        start, stop = self._block(expiration, option_type)
+        if start == stop:
+            return None
+        pos = start + int(np.searchsorted(self.strikes[start:stop], strike))
+        for candidate in (pos - 1, pos):
+            if start <= candidate < stop and abs(self.strikes[candidate] - strike) < tolerance:
+                return int(self.order[candidate])
+        return None
+        
+    def nearest_delta(self, expiration: str, option_type: OptionType, target_delta: float,
+                      min_abs_delta: float = 0.01) -> Optional[int]:
+        """
+        Row whose delta is closest to a target (binary search on sorted deltas)
+        
+        Args:
+            expiration: Expiration label
+            option_type: Call or put
+            target_delta: Target delta (negative for puts)
+            min_abs_delta: Rows with |delta| at or below this are ignored
+            
+        Returns:
+            Chain row or None if no row in the block has a usable delta
+        """
+        key = (expiration, option_type)
+        if key not in self._delta_blocks:
+            rows = self.rows(expiration, option_type)
+            deltas = self.chain.delta[rows]
+            usable = np.abs(deltas) > min_abs_delta
+            rows, deltas = rows[usable], deltas[usable]
+            by_delta = np.argsort(deltas, kind='stable')
+            self._delta_blocks[key] = (deltas[by_delta], rows[by_delta])
+            
+        deltas, rows = self._delta_blocks[key]
+        if len(deltas) == 0:
+            return None
+        pos = int(np.searchsorted(deltas, target_delta))
+        candidates = [i for i in (pos - 1, pos) if 0 <= i < len(deltas)]
+        best = min(candidates, key=lambda i: abs(deltas[i] - target_delta))
+        return int(rows[best])
+        
+    def contract(self, expiration: str, option_type: OptionType, strike: float,
+                 tolerance: float = 0.01) -> Optional[OptionContract]:
+        """OptionContract view at a strike, or None"""
+        row = self.find_strike(expiration, option_type, strike, tolerance)
+        return None if row is None else self.chain.contract(row)
+
+
+def main():
+    """
+    Test the columnar option chain
+    """
+    import tracemalloc
+    
+    print("=" * 80)
+    print("SPRINT 16: COLUMNAR OPTION CHAIN TEST")
+    print("=" * 80)
+    
+    rng = np.random.default_rng(16)
+    n = 10000
+    spot = 636.0
+    expiries = pd.date_range('2025-08-15', periods=20, freq='W-FRI').strftime('%Y-%m-%d')
+    expiry = rng.choice(expiries, n)
+    strikes = np.round(rng.uniform(500, 770, n))
+    bids = rng.uniform(0.5, 20, n).round(2)
+    df = pd.DataFrame({
+        'contract_symbol': [f"SPY{e}{k:.0f}{i}" for i, (e, k) in enumerate(zip(expiry, strikes))],
+        'underlying': 'SPY', 'strike': strikes, 'expiration': expiry,
+        'option_type': rng.choice(['C', 'P'], n), 'bid': bids, 'ask': bids + 0.05, 'last': bids,
+        'volume': rng.integers(0, 1000, n), 'open_interest': rng.integers(0, 5000, n),
+        'delta': rng.uniform(-1, 1, n), 'gamma': 0.01, 'theta': -0.05, 'vega': 0.2,
+        'implied_volatility': rng.uniform(0.1, 0.5, n), 'mid_price': 0.0,
+        'days_to_expiration': (pd.to_datetime(expiry) - pd.Timestamp('2025-08-01')).days,
+        'underlying_price': spot, 'moneyness': strikes / spot
+    })
+    
+    tracemalloc.start()
+    start = datetime.now()
+    chain = OptionChain.from_dataframe(df)
+    chain_ms = (datetime.now() - start).total_seconds() * 1000
+    _, chain_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    tracemalloc.start()
+    start = datetime.now()
+    contracts = [OptionContract(
+        symbol=row.contract_symbol, underlying=row.underlying, strike=row.strike, expiration=row.expiration,
+        option_type=OptionType(row.option_type), bid=row.bid, ask=row.ask, last=row.last,
+        volume=row.volume, open_interest=row.open_interest, delta=row.delta, gamma=row.gamma,
+        theta=row.theta, vega=row.vega, implied_volatility=row.implied_volatility,
+        mid_price=row.mid_price, days_to_expiration=row.days_to_expiration,
+        underlying_price=row.underlying_price, moneyness=row.moneyness
+    ) for _, row in df.iterrows()]
+    rows_ms = (datetime.now() - start).total_seconds() * 1000
+    _, rows_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    print(f"{n:,} contracts:")
+    print(f"  OptionChain.from_dataframe: {chain_ms:.1f}ms, columns {chain.nbytes / 1024:.0f} KB "
+          f"(peak {chain_peak / 1024:.0f} KB)")
+    print(f"  iterrows -> {len(contracts):,} OptionContract: {rows_ms:.1f}ms (peak {rows_peak / 1024:.0f} KB)")
+    print(f"  {chain}")
+    
+    # Sorted by expiry/type/strike
+    ordered = np.all(np.diff(chain.days_to_expiration) >= 0)
+    print(f"  Sorted by expiry: {ordered}, first rows: {chain.option_types[:3]} {chain.strike[:3]}")
+    
+    # Filtering without materializing contracts
+    near = chain.select((np.abs(chain.days_to_expiration - 30) <= 7) & chain.is_call)
+    print(f"  Calls within 7d of 30 DTE: {len(near)}; first view: {near[0].symbol} "
+          f"K={near[0].strike} mid={near[0].mid_price:.2f}")
+          
+    # Round trip
+    round_trip = OptionChain.from_dataframe(chain.to_dataframe())
+    same = all(np.array_equal(round_trip.columns[c], chain.columns[c]) for c in chain.columns)
+    print(f"  DataFrame round trip identical: {same}; "
+          f"to_dataframe shares memory: {np.shares_memory(chain.to_dataframe()['strike'].to_numpy(), chain.strike)}")
+          
+    # Shared strike/expiry index
+    start = datetime.now()
+    index = chain.index
+    build_ms = (datetime.now() - start).total_seconds() * 1000
+    expiration = index.nearest_expiry(30, max_distance=7)
+    start = datetime.now()
+    for strike in range(500, 770):
+        index.find_strike(expiration, OptionType.CALL, float(strike))
+    lookup_us = (datetime.now() - start).total_seconds() * 1e6 / 270
+    row = index.nearest_delta(expiration, OptionType.CALL, 0.15)
+    print(f"  Index: built in {build_ms:.1f}ms, {len(index.expirations)} expiries; "
+          f"strike lookup {lookup_us:.1f}us; {expiration} 0.15-delta call K={chain.strike[row]} "
+          f"(delta {chain.delta[row]:.3f})")
+          
+    # Marking 1,000 open legs: keyed gather vs nested scan
+    legs = [OptionPosition(contract=chain.contract(int(i)), quantity=-1, entry_price=1.0,
+                           entry_date=datetime(2025, 8, 1))
+            for i in rng.choice(len(chain), 1000, replace=False)]
+    today = OptionChain.from_dataframe(df.assign(bid=df['bid'] + 0.10, ask=df['ask'] + 0.10))
+    start = datetime.now()
+    found = today.mark_legs(legs)
+    keyed_ms = (datetime.now() - start).total_seconds() * 1000
+    start = datetime.now()
+    scanned = sum(1 for leg in legs[:50] for contract in today
+                  if (contract.strike == leg.contract.strike and contract.option_type == leg.contract.option_type
+                      and contract.expiration == leg.contract.expiration))
+    scan_ms = (datetime.now() - start).total_seconds() * 1000 * len(legs) / 50
+    print(f"  Marked {found.sum()}/{len(legs)} legs in {keyed_ms:.2f}ms "
+          f"(nested scan est. {scan_ms:.0f}ms, {scanned} key matches for 50 legs); first leg bid now {legs[0].contract.bid:.2f}")
+          
+    print("\nColumnar Option Chain test completed [SUCCESS]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,498 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Sprint 16: Parallel Backtest Runner
+Multi-year Iron Condor parameter studies on a process pool
+
+One OptionsBacktestEngine walks one date range serially. Parameter studies
+are embarrassingly parallel: every (parameter set, date block) pair is an
+independent shard. Chains are loaded once into an on-disk columnar store
+that every worker memory-maps, so a day's chain costs a few page-cache
+slices instead of a vendor request or a pickle per worker.
+
+Key Features:
+- ChainStore: one flat binary file per OptionChain column plus a JSON
+  manifest of day row ranges, memory-mapped read-only by workers
+- Sharding by parameter set and optionally by date block
+- Date blocks replay a warm-up window to rebuild inherited positions,
+  verified against the previous block and re-run from the carried-over
+  state on mismatch, so sharded results equal an unsharded run
+- Per-shard PerformanceTrackers merged per parameter set
+- One summary row per parameter set
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple, Union
+import logging
+from dataclasses import dataclass, asdict, replace
+from concurrent.futures import ProcessPoolExecutor
+
+# Add parent directory for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from options_backtesting.core_engine import OptionsBacktestEngine, PerformanceTracker, ChainPrefetcher
+from options_backtesting.option_chain import OptionChain
+from options_backtesting.greeks_engine import GreeksEngine, BlackScholesCalculator
+from options_backtesting.fill_models import FillModel
+from options_backtesting.iron_condor_strategy import IronCondorStrategy, IronCondorParameters
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ChainStore:
+    """
+    On-disk columnar store of daily option chains for one underlying
+    
+    Each column of every day's chain is appended to one binary file; the
+    manifest records dtypes, the row range of each day and the expiration
+    table. Opening the store memory-maps the files read-only, so any number
+    of processes share one copy through the OS page cache and a day's chain
+    is a set of zero-copy slices.
+    """
+    
+    MANIFEST = 'manifest.json'
+    DTYPES = {
+        **{name: 'float64' for name in OptionChain.FLOAT_COLUMNS},
+        **{name: 'int64' for name in OptionChain.INT_COLUMNS},
+        'is_call': 'bool',
+        'expiry_codes': 'int32'
+    }
+    
+    def __init__(self, path: str):
+        """
+        Open an existing store
+        
+        Args:
+            path: Store directory (written by ChainStore.build)
+        """
+        with open(os.path.join(path, self.MANIFEST)) as f:
+            manifest = json.load(f)
+            
+        self.path = path
+        self.underlying = manifest['underlying']
+        self.n_rows = manifest['n_rows']
+        self.expirations = np.array(manifest['expirations'], dtype=object)
+        self.days: Dict[str, Tuple[int, int]] = {day: (start, stop) for day, start, stop in manifest['days']}
+        
+        self.arrays: Dict[str, np.ndarray] = {}
+        for name, dtype in self.DTYPES.items():
+            if self.n_rows:
+                self.arrays[name] = np.memmap(os.path.join(path, f"{name}.bin"), dtype=dtype,
+                                              mode='r', shape=(self.n_rows,))
+            else:
+                self.arrays[name] = np.empty(0, dtype=dtype)
+                
+    @classmethod
+    def build(cls, data_manager: Any, path: str, start_date: datetime, end_date: datetime,
+              symbol: str = 'SPY', prefetch_days: int = 2) -> 'ChainStore':
+        """
+        Load every trading day's chain once and write the store
+        
+        Chains are streamed to disk day by day, so memory stays at one
+        chain regardless of the date range.
+        
+        Args:
+            data_manager: Object with get_options_chain(symbol, 'YYYY-MM-DD')
+                (HistoricalOptionsManager)
+            path: Store directory (created if missing, files overwritten)
+            start_date: First day (inclusive)
+            end_date: Last day (inclusive)
+            symbol: Underlying symbol
+            prefetch_days: Chains loaded ahead while the current day is written
+            
+        Returns:
+            The opened store
+        """
+        os.makedirs(path, exist_ok=True)
+        files = {name: open(os.path.join(path, f"{name}.bin"), 'wb') for name in cls.DTYPES}
+        expiration_codes: Dict[str, int] = {}
+        days = []
+        n_rows = 0
+        
+        try:
+            for day, chain in ChainPrefetcher(data_manager, symbol, start_date, end_date, lookahead=prefetch_days):
+                chain = OptionChain.ensure(chain)
+                
+                # Day-local expiry codes -> store-wide expiration table
+                local_to_global = np.array([expiration_codes.setdefault(e, len(expiration_codes))
+                                            for e in chain.expirations.tolist()], dtype=np.int32)
+                arrays = dict(chain.columns)
+                arrays['is_call'] = chain.is_call
+                arrays['expiry_codes'] = local_to_global[chain.expiry_codes]
+                
+                for name, dtype in cls.DTYPES.items():
+                    np.ascontiguousarray(arrays[name], dtype=dtype).tofile(files[name])
+                    
+                days.append((day.strftime('%Y-%m-%d'), n_rows, n_rows + len(chain)))
+                n_rows += len(chain)
+        finally:
+            for f in files.values():
+                f.close()
+                
+        with open(os.path.join(path, cls.MANIFEST), 'w') as f:
+            json.dump({
+                'underlying': symbol,
+                'n_rows': n_rows,
+                'expirations': list(expiration_codes),
+                'days': days,
+                'created': datetime.now().isoformat()
+            }, f)
+            
+        logger.info(f"Chain store built: {len(days)} days, {n_rows:,} rows at {path}")
+        return cls(path)
+        
+    def get_options_chain(self, symbol: str, date: str) -> OptionChain:
+        """
+        Chain for one day as zero-copy slices of the mapped columns
+        
+        Args:
+            symbol: Underlying symbol (must match the store)
+            date: Date in YYYY-MM-DD format
+            
+        Returns:
+            OptionChain (empty if the day is not in the store)
+        """
+        rows = self.days.get(date)
+        if rows is None or symbol != self.underlying:
+            return OptionChain.from_contracts([])
+            
+        start, stop = rows
+        columns = {name: self.arrays[name][start:stop]
+                   for name in OptionChain.FLOAT_COLUMNS + OptionChain.INT_COLUMNS}
+        return OptionChain(columns, self.arrays['is_call'][start:stop], self.arrays['expiry_codes'][start:stop],
+                           self.expirations, self.underlying, presorted=True)
+                           
+    @property
+    def trading_days(self) -> List[str]:
+        return list(self.days)
+        
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self.arrays.values())
+
+@dataclass
+class ShardTask:
+    """
+    One (parameter set, date block) backtest
+    """
+    store_path: str
+    parameter_index: int
+    parameters: IronCondorParameters
+    block_index: int
+    start_date: datetime      # First day recorded in results
+    end_date: datetime
+    warmup_start: datetime    # First day simulated (== start_date for the first block)
+    initial_capital: float
+    initial_state: Optional[Dict[str, Any]] = None  # Carried-over engine state (skips warm-up)
+    fill_model: Optional[FillModel] = None
+
+@dataclass
+class ShardResult:
+    """
+    Output of one shard
+    """
+    parameter_index: int
+    block_index: int
+    tracker: PerformanceTracker
+    start_positions: Tuple       # position_signature() when the block starts
+    end_state: Dict[str, Any]    # OptionsBacktestEngine.snapshot_state() after the block
+    trades_opened: int
+    runtime_seconds: float
+
+def position_signature(positions: List[Any]) -> Tuple:
+    """Hashable identity of a set of open positions (entry date, expiry, leg strikes and prices)"""
+    return tuple(sorted(
+        (position.entry_date, position.expiration) + tuple(
+            (leg.contract.strike, leg.quantity, round(leg.entry_price, 6))
+            for leg in position.legs
+        )
+        for position in positions if position.is_open
+    ))
+
+# Per-process store cache: workers map each store once
+_WORKER_STORES: Dict[str, ChainStore] = {}
+
+def _init_worker():
+    """Process pool initializer: keep per-trade INFO logs out of the parent's output"""
+    logging.disable(logging.INFO)
+
+def run_shard(task: ShardTask) -> ShardResult:
+    """
+    Run one shard against the memory-mapped store
+    
+    A carried-over state starts the block directly. Otherwise the engine
+    first replays the warm-up window so that positions opened before the
+    block are open at its boundary; only records from the block start on
+    are kept.
+    """
+    start = time.perf_counter()
+    store = _WORKER_STORES.get(task.store_path)
+    if store is None:
+        store = _WORKER_STORES[task.store_path] = ChainStore(task.store_path)
+        
+    strategy = IronCondorStrategy(parameters=task.parameters, data_manager=store, greeks_engine=GreeksEngine())
+    engine = OptionsBacktestEngine(initial_capital=task.initial_capital, data_manager=store,
+                                   strategy=strategy, symbol=store.underlying, prefetch_days=0,
+                                   fill_model=task.fill_model)
+                                   
+    if task.initial_state is not None:
+        engine.restore_state(task.initial_state)
+    elif task.warmup_start < task.start_date:
+        engine.run_backtest(task.warmup_start, task.start_date - timedelta(days=1))
+    start_positions = position_signature(engine.positions)
+    
+    engine.run_backtest(task.start_date, task.end_date)
+    
+    return ShardResult(
+        parameter_index=task.parameter_index,
+        block_index=task.block_index,
+        tracker=engine.performance.since(task.start_date),
+        start_positions=start_positions,
+        end_state=engine.snapshot_state(),
+        trades_opened=len([p for p in engine.positions if p.entry_date >= task.start_date]),
+        runtime_seconds=time.perf_counter() - start
+    )
+
+class ParallelBacktestRunner:
+    """
+    Iron Condor parameter studies sharded over a process pool
+    
+    With date blocks, every block of every parameter set runs at once,
+    each replaying a warm-up window to rebuild the positions it inherits.
+    The inherited positions are then checked against the previous block's
+    final positions; blocks where the warm-up did not reproduce them (the
+    strategy's state reaches back further than the window) are re-run from
+    the previous block's carried-over state. Results are therefore identical
+    to an unsharded run.
+    """
+    
+    def __init__(self, store: Union[str, ChainStore], max_workers: Optional[int] = None,
+                 initial_capital: float = 100000.0, block_days: Optional[int] = None,
+                 warmup_days: Optional[int] = None, fill_model: Optional[FillModel] = None):
+        """
+        Initialize runner
+        
+        Args:
+            store: ChainStore or its directory
+            max_workers: Worker processes (default os.cpu_count(); 1 runs in-process)
+            initial_capital: Starting capital of every backtest
+            block_days: Also split the date range into blocks of this many
+                calendar days (default one block)
+            warmup_days: Calendar days replayed before each later block
+                (default the longest target DTE + 14, which covers a
+                position's full holding period)
+            fill_model: FillModel used by every backtest (default bid/ask)
+        """
+        self.store_path = store.path if isinstance(store, ChainStore) else store
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.initial_capital = initial_capital
+        self.block_days = block_days
+        self.warmup_days = warmup_days
+        self.fill_model = fill_model
+        self.trackers: Dict[int, PerformanceTracker] = {}
+        self.blocks_rerun = 0
+        
+    def shard(self, parameter_sets: List[IronCondorParameters], start_date: datetime,
+              end_date: datetime) -> List[ShardTask]:
+        """
+        Split a study into (parameter set, date block) tasks
+        
+        Args:
+            parameter_sets: Strategy parameters to test
+            start_date: Study start
+            end_date: Study end
+            
+        Returns:
+            List of ShardTask
+        """
+        warmup_days = self.warmup_days
+        if warmup_days is None:
+            warmup_days = max(p.target_dte for p in parameter_sets) + 14
+            
+        blocks = []
+        block_start = start_date
+        while block_start <= end_date:
+            block_end = min(block_start + timedelta(days=self.block_days - 1), end_date) if self.block_days else end_date
+            blocks.append((block_start, block_end))
+            block_start = block_end + timedelta(days=1)
+            
+        return [
+            ShardTask(
+                store_path=self.store_path,
+                parameter_index=i,
+                parameters=parameters,
+                block_index=b,
+                start_date=block_start,
+                end_date=block_end,
+                warmup_start=block_start if b == 0 else max(block_start - timedelta(days=warmup_days), start_date),
+                initial_capital=self.initial_capital,
+                fill_model=self.fill_model
+            )
+            for i, parameters in enumerate(parameter_sets)
+            for b, (block_start, block_end) in enumerate(blocks)
+        ]
+        
+    def _map(self, tasks: List[ShardTask], pool: Optional[ProcessPoolExecutor]) -> List[ShardResult]:
+        if pool is None:
+            return [run_shard(task) for task in tasks]
+        return list(pool.map(run_shard, tasks, chunksize=1))
+        
+    def run(self, parameter_sets: List[IronCondorParameters], start_date: datetime,
+            end_date: datetime) -> pd.DataFrame:
+        """
+        Run a parameter study
+        
+        Args:
+            parameter_sets: Strategy parameters to test
+            start_date: Study start
+            end_date: Study end
+            
+        Returns:
+            DataFrame with one row per parameter set: the parameters, the
+            merged performance summary, blocks and summed shard runtime.
+            Merged trackers are kept in self.trackers by parameter index.
+        """
+        tasks = self.shard(parameter_sets, start_date, end_date)
+        n_blocks = max(t.block_index for t in tasks) + 1 if tasks else 0
+        logger.info(f"Running {len(tasks)} shards ({len(parameter_sets)} parameter sets x {n_blocks} blocks) "
+                    f"on {self.max_workers} worker(s)")
+                    
+        pool = (ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker)
+                if self.max_workers > 1 else None)
+        try:
+            results = {(r.parameter_index, r.block_index): r for r in self._map(tasks, pool)}
+            
+            # Boundary check, block by block: re-run from the carried state where
+            # the warm-up did not rebuild the previous block's open positions
+            tasks_by_key = {(t.parameter_index, t.block_index): t for t in tasks}
+            self.blocks_rerun = 0
+            for block in range(1, n_blocks):
+                reruns = []
+                for i in range(len(parameter_sets)):
+                    carried = results[(i, block - 1)].end_state
+                    if results[(i, block)].start_positions != position_signature(carried['positions']):
+                        task = tasks_by_key[(i, block)]
+                        reruns.append(replace(task, warmup_start=task.start_date, initial_state=carried))
+                for result in self._map(reruns, pool):
+                    results[(result.parameter_index, result.block_index)] = result
+                self.blocks_rerun += len(reruns)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+                
+        if self.blocks_rerun:
+            logger.info(f"{self.blocks_rerun} block(s) re-run from carried-over positions")
+            
+        rows = []
+        self.trackers = {}
+        for i, parameters in enumerate(parameter_sets):
+            shards = [results[(i, block)] for block in range(n_blocks)]
+            tracker = PerformanceTracker.merge([r.tracker for r in shards], self.initial_capital)
+            self.trackers[i] = tracker
+            rows.append({
+                **asdict(parameters),
+                **tracker.get_performance_summary(),
+                'blocks': len(shards),
+                'trades_opened': sum(r.trades_opened for r in shards),
+                'open_positions': len(shards[-1].end_state['positions']) if shards else 0,
+                'runtime_seconds': sum(r.runtime_seconds for r in shards)
+            })
+            
+        return pd.DataFrame(rows)
+
+class SyntheticHistory:
+    """
+    Synthetic daily SPY chains (random-walk spot, weekly expiries, skewed
+    flat-term vol) for exercising the runner without vendor data
+    """
+    
+    def __init__(self, start_date: datetime, end_date: datetime, spot: float = 470.0, seed: int = 16):
+        rng = np.random.default_rng(seed)
+        days = pd.bdate_range(start_date, end_date)
+        path = spot * np.exp(np.cumsum(rng.normal(0.0002, 0.009, len(days))))
+        self.spots = dict(zip(days.strftime('%Y-%m-%d'), path))
+        
+    def get_options_chain(self, symbol: str, date: str) -> OptionChain:
+        spot = self.spots.get(date)
+        if spot is None:
+            return OptionChain.from_contracts([])
+            
+        day = pd.Timestamp(date)
+        fridays = pd.date_range(day + timedelta(days=1), day + timedelta(days=63), freq='W-FRI')
+        strikes = np.arange(np.floor(spot * 0.85), np.ceil(spot * 1.15), 1.0)
+        dte = np.repeat((fridays - day).days.to_numpy(), 2 * len(strikes))
+        strike = np.tile(strikes, 2 * len(fridays))
+        is_call = np.tile(np.repeat([False, True], len(strikes)), len(fridays))
+        iv = 0.14 + 0.25 * np.maximum(1.0 - strike / spot, 0.0)
+        
+        greeks = BlackScholesCalculator.calculate_greeks_vectorized(spot, strike, dte / 365.0, 0.05, iv, is_call)
+        price = greeks['price']
+        columns = {
+            'strike': strike, 'bid': np.maximum(price - 0.02, 0.01), 'ask': price + 0.02, 'last': price,
+            'delta': greeks['delta'], 'gamma': greeks['gamma'], 'theta': greeks['theta'], 'vega': greeks['vega'],
+            'implied_volatility': iv, 'mid_price': price + 0.0, 'underlying_price': np.full(len(strike), spot),
+            'moneyness': strike / spot, 'volume': np.full(len(strike), 500), 'open_interest': np.full(len(strike), 2000),
+            'days_to_expiration': dte.astype(np.int64)
+        }
+        expiry_codes = np.repeat(np.arange(len(fridays), dtype=np.int32), 2 * len(strikes))
+        return OptionChain(columns, is_call, expiry_codes, np.array(fridays.strftime('%Y-%m-%d'), dtype=object), symbol)
+
+
+def main():
+    """
+    Test the parallel backtest runner
+    """
+    print("=" * 80)
+    print("SPRINT 16: PARALLEL BACKTEST RUNNER TEST")
+    print("=" * 80)
+    
+    start_date, end_date = datetime(2023, 1, 2), datetime(2023, 12, 29)
+    store_dir = tempfile.mkdtemp(prefix='chain_store_')
+    
+    start = time.perf_counter()
+    store = ChainStore.build(SyntheticHistory(start_date, end_date), store_dir, start_date, end_date)
+    print(f"Chain store: {len(store.trading_days)} days, {store.n_rows:,} rows, "
+          f"{store.nbytes / 1e6:.1f} MB mapped, built in {time.perf_counter() - start:.1f}s")
+          
+    parameter_sets = [
+        IronCondorParameters(target_dte=dte, delta_short_call=delta, delta_short_put=-delta,
+                             min_premium_collected=0.1)
+        for dte in (30, 45) for delta in (0.12, 0.18)
+    ]
+    workers = os.cpu_count() or 1
+    
+    # Parameter sharding only
+    start = time.perf_counter()
+    runner = ParallelBacktestRunner(store, max_workers=workers)
+    study = runner.run(parameter_sets, start_date, end_date)
+    study_seconds = time.perf_counter() - start
+    
+    columns = ['target_dte', 'delta_short_call', 'total_trades', 'win_rate_pct',
+               'total_return_pct', 'max_drawdown_pct', 'final_portfolio_value']
+    print(f"\n{len(parameter_sets)} parameter sets on {workers} worker(s): {study_seconds:.1f}s wall, "
+          f"{study['runtime_seconds'].sum():.1f}s of shard compute")
+    print(study[columns].round(3).to_string(index=False))
+    
+    # Date blocks with warm-up carry-over reproduce the unsharded run
+    blocked = ParallelBacktestRunner(store, max_workers=workers, block_days=91)
+    blocked_study = blocked.run(parameter_sets[:1], start_date, end_date)
+    serial = runner.trackers[0]
+    merged = blocked.trackers[0]
+    value_gap = abs(serial.portfolio_values[serial.days - 1] - merged.portfolio_values[merged.days - 1])
+    print(f"\nQuarterly blocks ({blocked_study['blocks'].iloc[0]}, {blocked.blocks_rerun} re-run from carried "
+          f"state): {len(merged.trades)} trades vs {len(serial.trades)} unsharded, final value gap "
+          f"${value_gap:.2f}, {merged.days} vs {serial.days} days")
+          
+    print("\nParallel Backtest Runner test completed [SUCCESS]")
+
+
+if __name__ == "__main__":
+    main()
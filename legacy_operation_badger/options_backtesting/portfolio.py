@@ -0,0 +1,519 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Sprint 16: Multi-Strategy Options Portfolio
+Portfolio leg table and strategy plugins for running several option strategies in one engine
+
+Every open leg of every position is one row of a columnar LegTable:
+position id, contract key, quantity, strike, type, expiry and the latest
+marks. Marking is one searchsorted gather against the day's chain.
+Portfolio value, Greeks and margin are column arithmetic followed by a
+bincount group-by over position ids, with no per-position Python
+properties. Strategies other than the Iron Condor plug into
+OptionsBacktestEngine through the StrategyPlugin interface and produce
+generic N-leg positions.
+
+Key Features:
+- LegTable: preallocated leg rows, vectorized marking and compaction
+- Per-position and portfolio Greeks, value and margin by group-by
+- Stress-scenario margin (worst expiry loss within +/-15% of spot)
+- StrategyPlugin base with delta/expiry leg selection and exit rules
+- Vertical spreads (incl. the Sprint 19 bull call spread), short
+  strangles and calendar spreads
+"""
+
+import os
+import sys
+import numpy as np
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+# Add parent directory for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from options_backtesting.core_engine import (
+    OptionContract, OptionType, MultiLegPosition, expiry_day_number
+)
+from options_backtesting.option_chain import OptionChain, ChainIndex
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class LegTable:
+    """
+    Columnar table of the open legs of a portfolio
+    
+    Rows of one position are contiguous and in the position's leg order.
+    Closing a position clears its rows' open flag; the table compacts
+    itself once most rows are closed, so its size tracks the open book.
+    """
+    STATIC_COLUMNS = {
+        'position_id': np.int64, 'key': np.int64, 'quantity': np.float64, 'strike': np.float64,
+        'is_call': bool, 'expiry_day': np.int64, 'entry_price': np.float64, 'open': bool
+    }
+    MARK_COLUMNS = ('bid', 'ask', 'mid_price', 'delta', 'gamma', 'theta', 'vega', 'implied_volatility')
+    GREEK_NAMES = ('delta', 'gamma', 'theta', 'vega')
+    
+    def __init__(self, capacity: int = 256):
+        """
+        Initialize table
+        
+        Args:
+            capacity: Initial number of leg rows
+        """
+        self.size = 0
+        self.open_rows = 0
+        self.columns: Dict[str, np.ndarray] = {name: np.zeros(capacity, dtype)
+                                               for name, dtype in self.STATIC_COLUMNS.items()}
+        self.columns.update({name: np.zeros(capacity) for name in self.MARK_COLUMNS})
+        self.blocks: Dict[int, Tuple[int, int]] = {}  # position id -> (start, stop) rows
+        
+    def __getattr__(self, name: str) -> np.ndarray:
+        """Column access as attributes (views of the filled rows)"""
+        columns = self.__dict__.get('columns')
+        if columns is not None and name in columns:
+            return columns[name][:self.size]
+        raise AttributeError(name)
+        
+    def __len__(self) -> int:
+        return self.open_rows
+        
+    def _reserve(self, rows: int):
+        """Grow every column to hold at least this many rows"""
+        capacity = len(self.columns['key'])
+        if rows <= capacity:
+            return
+        while capacity < rows:
+            capacity *= 2
+        for name, column in self.columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self.columns[name] = grown
+            
+    def add(self, position_id: int, legs: List[Any]):
+        """
+        Append a position's legs
+        
+        Args:
+            position_id: Position identifier
+            legs: OptionPosition legs, in the position's order
+        """
+        n = len(legs)
+        self._reserve(self.size + n)
+        rows = slice(self.size, self.size + n)
+        contracts = [leg.contract for leg in legs]
+        columns = self.columns
+        
+        columns['position_id'][rows] = position_id
+        columns['key'][rows] = [leg.contract_key for leg in legs]
+        columns['quantity'][rows] = [leg.quantity for leg in legs]
+        columns['strike'][rows] = [contract.strike for contract in contracts]
+        columns['is_call'][rows] = [contract.option_type == OptionType.CALL for contract in contracts]
+        columns['expiry_day'][rows] = [expiry_day_number(contract.expiration) for contract in contracts]
+        columns['entry_price'][rows] = [leg.entry_price for leg in legs]
+        columns['open'][rows] = True
+        for name in self.MARK_COLUMNS:
+            columns[name][rows] = [getattr(contract, name) for contract in contracts]
+            
+        self.blocks[position_id] = (self.size, self.size + n)
+        self.size += n
+        self.open_rows += n
+        
+    def close(self, position_id: int):
+        """Mark a position's legs closed"""
+        block = self.blocks.pop(position_id, None)
+        if block is None:
+            return
+        start, stop = block
+        self.columns['open'][start:stop] = False
+        self.open_rows -= stop - start
+        if self.size > 64 and self.open_rows < self.size // 2:
+            self._compact()
+            
+    def _compact(self):
+        """Drop closed rows (open rows keep their order)"""
+        keep = np.flatnonzero(self.columns['open'][:self.size])
+        for column in self.columns.values():
+            column[:len(keep)] = column[keep]
+        self.size = len(keep)
+        
+        ids = self.columns['position_id'][:self.size]
+        starts = np.flatnonzero(np.diff(ids, prepend=-1)) if self.size else np.array([], dtype=np.int64)
+        stops = np.append(starts[1:], self.size)
+        self.blocks = {int(ids[start]): (int(start), int(stop)) for start, stop in zip(starts, stops)}
+        
+    def open_index(self) -> np.ndarray:
+        """Rows of open legs"""
+        return np.flatnonzero(self.columns['open'][:self.size])
+        
+    def mark(self, chain: OptionChain) -> int:
+        """
+        Copy the chain's quotes and Greeks onto open legs
+        
+        Legs not listed in the chain keep their last marks.
+        
+        Returns:
+            Number of legs marked
+        """
+        rows = self.open_index()
+        if not len(rows):
+            return 0
+        found = chain.locate(self.columns['key'][rows])
+        hit = found >= 0
+        rows, found = rows[hit], found[hit]
+        for name in self.MARK_COLUMNS:
+            self.columns[name][rows] = chain.columns[name][found]
+        return len(rows)
+        
+    def _groups(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Open rows, their dense position codes and the position ids"""
+        rows = self.open_index()
+        ids, codes = np.unique(self.columns['position_id'][rows], return_inverse=True)
+        return rows, codes, ids
+        
+    def market_value(self) -> float:
+        """Market value of all open legs (mid)"""
+        rows = self.open_index()
+        return float(np.dot(self.columns['quantity'][rows], self.columns['mid_price'][rows]) * 100)
+        
+    def greeks(self) -> Dict[str, float]:
+        """Portfolio Greeks (sum of quantity-weighted leg Greeks)"""
+        rows = self.open_index()
+        quantities = self.columns['quantity'][rows]
+        return {name: float(np.dot(quantities, self.columns[name][rows])) for name in self.GREEK_NAMES}
+        
+    def position_values(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Per-position market value and unrealized P&L
+        
+        Returns:
+            Tuple of (position ids, market values, P&L)
+        """
+        rows, codes, ids = self._groups()
+        quantities = self.columns['quantity'][rows] * 100
+        mids = self.columns['mid_price'][rows]
+        values = np.bincount(codes, quantities * mids, minlength=len(ids))
+        pnl = np.bincount(codes, quantities * (mids - self.columns['entry_price'][rows]), minlength=len(ids))
+        return ids, values, pnl
+        
+    def position_greeks(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Per-position Greeks
+        
+        Returns:
+            Tuple of (position ids, array of shape (positions, 4) with
+            delta, gamma, theta, vega)
+        """
+        rows, codes, ids = self._groups()
+        quantities = self.columns['quantity'][rows]
+        return ids, np.column_stack([
+            np.bincount(codes, quantities * self.columns[name][rows], minlength=len(ids))
+            for name in self.GREEK_NAMES
+        ]) if len(ids) else np.zeros((0, len(self.GREEK_NAMES)))
+        
+    @staticmethod
+    def _stress_grid(strikes: np.ndarray, spot: float, move: float) -> np.ndarray:
+        """Underlying prices for stress scenarios: band edges, spot and strikes inside the band"""
+        low, high = spot * (1 - move), spot * (1 + move)
+        inside = strikes[(strikes > low) & (strikes < high)]
+        return np.unique(np.concatenate([[low, spot, high], inside]))
+        
+    def margin(self, spot: float, move: float = 0.15) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Per-position margin: worst loss against current marks if the
+        legs were settled at intrinsic value anywhere within +/-move of spot
+        
+        Defined-risk structures get their max loss, debit spreads their
+        current value, and undefined-risk ones (strangles) a portfolio
+        margin style stress loss. Intrinsic value understates longer-dated
+        long legs, so calendars are margined conservatively.
+        
+        Args:
+            spot: Current underlying price
+            move: Stress move as a fraction of spot
+            
+        Returns:
+            Tuple of (position ids, margin requirements)
+        """
+        rows, codes, ids = self._groups()
+        if not len(rows):
+            return ids, np.zeros(0)
+        strikes = self.columns['strike'][rows]
+        grid = self._stress_grid(strikes, spot, move)
+        
+        intrinsic = np.maximum(np.where(self.columns['is_call'][rows], grid[:, None] - strikes,
+                                        strikes - grid[:, None]), 0.0)
+        leg_pnl = (intrinsic - self.columns['mid_price'][rows]) * self.columns['quantity'][rows] * 100
+        
+        # Group-by over (scenario, position) pairs in one bincount
+        n = len(ids)
+        flat = (codes[None, :] + n * np.arange(len(grid))[:, None]).ravel()
+        scenario_pnl = np.bincount(flat, leg_pnl.ravel(), minlength=len(grid) * n).reshape(len(grid), n)
+        return ids, np.maximum(-scenario_pnl.min(axis=0), 0.0)
+        
+    @classmethod
+    def payoff_extremes(cls, legs: List[Any], spot: float, move: float = 0.15) -> Tuple[float, float]:
+        """
+        Max profit and max loss of a new position from its entry prices,
+        settled at intrinsic value within +/-move of spot
+        
+        Args:
+            legs: OptionPosition legs with entry prices
+            spot: Underlying price at entry
+            move: Stress move as a fraction of spot
+            
+        Returns:
+            Tuple of (max profit, max loss), both in dollars
+        """
+        strikes = np.array([leg.contract.strike for leg in legs])
+        is_call = np.array([leg.contract.option_type == OptionType.CALL for leg in legs])
+        quantities = np.array([leg.quantity for leg in legs], dtype=np.float64)
+        prices = np.array([leg.entry_price for leg in legs])
+        
+        grid = cls._stress_grid(strikes, spot, move)
+        intrinsic = np.maximum(np.where(is_call, grid[:, None] - strikes, strikes - grid[:, None]), 0.0)
+        pnl = ((intrinsic - prices) * quantities * 100).sum(axis=1)
+        return float(max(pnl.max(), 0.0)), float(max(-pnl.min(), 0.0))
+
+class StrategyPlugin(ABC):
+    """
+    Base class for option strategies run by OptionsBacktestEngine
+    
+    A plugin picks the legs of a new position from the day's chain and
+    decides when its open positions close; the engine fills, books,
+    marks, settles and aggregates them. Bookkeeping attributes mirror
+    IronCondorStrategy so both kinds of strategy share engine code.
+    """
+    name = 'plugin'
+    
+    def __init__(self, target_dte: int = 45, max_dte_distance: int = 10, max_positions: int = 2,
+                 profit_target: float = 0.5, stop_loss: float = 2.0, min_dte_close: int = 7,
+                 quantity: int = 1, name: Optional[str] = None):
+        """
+        Initialize plugin
+        
+        Args:
+            target_dte: Target days to expiration of new positions
+            max_dte_distance: Maximum |DTE - target| of the chosen expiry
+            max_positions: Maximum concurrent positions
+            profit_target: Close at this fraction of the premium paid or
+                collected
+            stop_loss: Close at a loss of this fraction of the premium
+            min_dte_close: Close when the nearest leg reaches this DTE
+                (negative: hold to expiry and let the engine settle)
+            quantity: Contracts per leg
+            name: Strategy name (default the class name attribute)
+        """
+        self.name = name or self.name
+        self.target_dte = target_dte
+        self.max_dte_distance = max_dte_distance
+        self.max_positions = max_positions
+        self.profit_target = profit_target
+        self.stop_loss = stop_loss
+        self.min_dte_close = min_dte_close
+        self.quantity = quantity
+        
+        # Bookkeeping (maintained by the engine)
+        self.active_positions: List[MultiLegPosition] = []
+        self.closed_positions: List[MultiLegPosition] = []
+        self.trades_opened = 0
+        self.trades_closed = 0
+        self.total_pnl = 0.0
+        self.total_premium_collected = 0.0
+        
+    @abstractmethod
+    def select_legs(self, chain: OptionChain, index: ChainIndex) -> Optional[List[Tuple[OptionContract, int]]]:
+        """
+        Legs of a new position as (contract, signed quantity) pairs
+        
+        Args:
+            chain: Day's chain
+            index: Its strike/expiry index
+            
+        Returns:
+            List of legs, or None if no suitable position exists
+        """
+        
+    def generate_orders(self, timestamp: datetime, options_chain: Any) -> List[List[Tuple[OptionContract, int]]]:
+        """
+        New positions to open today
+        
+        Args:
+            timestamp: Current time
+            options_chain: Day's chain
+            
+        Returns:
+            List of leg lists (at most one per day)
+        """
+        if len(self.active_positions) >= self.max_positions:
+            return []
+        chain = OptionChain.ensure(options_chain)
+        legs = self.select_legs(chain, chain.index)
+        return [legs] if legs else []
+        
+    def exit_levels(self, position: MultiLegPosition) -> Tuple[float, float]:
+        """
+        Profit-target and stop-loss P&L levels of a position
+        
+        Returns:
+            Tuple of (take-profit P&L, stop-loss P&L)
+        """
+        premium = abs(position.net_premium_collected)
+        return premium * self.profit_target, -premium * self.stop_loss
+        
+    def should_close(self, position: MultiLegPosition, options_chain: Any) -> bool:
+        """Check if a (marked) position should be closed"""
+        if position.days_to_expiration <= self.min_dte_close:
+            return True
+        take_profit, stop = self.exit_levels(position)
+        return position.total_pnl >= take_profit or position.total_pnl <= stop
+        
+    def _expiry(self, index: ChainIndex, target_dte: int) -> Optional[str]:
+        """Expiration nearest a target DTE, within max_dte_distance"""
+        return index.nearest_expiry(target_dte, self.max_dte_distance)
+        
+    @staticmethod
+    def _delta_contract(chain: OptionChain, index: ChainIndex, expiration: str, option_type: OptionType,
+                        delta: float) -> Optional[OptionContract]:
+        """Quoted contract closest to a target delta"""
+        row = index.nearest_delta(expiration, option_type, delta)
+        if row is None or chain.bid[row] <= 0 or chain.ask[row] <= 0:
+            return None
+        return chain.contract(row)
+
+class VerticalSpreadPlugin(StrategyPlugin):
+    """
+    Vertical spread: long and short legs of one type and expiry
+    
+    The defaults are the Sprint 19 bull call spread (long 0.50 delta call,
+    short 0.30 delta call, 45 DTE, +100% / -50% of the debit, exit at
+    7 DTE) without its regime filter. Put credit spreads: option_type PUT,
+    long_delta -0.15, short_delta -0.30.
+    """
+    name = 'vertical'
+    
+    def __init__(self, option_type: OptionType = OptionType.CALL, long_delta: float = 0.50,
+                 short_delta: float = 0.30, target_dte: int = 45, profit_target: float = 1.0,
+                 stop_loss: float = 0.5, **kwargs):
+        super().__init__(target_dte=target_dte, profit_target=profit_target, stop_loss=stop_loss, **kwargs)
+        self.option_type = option_type
+        self.long_delta = long_delta
+        self.short_delta = short_delta
+        
+    def select_legs(self, chain: OptionChain, index: ChainIndex) -> Optional[List[Tuple[OptionContract, int]]]:
+        expiration = self._expiry(index, self.target_dte)
+        if expiration is None:
+            return None
+        long_leg = self._delta_contract(chain, index, expiration, self.option_type, self.long_delta)
+        short_leg = self._delta_contract(chain, index, expiration, self.option_type, self.short_delta)
+        if long_leg is None or short_leg is None or long_leg.strike == short_leg.strike:
+            return None
+        return [(long_leg, self.quantity), (short_leg, -self.quantity)]
+
+class StranglePlugin(StrategyPlugin):
+    """
+    Short strangle: short OTM call and short OTM put of one expiry
+    (undefined risk; margined by the stress scenarios)
+    """
+    name = 'strangle'
+    
+    def __init__(self, call_delta: float = 0.16, put_delta: float = -0.16, target_dte: int = 45,
+                 min_dte_close: int = 21, **kwargs):
+        super().__init__(target_dte=target_dte, min_dte_close=min_dte_close, **kwargs)
+        self.call_delta = call_delta
+        self.put_delta = put_delta
+        
+    def select_legs(self, chain: OptionChain, index: ChainIndex) -> Optional[List[Tuple[OptionContract, int]]]:
+        expiration = self._expiry(index, self.target_dte)
+        if expiration is None:
+            return None
+        call = self._delta_contract(chain, index, expiration, OptionType.CALL, self.call_delta)
+        put = self._delta_contract(chain, index, expiration, OptionType.PUT, self.put_delta)
+        if call is None or put is None:
+            return None
+        return [(call, -self.quantity), (put, -self.quantity)]
+
+class CalendarSpreadPlugin(StrategyPlugin):
+    """
+    Calendar spread: short the front expiry, long the back expiry at the
+    same strike; closed before the front leg expires
+    """
+    name = 'calendar'
+    
+    def __init__(self, option_type: OptionType = OptionType.CALL, delta: float = 0.50, front_dte: int = 30,
+                 back_dte: int = 60, profit_target: float = 0.25, stop_loss: float = 0.5, **kwargs):
+        super().__init__(target_dte=front_dte, profit_target=profit_target, stop_loss=stop_loss, **kwargs)
+        self.option_type = option_type
+        self.delta = delta
+        self.back_dte = back_dte
+        
+    def select_legs(self, chain: OptionChain, index: ChainIndex) -> Optional[List[Tuple[OptionContract, int]]]:
+        front = self._expiry(index, self.target_dte)
+        back = self._expiry(index, self.back_dte)
+        if front is None or back is None or index.days_to_expiration[back] <= index.days_to_expiration[front]:
+            return None
+        front_leg = self._delta_contract(chain, index, front, self.option_type, self.delta)
+        if front_leg is None:
+            return None
+        back_row = index.find_strike(back, self.option_type, front_leg.strike)
+        if back_row is None or chain.bid[back_row] <= 0:
+            return None
+        return [(front_leg, -self.quantity), (chain.contract(back_row), self.quantity)]
+
+
+def main():
+    """
+    Test multi-strategy options portfolio
+    """
+    from options_backtesting.core_engine import OptionsBacktestEngine
+    from options_backtesting.parallel_runner import SyntheticHistory
+    from options_backtesting.iron_condor_strategy import IronCondorStrategy, IronCondorParameters
+    
+    print("=" * 80)
+    print("SPRINT 16: MULTI-STRATEGY OPTIONS PORTFOLIO TEST")
+    print("=" * 80)
+    
+    logging.getLogger().setLevel(logging.WARNING)
+    start_date, end_date = datetime(2023, 1, 2), datetime(2023, 6, 30)
+    history = SyntheticHistory(start_date, end_date)
+    plugins = [
+        VerticalSpreadPlugin(name='bull_call_spread'),
+        VerticalSpreadPlugin(option_type=OptionType.PUT, long_delta=-0.15, short_delta=-0.30,
+                             profit_target=0.5, stop_loss=2.0, name='put_credit_spread'),
+        StranglePlugin(),
+        CalendarSpreadPlugin(),
+    ]
+    strategy = IronCondorStrategy(parameters=IronCondorParameters(min_premium_collected=0.1), data_manager=history)
+    engine = OptionsBacktestEngine(data_manager=history, strategy=strategy, strategies=plugins)
+    
+    start = datetime.now()
+    results = engine.run_backtest(start_date, end_date)
+    runtime = (datetime.now() - start).total_seconds()
+    
+    metrics = results['performance_metrics']
+    print(f"Backtest: {results['trading_days']} days in {runtime:.1f}s, {metrics['total_trades']} trades, "
+          f"return {metrics['total_return_pct']:.2f}%, max DD {metrics['max_drawdown_pct']:.2f}%, "
+          f"avg margin ${metrics['avg_exposure']:,.0f}")
+    for owner in [strategy] + plugins:
+        name = getattr(owner, 'name', 'iron_condor')
+        print(f"  {name:<18} opened {owner.trades_opened:>3}, closed {owner.trades_closed:>3}, "
+              f"P&L ${owner.total_pnl:>10,.2f}")
+              
+    table = engine.leg_table
+    ids, greeks = table.position_greeks()
+    _, margins = table.margin(engine.underlying_price)
+    print(f"\nOpen book: {len(ids)} positions, {len(table)} legs, portfolio Greeks "
+          f"{ {k: round(v, 3) for k, v in table.greeks().items()} }")
+    for position_id, position_greeks, requirement in zip(ids.tolist(), greeks, margins):
+        position = next(p for p in engine.positions if p.position_id == position_id)
+        print(f"  #{position_id:<4} {position.strategy_name:<18} delta {position_greeks[0]:+.3f}, "
+              f"theta {position_greeks[2]:+.3f}, margin ${requirement:,.0f}")
+              
+    print("\nMulti-Strategy Options Portfolio test completed [SUCCESS]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Sprint 16: Rate and Dividend Curves
+Term-structure rates and SPY dividends for forward-consistent option pricing
+
+A single flat 5% rate with no dividends biases SPY forwards (and therefore
+deltas) differently at every expiry. This module holds a zero-rate curve plus
+either a dividend-yield curve or a discrete dividend schedule, and turns them
+into per-expiry (rate, carry yield) pairs that the vectorized pricers consume.
+
+Key Features:
+- Continuously compounded zero curves with linear interpolation in tenor
+- Discrete dividend schedules (calendar ex-date, amount) with cumulative PV lookup
+- Per-expiry rate / dividend PV cached by expiry date for the current
+  valuation date, not per contract
+- Broadcast back to contracts through expiry codes (np.unique inverse)
+- Forward prices per expiry
+"""
+
+import numpy as np
+from datetime import datetime, date
+from typing import Dict, List, Optional, Tuple, Union
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DateLike = Union[str, date, datetime, np.datetime64]
+
+def _to_day(value: DateLike) -> np.datetime64:
+    """Calendar day of a date, datetime or 'YYYY-MM-DD' string"""
+    return np.datetime64(value, 'D')
+
+class RateCurve:
+    """
+    Continuously compounded zero-rate (or yield) curve
+    """
+    
+    def __init__(self, tenors: List[float], rates: List[float]):
+        """
+        Initialize curve
+        
+        Args:
+            tenors: Tenors in years
+            rates: Zero rates at those tenors (0.05 = 5%)
+        """
+        order = np.argsort(tenors)
+        self.tenors = np.asarray(tenors, dtype=np.float64)[order]
+        self.rates = np.asarray(rates, dtype=np.float64)[order]
+        
+    @classmethod
+    def flat(cls, rate: float) -> 'RateCurve':
+        """Constant curve"""
+        return cls([1.0], [rate])
+        
+    @classmethod
+    def from_days(cls, points: Dict[int, float]) -> 'RateCurve':
+        """
+        Curve from {days: rate}, e.g. T-bill yields {30: 0.052, 90: 0.051, 365: 0.048}
+        """
+        return cls([d / 365.0 for d in points], list(points.values()))
+        
+    def zero_rate(self, T: Union[float, np.ndarray]) -> np.ndarray:
+        """Zero rate at each tenor (flat extrapolation)"""
+        return np.interp(T, self.tenors, self.rates)
+        
+    def discount_factor(self, T: Union[float, np.ndarray]) -> np.ndarray:
+        """exp(-r(T) * T)"""
+        T = np.asarray(T, dtype=np.float64)
+        return np.exp(-self.zero_rate(T) * T)
+
+class DividendSchedule:
+    """
+    Discrete cash dividends (calendar ex-date, amount per share)
+    
+    Ex-dates stay calendar dates, so the same schedule values correctly on
+    every day of a backtest: dividends that have gone ex drop out and later
+    ones come into each expiry's window as the valuation date moves.
+    """
+    
+    def __init__(self, ex_dates: List[DateLike], amounts: List[float]):
+        """
+        Initialize schedule
+        
+        Args:
+            ex_dates: Ex-dividend dates ('YYYY-MM-DD', date or datetime)
+            amounts: Cash amount per share for each ex-date
+        """
+        ex_dates = np.array([_to_day(d) for d in ex_dates], dtype='datetime64[D]')
+        order = np.argsort(ex_dates)
+        self.ex_dates = ex_dates[order]
+        self.amounts = np.asarray(amounts, dtype=np.float64)[order]
+        
+    def present_value(self, expiries: np.ndarray, as_of: DateLike, rate_curve: RateCurve) -> np.ndarray:
+        """
+        PV of dividends going ex after the valuation date and strictly before each expiry
+        
+        Args:
+            expiries: Expiry dates (datetime64[D])
+            as_of: Valuation date
+            rate_curve: Discount curve
+            
+        Returns:
+            PV per expiry (one cumulative sum + searchsorted, no per-expiry loop)
+        """
+        expiries = np.asarray(expiries, dtype='datetime64[D]')
+        valuation = _to_day(as_of)
+        first = np.searchsorted(self.ex_dates, valuation, side='right')
+        ex_dates = self.ex_dates[first:]
+        if ex_dates.size == 0:
+            return np.zeros(expiries.shape)
+            
+        times = (ex_dates - valuation).astype(np.float64) / 365.0
+        cumulative = np.concatenate([[0.0], np.cumsum(self.amounts[first:] * rate_curve.discount_factor(times))])
+        return cumulative[np.searchsorted(ex_dates, expiries, side='left')]
+
+class CarryCurves:
+    """
+    Rates and dividends resolved per expiry
+    
+    Pricing inputs per contract are (r, q) where q is the carry yield that
+    reproduces the forward: continuous dividend yield plus, for discrete
+    dividends, -ln(1 - PV(divs)/S) / T (escrowed-dividend forward). Rate and
+    dividend PV depend only on the valuation date and the expiry date, so
+    they are cached by expiry date for the current valuation date; the cache
+    is dropped when the valuation date moves, which keeps it at one entry
+    per listed expiry however many days or minutes are priced.
+    """
+    
+    def __init__(self, rate_curve: Optional[RateCurve] = None,
+                 dividend_yield_curve: Optional[RateCurve] = None,
+                 dividend_schedule: Optional[DividendSchedule] = None):
+        """
+        Initialize carry curves
+        
+        Args:
+            rate_curve: Zero-rate curve (default flat 5%)
+            dividend_yield_curve: Continuous dividend-yield curve (default none)
+            dividend_schedule: Discrete cash dividends (default none)
+        """
+        self.rate_curve = rate_curve or RateCurve.flat(0.05)
+        self.dividend_yield_curve = dividend_yield_curve
+        self.dividend_schedule = dividend_schedule
+        
+        # Expiry date -> (rate, dividend yield, dividend PV) as of _valuation_date
+        self._expiry_cache: Dict[date, Tuple[float, float, float]] = {}
+        self._valuation_date: Optional[np.datetime64] = None
+        
+    def expiry_terms(self, expiries: np.ndarray, as_of: DateLike) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Rate, continuous dividend yield and discrete dividend PV per expiry
+        
+        Args:
+            expiries: Unique expiry dates (datetime64[D])
+            as_of: Valuation date
+            
+        Returns:
+            Tuple of arrays aligned with expiries
+        """
+        valuation = _to_day(as_of)
+        if valuation != self._valuation_date:
+            self._expiry_cache.clear()
+            self._valuation_date = valuation
+            
+        expiries = np.asarray(expiries, dtype='datetime64[D]')
+        missing = np.array([d for d in expiries.tolist() if d not in self._expiry_cache], dtype='datetime64[D]')
+        
+        if missing.size:
+            tenors = np.maximum((missing - valuation).astype(np.float64), 0.0) / 365.0
+            rates = self.rate_curve.zero_rate(tenors)
+            yields = (self.dividend_yield_curve.zero_rate(tenors) if self.dividend_yield_curve is not None
+                      else np.zeros_like(tenors))
+            pvs = (self.dividend_schedule.present_value(missing, valuation, self.rate_curve)
+                   if self.dividend_schedule is not None else np.zeros_like(tenors))
+            self._expiry_cache.update(zip(missing.tolist(), zip(rates.tolist(), yields.tolist(), pvs.tolist())))
+            
+        terms = np.array([self._expiry_cache[d] for d in expiries.tolist()]).reshape(-1, 3)
+        return terms[:, 0], terms[:, 1], terms[:, 2]
+        
+    def carry(self, T: np.ndarray, underlying_price: float, as_of: DateLike) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Per-contract rate and carry yield
+        
+        Each contract's expiry date is the valuation date plus its whole
+        days to expiry (intraday times to the expiration close keep their
+        day count). Expiry dates are reduced to unique values, resolved once
+        each, then broadcast back to the contracts through the np.unique
+        inverse codes.
+        
+        Args:
+            T: Contract expiries in years
+            underlying_price: Current underlying price (scalar or aligned with T)
+            as_of: Valuation date
+            
+        Returns:
+            Tuple of (r, q) arrays shaped like T
+        """
+        T = np.asarray(T, dtype=np.float64)
+        valuation = _to_day(as_of)
+        days = np.floor(T * 365.0 + 1e-6).astype(np.int64)
+        unique, codes = np.unique(days, return_inverse=True)
+        rates, yields, pvs = self.expiry_terms(valuation + unique.astype('timedelta64[D]'), valuation)
+        
+        codes = codes.reshape(T.shape)
+        pv = pvs[codes]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            discrete = np.where((T > 0) & (pv > 0),
+                                -np.log1p(-np.minimum(pv / underlying_price, 0.99)) / T, 0.0)
+                                
+        return rates[codes], yields[codes] + discrete
+        
+    def forwards(self, T: np.ndarray, underlying_price: float, as_of: DateLike) -> np.ndarray:
+        """Forward price per expiry: S * exp((r - q) * T)"""
+        T = np.asarray(T, dtype=np.float64)
+        r, q = self.carry(T, underlying_price, as_of)
+        return underlying_price * np.exp((r - q) * T)
+        
+    def clear_cache(self):
+        """Drop cached expiry terms (after replacing curves)"""
+        self._expiry_cache.clear()
+
+
+def main():
+    """
+    Test rate and dividend curves
+    """
+    print("=" * 80)
+    print("SPRINT 16: RATE AND DIVIDEND CURVES TEST")
+    print("=" * 80)
+    
+    as_of = '2025-08-01'
+    curves = CarryCurves(
+        rate_curve=RateCurve.from_days({30: 0.0435, 90: 0.0425, 180: 0.0410, 365: 0.0390, 730: 0.0375}),
+        dividend_schedule=DividendSchedule(
+            ['2025-09-19', '2025-12-19', '2026-03-20', '2026-06-18'], [1.83, 1.85, 1.80, 1.85]
+        )
+    )
+    
+    spot = 636.0
+    expiry_days = np.array([7, 30, 60, 120, 240, 365])
+    T = expiry_days / 365.0
+    r, q = curves.carry(T, spot, as_of)
+    forwards = curves.forwards(T, spot, as_of)
+    
+    print(f"SPY ${spot} forwards:")
+    for days, rate, carry_yield, forward in zip(expiry_days, r, q, forwards):
+        flat_forward = spot * np.exp(0.05 * days / 365.0)
+        print(f"  {days:3d}d: r={rate:.4f} q={carry_yield:.4f} F=${forward:.2f} "
+              f"(flat 5%, no dividends: ${flat_forward:.2f})")
+              
+    # Whole chain: 100k contracts over 30 expiries resolve 30 expiry terms
+    rng = np.random.default_rng(16)
+    chain_T = rng.choice(np.arange(1, 731, 25), 100000) / 365.0
+    start = datetime.now()
+    r, q = curves.carry(chain_T, spot, as_of)
+    elapsed_ms = (datetime.now() - start).total_seconds() * 1000
+    print(f"\nCarry for {len(chain_T):,} contracts in {elapsed_ms:.1f}ms "
+          f"({len(curves._expiry_cache)} cached expiries)")
+          
+    # Two months later the September dividend has gone ex: a 90-day expiry
+    # now carries the December dividend instead
+    _, q_later = curves.carry(np.array([90 / 365.0]), spot, '2025-10-01')
+    print(f"90d carry yield as of 2025-10-01: {q_later[0]:.4f} "
+          f"({len(curves._expiry_cache)} cached expiries after the valuation date moved)")
+          
+    print("\nRate and Dividend Curves test completed [SUCCESS]")
+
+
+if __name__ == "__main__":
+    main()
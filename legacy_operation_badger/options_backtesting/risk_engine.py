@@ -0,0 +1,306 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Sprint 16: Batch Portfolio Risk Engine
+Full-revaluation scenario analysis for multi-leg options books
+
+Taylor expansions from portfolio Greeks (GreeksEngine.simulate_price_impact)
+break down for large moves and short-gamma books such as Iron Condors. This
+module reprices every leg on a spot x volatility x time grid in a single
+broadcasted Black-Scholes evaluation and returns P&L surfaces alongside the
+aggregated Greeks.
+
+Key Features:
+- Legs gathered once into arrays (strike, expiry, type, quantity, volatility)
+- Scenario grid broadcast as (time, vol, spot, leg) - no Python loops
+- Sticky-strike volatility from the fitted surface, shifted by vol shocks
+- Per-leg rates and dividend carry from the engine's curves
+- Aggregate portfolio Greeks from one vectorized Greeks call
+- Worst-case scenario and long-format DataFrame export
+"""
+
+import os
+import sys
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
+import logging
+
+# Add parent directory for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from options_backtesting.core_engine import (
+    OptionContract, OptionType, OptionPosition, IronCondorPosition
+)
+from options_backtesting.greeks_engine import GreeksEngine, BlackScholesCalculator, PORTFOLIO_GREEKS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ScenarioGrid:
+    """
+    Spot x volatility x time scenario grid
+    """
+    spot_shocks: np.ndarray  # Relative spot moves (0.05 = +5%)
+    vol_shocks: np.ndarray   # Absolute volatility shifts (0.02 = +2 vol points)
+    days_forward: np.ndarray # Calendar days elapsed
+    
+    @classmethod
+    def build(cls, spot_range: float = 0.10, spot_steps: int = 50,
+              vol_range: float = 0.10, vol_steps: int = 20,
+              days_forward: tuple = (0,)) -> 'ScenarioGrid':
+        """
+        Symmetric grid around the current market
+        
+        Args:
+            spot_range: Largest relative spot move in each direction
+            spot_steps: Number of spot levels
+            vol_range: Largest absolute vol shift in each direction
+            vol_steps: Number of vol levels
+            days_forward: Horizons in calendar days
+            
+        Returns:
+            ScenarioGrid
+        """
+        return cls(
+            spot_shocks=np.linspace(-spot_range, spot_range, spot_steps),
+            vol_shocks=np.linspace(-vol_range, vol_range, vol_steps),
+            days_forward=np.asarray(days_forward, dtype=np.float64)
+        )
+        
+    @property
+    def shape(self) -> tuple:
+        return (len(self.days_forward), len(self.vol_shocks), len(self.spot_shocks))
+
+class BatchRiskEngine:
+    """
+    Broadcasted full revaluation of an options book
+    """
+    
+    def __init__(self, greeks_engine: Optional[GreeksEngine] = None,
+                 contract_multiplier: int = 100, min_volatility: float = 0.01):
+        """
+        Initialize risk engine
+        
+        Args:
+            greeks_engine: Engine supplying the risk-free rate and volatility surface
+            contract_multiplier: Shares per contract
+            min_volatility: Floor applied after vol shocks
+        """
+        self.greeks_engine = greeks_engine or GreeksEngine()
+        self.contract_multiplier = contract_multiplier
+        self.min_volatility = min_volatility
+        
+    @staticmethod
+    def flatten_positions(positions: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Normalize positions to {'contract', 'quantity'} dicts
+        
+        Accepts the dicts used by GreeksEngine.calculate_portfolio_greeks,
+        OptionPosition objects and IronCondorPosition objects (open legs only).
+        """
+        flat = []
+        for position in positions:
+            if isinstance(position, IronCondorPosition):
+                legs = [position.short_call, position.long_call, position.short_put, position.long_put]
+                flat.extend({'contract': leg.contract, 'quantity': leg.quantity}
+                            for leg in legs if leg.is_open)
+            elif isinstance(position, OptionPosition):
+                if position.is_open:
+                    flat.append({'contract': position.contract, 'quantity': position.quantity})
+            else:
+                flat.append(position)
+        return flat
+        
+    def gather_legs(self, positions: List[Any], underlying_price: float) -> Dict[str, np.ndarray]:
+        """
+        Collect leg attributes into arrays (done once per book)
+        
+        Args:
+            positions: Positions (see flatten_positions)
+            underlying_price: Current underlying price
+            
+        Returns:
+            Dict of leg arrays: strike, tte, is_call, quantity, sigma, r, q
+        """
+        flat = self.flatten_positions(positions)
+        n = len(flat)
+        contracts = [p['contract'] for p in flat]
+        
+        strike = np.fromiter((c.strike for c in contracts), dtype=np.float64, count=n)
+        tte = np.fromiter((c.days_to_expiration for c in contracts), dtype=np.float64, count=n) / 365.0
+        is_call = np.fromiter((c.option_type == OptionType.CALL for c in contracts), dtype=bool, count=n)
+        quantity = np.fromiter((p['quantity'] for p in flat), dtype=np.float64, count=n)
+        
+        surface = self.greeks_engine.volatility_surface
+        if surface.is_built:
+            sigma = surface.get_implied_volatilities(strike, tte, underlying_price)
+        else:
+            sigma = np.fromiter((c.implied_volatility for c in contracts), dtype=np.float64, count=n)
+            sigma = np.where(sigma > 0, sigma, 0.2)
+            
+        # Rate and carry yield per leg from the engine's curves (fixed across scenarios)
+        r, q = self.greeks_engine.carry_terms(tte, underlying_price)
+        
+        return {'strike': strike, 'tte': tte, 'is_call': is_call, 'quantity': quantity, 'sigma': sigma,
+                'r': r, 'q': q}
+        
+    def portfolio_greeks(self, legs: Dict[str, np.ndarray], underlying_price: float) -> Dict[str, float]:
+        """
+        Quantity-weighted Greeks of all legs from one vectorized evaluation
+        
+        Returns:
+            Dict with the same keys as GreeksEngine.calculate_portfolio_greeks
+        """
+        greeks = BlackScholesCalculator.calculate_greeks_vectorized(
+            underlying_price, legs['strike'], legs['tte'], legs['r'], legs['sigma'], legs['is_call'],
+            q=legs['q'], higher_order=True
+        )
+        quantity = legs['quantity']
+        return {f"portfolio_{name}": float(greeks[name] @ quantity) for name in PORTFOLIO_GREEKS}
+                
+    def revalue(self, legs: Dict[str, np.ndarray], underlying_price: float,
+                grid: ScenarioGrid) -> np.ndarray:
+        """
+        Portfolio P&L on every scenario of the grid
+        
+        Each leg is repriced at shocked spot, shifted volatility and reduced
+        time to expiry; P&L is relative to the model value today.
+        
+        Args:
+            legs: Leg arrays from gather_legs
+            underlying_price: Current underlying price
+            grid: Scenario grid
+            
+        Returns:
+            Array of shape (days, vols, spots) in dollars
+        """
+        r, q = legs['r'], legs['q']
+        base = BlackScholesCalculator.calculate_option_prices(
+            underlying_price, legs['strike'], legs['tte'], r, legs['sigma'], legs['is_call'], q=q
+        )
+        
+        # Axes: (time, vol, spot, leg)
+        spot = underlying_price * (1.0 + grid.spot_shocks)[None, None, :, None]
+        sigma = np.maximum(legs['sigma'][None, None, None, :] + grid.vol_shocks[None, :, None, None],
+                           self.min_volatility)
+        tte = np.maximum(legs['tte'][None, None, None, :] - grid.days_forward[:, None, None, None] / 365.0, 0.0)
+        
+        prices = BlackScholesCalculator.calculate_option_prices(
+            spot, legs['strike'], tte, r, sigma, legs['is_call'], q=q
+        )
+        
+        # Expired legs are worth intrinsic value
+        expired = tte <= 0
+        if expired.any():
+            intrinsic = np.where(legs['is_call'], np.maximum(spot - legs['strike'], 0.0),
+                                 np.maximum(legs['strike'] - spot, 0.0))
+            prices = np.where(expired, intrinsic, prices)
+            
+        return (prices - base) @ legs['quantity'] * self.contract_multiplier
+        
+    def run(self, positions: List[Any], underlying_price: float,
+            grid: Optional[ScenarioGrid] = None) -> Dict[str, Any]:
+        """
+        Full scenario analysis of a book
+        
+        Args:
+            positions: Positions (see flatten_positions)
+            underlying_price: Current underlying price
+            grid: Scenario grid (default 50 spot x 20 vol, today)
+            
+        Returns:
+            Dict with the P&L surface, grid axes, portfolio Greeks and worst case
+        """
+        grid = grid or ScenarioGrid.build()
+        legs = self.gather_legs(positions, underlying_price)
+        
+        if len(legs['strike']) == 0:
+            pnl = np.zeros(grid.shape)
+        else:
+            pnl = self.revalue(legs, underlying_price, grid)
+            
+        worst = np.unravel_index(np.argmin(pnl), pnl.shape)
+        return {
+            'pnl': pnl,
+            'spot_levels': underlying_price * (1.0 + grid.spot_shocks),
+            'vol_shocks': grid.vol_shocks,
+            'days_forward': grid.days_forward,
+            'greeks': self.portfolio_greeks(legs, underlying_price) if len(legs['strike']) else
+                      {f"portfolio_{g}": 0.0 for g in PORTFOLIO_GREEKS},
+            'legs': len(legs['strike']),
+            'worst_case_pnl': float(pnl[worst]),
+            'worst_case_scenario': {
+                'days_forward': float(grid.days_forward[worst[0]]),
+                'vol_shock': float(grid.vol_shocks[worst[1]]),
+                'spot': float(underlying_price * (1.0 + grid.spot_shocks[worst[2]]))
+            }
+        }
+        
+    @staticmethod
+    def to_dataframe(report: Dict[str, Any]) -> pd.DataFrame:
+        """Long-format P&L table (one row per scenario)"""
+        days, vols, spots = np.meshgrid(report['days_forward'], report['vol_shocks'],
+                                        report['spot_levels'], indexing='ij')
+        return pd.DataFrame({
+            'days_forward': days.ravel(),
+            'vol_shock': vols.ravel(),
+            'spot': spots.ravel(),
+            'pnl': report['pnl'].ravel()
+        })
+
+
+def main():
+    """
+    Test the batch risk engine
+    """
+    print("=" * 80)
+    print("SPRINT 16: BATCH RISK ENGINE TEST")
+    print("=" * 80)
+    
+    spot = 636.0
+    engine = BatchRiskEngine(GreeksEngine(risk_free_rate=0.05))
+    rng = np.random.default_rng(16)
+    
+    # 25 iron condors = 100 legs across several expiries
+    positions = []
+    for i in range(25):
+        dte = int(rng.choice([14, 30, 45, 60]))
+        center = spot + rng.normal(0, 5)
+        for strike, option_type, quantity in [
+            (round(center + 20), OptionType.CALL, -1), (round(center + 30), OptionType.CALL, 1),
+            (round(center - 20), OptionType.PUT, -1), (round(center - 30), OptionType.PUT, 1)
+        ]:
+            contract = OptionContract(
+                symbol=f"SPY{dte}{option_type.value}{strike}", underlying='SPY', strike=float(strike),
+                expiration='', option_type=option_type, bid=1.0, ask=1.1, last=1.05, volume=100,
+                open_interest=100, delta=0.0, gamma=0.0, theta=0.0, vega=0.0,
+                implied_volatility=0.18 + 0.0005 * abs(strike - spot), mid_price=0.0,
+                days_to_expiration=dte, underlying_price=spot, moneyness=strike / spot
+            )
+            positions.append({'contract': contract, 'quantity': quantity})
+            
+    grid = ScenarioGrid.build(spot_steps=50, vol_steps=20, days_forward=(0, 1, 5))
+    
+    start = datetime.now()
+    report = engine.run(positions, spot, grid)
+    elapsed_ms = (datetime.now() - start).total_seconds() * 1000
+    
+    print(f"Revalued {report['legs']} legs over {grid.shape} scenarios in {elapsed_ms:.1f}ms")
+    print(f"Portfolio Greeks: " + ", ".join(f"{k}={v:.3f}" for k, v in report['greeks'].items()))
+    print(f"Worst case: ${report['worst_case_pnl']:,.2f} at {report['worst_case_scenario']}")
+    
+    today = report['pnl'][0, len(grid.vol_shocks) // 2]
+    print(f"\nP&L today at unchanged vol (every 10th spot level):")
+    for level, pnl in list(zip(report['spot_levels'], today))[::10]:
+        print(f"  SPY ${level:7.2f}: ${pnl:10,.2f}")
+        
+    print("\nBatch Risk Engine test completed [SUCCESS]")
+
+
+if __name__ == "__main__":
+    main()
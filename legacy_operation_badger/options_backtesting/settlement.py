@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Sprint 16: Expiration and Assignment Settlement
+Vectorized expiry settlement and assignment rules for American SPY options
+
+SPY options are American style and physically settled: at expiry, contracts
+in the money by at least $0.01 are exercised automatically (exercise by
+exception), so short legs are assigned and long legs deliver shares. In
+this backtest, delivered shares are liquidated at the settlement price.
+Every leg therefore settles at its intrinsic value, or at zero if it is
+abandoned.
+
+Key Features:
+- Intrinsic values for all expiring legs in one vectorized step
+- Exercise-by-exception threshold for longs and shorts
+- Pin risk: shorts near the strike settle at the worst price in a band
+- Early assignment of deep in-the-money shorts with little extrinsic value
+- Assignment/exercise fees and net share delivery per leg
+"""
+
+import os
+import sys
+import numpy as np
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Optional
+import logging
+
+# Add parent directory for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+
+@dataclass
+class SettlementResult:
+    """
+    Per-leg outcome of an expiry settlement
+    """
+    prices: np.ndarray  # Settlement value per share (intrinsic, 0 if abandoned)
+    exercised: np.ndarray  # Long legs exercised
+    assigned: np.ndarray  # Short legs assigned
+    pinned: np.ndarray  # Short legs settled inside the pin band
+    shares: np.ndarray  # Shares delivered (+ received, - delivered)
+    fees: np.ndarray  # Exercise/assignment fees
+
+class SettlementEngine:
+    """
+    Settles expiring option legs and detects early assignment
+    
+    Legs are passed as arrays (strike, call flag, signed quantity), so any
+    number of positions settle in one call.
+    """
+    
+    def __init__(self, exercise_threshold: float = 0.01, pin_band: float = 0.0,
+                 assignment_fee: float = 0.0, early_assignment_extrinsic: Optional[float] = None):
+        """
+        Initialize settlement engine
+        
+        Args:
+            exercise_threshold: Minimum intrinsic value for automatic exercise
+                (OCC exercise by exception: $0.01)
+            pin_band: Shorts whose strike is within this distance of the
+                settlement price are assumed to be assigned at the worst
+                price in the band (after-hours moves decide whether holders
+                exercise). 0 disables pin handling.
+            assignment_fee: Fee per contract exercised or assigned
+            early_assignment_extrinsic: Shorts in the money whose extrinsic
+                value is below this are assumed to be assigned before
+                expiry (e.g. the next dividend for calls); None disables
+        """
+        self.exercise_threshold = exercise_threshold
+        self.pin_band = pin_band
+        self.assignment_fee = assignment_fee
+        self.early_assignment_extrinsic = early_assignment_extrinsic
+        
+    @staticmethod
+    def intrinsic_values(strikes: np.ndarray, is_call: np.ndarray, spots: np.ndarray) -> np.ndarray:
+        """Intrinsic value per share"""
+        return np.maximum(np.where(is_call, spots - strikes, strikes - spots), 0.0)
+        
+    @staticmethod
+    def expiring(legs: List[Any], date: datetime) -> np.ndarray:
+        """Mask of OptionPosition legs that expire on or before a date"""
+        from options_backtesting.core_engine import expiry_day_number
+        today = (date - EPOCH).days
+        return np.array([expiry_day_number(leg.contract.expiration) <= today for leg in legs], dtype=bool)
+        
+    def settle(self, strikes: np.ndarray, is_call: np.ndarray, quantities: np.ndarray,
+               spots: np.ndarray) -> SettlementResult:
+        """
+        Settle expiring legs
+        
+        Args:
+            strikes: Leg strikes
+            is_call: Leg call flags
+            quantities: Signed leg quantities (negative = short)
+            spots: Settlement price of the underlying (scalar or per leg)
+            
+        Returns:
+            SettlementResult with per-leg settlement prices, exercise and
+            assignment flags, share deliveries and fees
+        """
+        strikes = np.asarray(strikes, dtype=np.float64)
+        is_call = np.asarray(is_call, dtype=bool)
+        quantities = np.asarray(quantities, dtype=np.float64)
+        spots = np.broadcast_to(np.asarray(spots, dtype=np.float64), strikes.shape)
+        short = quantities < 0
+        
+        # Pinned shorts settle at the adverse edge of the band
+        pinned = short & (np.abs(spots - strikes) <= self.pin_band) if self.pin_band > 0 else np.zeros_like(short)
+        settlement_spots = np.where(pinned, spots + np.where(is_call, self.pin_band, -self.pin_band), spots)
+        
+        intrinsic = self.intrinsic_values(strikes, is_call, settlement_spots)
+        in_the_money = intrinsic >= self.exercise_threshold
+        exercised = in_the_money & ~short
+        assigned = in_the_money & short
+        
+        delivered = exercised | assigned
+        shares = np.where(delivered, np.where(is_call, 1.0, -1.0) * quantities * 100, 0.0)
+        return SettlementResult(
+            prices=np.where(delivered, intrinsic, 0.0),
+            exercised=exercised,
+            assigned=assigned,
+            pinned=pinned,
+            shares=shares,
+            fees=np.where(delivered, self.assignment_fee * np.abs(quantities), 0.0)
+        )
+        
+    def early_assignments(self, strikes: np.ndarray, is_call: np.ndarray, quantities: np.ndarray,
+                          spot: float, marks: np.ndarray) -> np.ndarray:
+        """
+        Mask of short legs assumed to be assigned before expiry
+        
+        Args:
+            strikes: Leg strikes
+            is_call: Leg call flags
+            quantities: Signed leg quantities
+            spot: Current underlying price
+            marks: Current leg prices (mid)
+            
+        Returns:
+            Boolean mask of legs assigned early
+        """
+        if self.early_assignment_extrinsic is None:
+            return np.zeros(len(strikes), dtype=bool)
+        intrinsic = self.intrinsic_values(np.asarray(strikes, dtype=np.float64),
+                                          np.asarray(is_call, dtype=bool), spot)
+        extrinsic = np.asarray(marks, dtype=np.float64) - intrinsic
+        return ((np.asarray(quantities) < 0) & (intrinsic >= self.exercise_threshold)
+                & (extrinsic < self.early_assignment_extrinsic))
+
+
+def main():
+    """
+    Test expiration and assignment settlement
+    """
+    import time
+    
+    print("=" * 80)
+    print("SPRINT 16: EXPIRATION AND ASSIGNMENT SETTLEMENT TEST")
+    print("=" * 80)
+    
+    # Iron Condor 460/470/490/500 (long put, short put, short call, long call)
+    strikes = np.array([490.0, 500.0, 470.0, 460.0])
+    is_call = np.array([True, True, False, False])
+    quantities = np.array([-1, 1, -1, 1])
+    engine = SettlementEngine(pin_band=0.25, assignment_fee=5.0)
+    
+    for spot in [480.0, 495.0, 510.0, 469.9, 490.1, 455.0]:
+        result = engine.settle(strikes, is_call, quantities, spot)
+        value = float(np.dot(result.prices, quantities) * 100)
+        print(f"Settle @ ${spot:.2f}: legs {result.prices.round(2).tolist()}, value ${value:,.2f}, "
+              f"assigned {int(result.assigned.sum())}, exercised {int(result.exercised.sum())}, "
+              f"pinned {int(result.pinned.sum())}, net shares {result.shares.sum():+.0f}, "
+              f"fees ${result.fees.sum():.2f}")
+              
+    early = SettlementEngine(early_assignment_extrinsic=0.05)
+    marks = np.array([20.02, 10.40, 0.01, 0.01])
+    print(f"Early assignment @ $510 (short call extrinsic $0.02): "
+          f"{early.early_assignments(strikes, is_call, quantities, 510.0, marks).tolist()}")
+          
+    n = 100000
+    rng = np.random.default_rng(16)
+    start = time.perf_counter()
+    engine.settle(rng.uniform(400, 550, n), rng.random(n) < 0.5, rng.choice([-1, 1], n), 480.0)
+    print(f"\nSettled {n:,} legs in {(time.perf_counter() - start) * 1000:.1f}ms")
+    
+    print("\nExpiration and Assignment Settlement test completed [SUCCESS]")
+
+
+if __name__ == "__main__":
+    main()
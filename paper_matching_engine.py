@@ -0,0 +1,416 @@
+"""
+Project Terminus - Paper Matching Engine
+Deterministic local fill simulation for TradovateOMS paper/sandbox mode
+"""
+
+import heapq
+import random
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional
+
+from tradovate_oms import OrderType, OrderStatus
+
+class PaperMatchingEngine:
+    """
+    Local matching engine driven by the live or replayed tick feed
+    
+    Market orders fill at the first trade after the simulated latency.
+    Resting limits sit in sorted price-level books and fill when the market
+    trades through them, or at their price once the estimated queue ahead
+    has traded. Stops trigger on trade prices and then behave like market
+    (Stop) or limit (StopLimit) orders. The clock is the tick timestamp, so
+    replaying the same ticks always yields the same fills.
+    """
+    
+    def __init__(self,
+                 tick_size: float = 0.25,
+                 latency_ms: float = 50.0,
+                 latency_jitter_ms: float = 0.0,
+                 initial_queue_ahead: int = 10,
+                 market_slippage_ticks: int = 0,
+                 seed: int = 42):
+        """
+        Initialize matching engine
+        
+        Args:
+            tick_size: Minimum price increment (0.25 for /MES)
+            latency_ms: Order-to-exchange latency before an order can trade
+            latency_jitter_ms: Uniform jitter added to latency (seeded)
+            initial_queue_ahead: Contracts assumed ahead of a new resting limit
+            market_slippage_ticks: Extra adverse ticks applied to market fills
+            seed: Seed for latency jitter
+        """
+        self.tick_size = tick_size
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.initial_queue_ahead = initial_queue_ahead
+        self.market_slippage_ticks = market_slippage_ticks
+        self._rng = random.Random(seed)
+        
+        # Simulation clock (epoch seconds of last tick) and last trade
+        self.clock: Optional[float] = None
+        self.last_price: Optional[float] = None
+        
+        # Orders in flight to the "exchange": (active_time, seq, order)
+        self._pending: List = []
+        self._seq = 0
+        
+        # Resting limit books: price -> FIFO of orders, plus sorted level prices
+        self._bid_levels: Dict[float, Deque[Dict]] = {}
+        self._ask_levels: Dict[float, Deque[Dict]] = {}
+        self._bid_prices: List[float] = []
+        self._ask_prices: List[float] = []
+        
+        # Untriggered stops: trigger price -> orders, plus sorted trigger prices
+        self._buy_stops: Dict[float, List[Dict]] = {}
+        self._sell_stops: Dict[float, List[Dict]] = {}
+        self._buy_stop_prices: List[float] = []
+        self._sell_stop_prices: List[float] = []
+        
+        self.orders: Dict[int, Dict] = {}
+        self._ids_by_order: Dict[str, List[int]] = {}
+        self.fills: List[Dict] = []
+        self.fill_callbacks: List[Callable] = []
+        
+    def register_fill_callback(self, callback: Callable):
+        """Register an async callback invoked with every fill"""
+        self.fill_callbacks.append(callback)
+        
+    def submit_order(self,
+                     order_id: str,
+                     side: str,
+                     quantity: int,
+                     order_type: OrderType = OrderType.MARKET,
+                     price: Optional[float] = None,
+                     stop_price: Optional[float] = None,
+                     callback: Optional[Callable] = None) -> Dict:
+        """
+        Submit an order; it becomes eligible to trade after the latency
+        
+        Args:
+            order_id: Caller's order ID (reported back on fills)
+            side: 'buy' or 'sell'
+            quantity: Number of contracts
+            order_type: Market, Limit, Stop or StopLimit
+            price: Limit price (Limit and StopLimit)
+            stop_price: Trigger price (Stop and StopLimit)
+            callback: Optional async callback for this order's fills
+            
+        Returns:
+            Engine order state
+        """
+        # Normalize by value so enums from a re-imported module (__main__) still match
+        order_type = OrderType(order_type.value)
+        if order_type in (OrderType.LIMIT, OrderType.STOP_LIMIT) and price is None:
+            raise ValueError(f"{order_type.value} order requires a limit price")
+        if order_type in (OrderType.STOP, OrderType.STOP_LIMIT) and stop_price is None:
+            raise ValueError(f"{order_type.value} order requires a stop price")
+            
+        self._seq += 1
+        latency = self.latency_ms + self._rng.uniform(0, self.latency_jitter_ms)
+        submit_time = self.clock if self.clock is not None else 0.0
+        
+        order = {
+            'engineId': self._seq,
+            'orderId': order_id,
+            'side': side.lower(),
+            'qty': quantity,
+            'remaining': quantity,
+            'orderType': order_type,
+            'price': self._round_price(price) if price is not None else None,
+            'stopPrice': self._round_price(stop_price) if stop_price is not None else None,
+            'submitTime': submit_time,
+            'activeTime': submit_time + latency / 1000.0,
+            'referencePrice': self.last_price,
+            'queueAhead': 0,
+            'triggered': False,
+            'status': OrderStatus.PENDING.value,
+            'callback': callback
+        }
+        
+        self.orders[order['engineId']] = order
+        self._ids_by_order.setdefault(order_id, []).append(order['engineId'])
+        heapq.heappush(self._pending, (order['activeTime'], order['engineId'], order))
+        return order
+        
+    def cancel_order(self, order_id: str) -> bool:
+        """Cancel a pending, resting or untriggered order by caller order ID"""
+        for engine_id in self._ids_by_order.get(order_id, []):
+            order = self.orders[engine_id]
+            if order['status'] in (OrderStatus.PENDING.value, OrderStatus.WORKING.value):
+                self._remove_from_books(order)
+                order['status'] = OrderStatus.CANCELLED.value
+                return True
+        return False
+        
+    def process_tick(self, tick: Dict) -> List[Dict]:
+        """
+        Advance the clock to a trade tick and match against it
+        
+        Args:
+            tick: Dict with 'timestamp', 'price', 'size' and optional aggressor 'side'
+            
+        Returns:
+            Fills generated by this tick
+        """
+        self.clock = self._to_epoch(tick['timestamp'])
+        price = float(tick['price'])
+        size = int(tick.get('size', 1))
+        aggressor = tick.get('side')
+        fills: List[Dict] = []
+        
+        # Orders that reached the exchange before this trade
+        while self._pending and self._pending[0][0] <= self.clock:
+            _, _, order = heapq.heappop(self._pending)
+            if order['status'] == OrderStatus.PENDING.value:
+                order['status'] = OrderStatus.WORKING.value
+                self._activate(order, price, fills)
+                
+        self._trigger_stops(price, fills)
+        self._match_bids(price, size, aggressor, fills)
+        self._match_asks(price, size, aggressor, fills)
+        
+        self.last_price = price
+        self.fills.extend(fills)
+        return fills
+        
+    async def on_tick(self, tick: Dict):
+        """Feed callback: match the tick and dispatch fills"""
+        for fill in self.process_tick(tick):
+            order = self.orders[fill['engineId']]
+            if order['callback'] is not None:
+                await order['callback'](fill)
+            for callback in self.fill_callbacks:
+                await callback(fill)
+                
+    async def replay(self, ticks: List[Dict]) -> List[Dict]:
+        """Replay a recorded tick sequence through the engine"""
+        start = len(self.fills)
+        for tick in ticks:
+            await self.on_tick(tick)
+        return self.fills[start:]
+        
+    def _activate(self, order: Dict, price: float, fills: List[Dict]):
+        """Handle an order arriving at the exchange"""
+        order_type = order['orderType']
+        
+        if order_type == OrderType.MARKET:
+            self._fill(order, self._market_price(order['side'], price), order['remaining'], 'taker', fills)
+        elif order_type == OrderType.LIMIT:
+            self._enter_limit(order, price, fills)
+        elif self._stop_triggered(order, price):
+            self._on_trigger(order, price, fills)
+        else:
+            book, prices = self._stop_book(order['side'])
+            stop = order['stopPrice']
+            if stop not in book:
+                book[stop] = []
+                insort(prices, stop)
+            book[stop].append(order)
+            
+    def _enter_limit(self, order: Dict, price: float, fills: List[Dict]):
+        """Fill a marketable limit immediately, otherwise rest it in the book"""
+        limit = order['price']
+        if (order['side'] == 'buy' and limit >= price) or (order['side'] == 'sell' and limit <= price):
+            self._fill(order, price, order['remaining'], 'taker', fills)
+            return
+            
+        levels, prices = self._limit_book(order['side'])
+        if limit not in levels:
+            levels[limit] = deque()
+            insort(prices, limit)
+        order['queueAhead'] = self.initial_queue_ahead
+        levels[limit].append(order)
+        
+    def _trigger_stops(self, price: float, fills: List[Dict]):
+        """Trigger buy stops at or below the trade and sell stops at or above it"""
+        idx = bisect_right(self._buy_stop_prices, price)
+        if idx:
+            triggered = self._buy_stop_prices[:idx]
+            del self._buy_stop_prices[:idx]
+            for stop in triggered:
+                for order in self._buy_stops.pop(stop):
+                    self._on_trigger(order, price, fills)
+                    
+        idx = bisect_left(self._sell_stop_prices, price)
+        if idx < len(self._sell_stop_prices):
+            triggered = self._sell_stop_prices[idx:]
+            del self._sell_stop_prices[idx:]
+            for stop in reversed(triggered):
+                for order in self._sell_stops.pop(stop):
+                    self._on_trigger(order, price, fills)
+                    
+    def _on_trigger(self, order: Dict, price: float, fills: List[Dict]):
+        """A triggered stop becomes a market order, a stop-limit a limit order"""
+        order['triggered'] = True
+        if order['orderType'] == OrderType.STOP:
+            self._fill(order, self._market_price(order['side'], price), order['remaining'], 'taker', fills)
+        else:
+            self._enter_limit(order, price, fills)
+            
+    def _match_bids(self, price: float, size: int, aggressor: Optional[str], fills: List[Dict]):
+        """Fill resting buy limits traded through or reached by this trade"""
+        idx = bisect_right(self._bid_prices, price)
+        
+        # Levels above the trade were crossed: fill in full at the limit
+        for level in reversed(self._bid_prices[idx:]):
+            for order in self._bid_levels.pop(level):
+                self._fill(order, level, order['remaining'], 'maker', fills)
+        del self._bid_prices[idx:]
+        
+        # Trade at the level consumes queue (only sell-initiated prints hit bids)
+        if idx and self._bid_prices[idx - 1] == price and aggressor != 'buy':
+            self._consume_queue(self._bid_levels, self._bid_prices, price, size, fills)
+            
+    def _match_asks(self, price: float, size: int, aggressor: Optional[str], fills: List[Dict]):
+        """Fill resting sell limits traded through or reached by this trade"""
+        idx = bisect_left(self._ask_prices, price)
+        
+        for level in self._ask_prices[:idx]:
+            for order in self._ask_levels.pop(level):
+                self._fill(order, level, order['remaining'], 'maker', fills)
+        del self._ask_prices[:idx]
+        
+        if self._ask_prices and self._ask_prices[0] == price and aggressor != 'sell':
+            self._consume_queue(self._ask_levels, self._ask_prices, price, size, fills)
+            
+    def _consume_queue(self, levels: Dict[float, Deque[Dict]], prices: List[float],
+                       level: float, size: int, fills: List[Dict]):
+        """
+        Apply traded volume at a level to the queue-position estimates
+        
+        Each order's queueAhead is the external volume still in front of it.
+        Volume beyond that fills the order; our own earlier orders at the
+        level take their share of the print first.
+        """
+        queue = levels[level]
+        used_by_ours = 0
+        for order in list(queue):
+            ahead = order['queueAhead']
+            available = size - ahead - used_by_ours
+            order['queueAhead'] = max(0, ahead - size)
+            if available > 0:
+                quantity = min(order['remaining'], available)
+                used_by_ours += quantity
+                self._fill(order, level, quantity, 'maker', fills)
+                if order['remaining'] == 0:
+                    queue.remove(order)
+                    
+        if not queue:
+            del levels[level]
+            prices.remove(level)
+            
+    def _fill(self, order: Dict, price: float, quantity: int, liquidity: str, fills: List[Dict]):
+        """Record a (partial) fill"""
+        order['remaining'] -= quantity
+        order['status'] = OrderStatus.FILLED.value if order['remaining'] == 0 else OrderStatus.WORKING.value
+        
+        reference = order['referencePrice']
+        direction = 1 if order['side'] == 'buy' else -1
+        slippage_ticks = ((price - reference) * direction / self.tick_size) if reference is not None else 0.0
+        
+        fills.append({
+            'engineId': order['engineId'],
+            'orderId': order['orderId'],
+            'action': order['side'].capitalize(),
+            'qty': quantity,
+            'price': price,
+            'orderType': order['orderType'].value,
+            'liquidity': liquidity,
+            'slippageTicks': slippage_ticks,
+            'timestamp': datetime.fromtimestamp(self.clock).isoformat(),
+            'latencyMs': (self.clock - order['submitTime']) * 1000
+        })
+        
+    def _remove_from_books(self, order: Dict):
+        """Remove an order from whichever book currently holds it"""
+        if order['status'] == OrderStatus.PENDING.value:
+            return  # Skipped when popped from the pending heap
+            
+        if order['orderType'] in (OrderType.STOP, OrderType.STOP_LIMIT) and not order['triggered']:
+            book, prices = self._stop_book(order['side'])
+            key = order['stopPrice']
+            container = book.get(key)
+        else:
+            book, prices = self._limit_book(order['side'])
+            key = order['price']
+            container = book.get(key)
+            
+        if container is not None and order in container:
+            container.remove(order)
+            if not container:
+                del book[key]
+                prices.remove(key)
+                
+    def _limit_book(self, side: str):
+        if side == 'buy':
+            return self._bid_levels, self._bid_prices
+        return self._ask_levels, self._ask_prices
+        
+    def _stop_book(self, side: str):
+        if side == 'buy':
+            return self._buy_stops, self._buy_stop_prices
+        return self._sell_stops, self._sell_stop_prices
+        
+    def _stop_triggered(self, order: Dict, price: float) -> bool:
+        if order['side'] == 'buy':
+            return price >= order['stopPrice']
+        return price <= order['stopPrice']
+        
+    def _market_price(self, side: str, price: float) -> float:
+        slippage = self.market_slippage_ticks * self.tick_size
+        return price + slippage if side == 'buy' else price - slippage
+        
+    def _round_price(self, price: float) -> float:
+        return round(round(price / self.tick_size) * self.tick_size, 10)
+        
+    @staticmethod
+    def _to_epoch(timestamp) -> float:
+        """Normalize tick timestamps (ISO string, datetime or epoch seconds)"""
+        if isinstance(timestamp, str):
+            return datetime.fromisoformat(timestamp).timestamp()
+        if isinstance(timestamp, datetime):
+            return timestamp.timestamp()
+        return float(timestamp)
+        
+    def get_resting_order_count(self) -> int:
+        """Number of resting limits plus untriggered stops"""
+        limits = sum(len(q) for q in self._bid_levels.values()) + sum(len(q) for q in self._ask_levels.values())
+        stops = sum(len(o) for o in self._buy_stops.values()) + sum(len(o) for o in self._sell_stops.values())
+        return limits + stops
+        
+    def get_fill_statistics(self) -> Dict[str, Dict]:
+        """
+        Fill rate and slippage per order type
+        
+        Returns:
+            Dict keyed by order type with submitted/filled counts, fill rate,
+            average slippage in ticks (positive = adverse) and average latency
+        """
+        stats: Dict[str, Dict] = {}
+        for order in self.orders.values():
+            entry = stats.setdefault(order['orderType'].value, {
+                'submitted': 0, 'filled': 0, 'fill_rate': 0.0,
+                'avg_slippage_ticks': 0.0, 'avg_fill_latency_ms': 0.0
+            })
+            entry['submitted'] += 1
+            if order['status'] == OrderStatus.FILLED.value:
+                entry['filled'] += 1
+                
+        totals: Dict[str, List[float]] = {}
+        for fill in self.fills:
+            slip, latency, qty = totals.setdefault(fill['orderType'], [0.0, 0.0, 0])
+            totals[fill['orderType']] = [slip + fill['slippageTicks'] * fill['qty'],
+                                         latency + fill['latencyMs'] * fill['qty'],
+                                         qty + fill['qty']]
+                                         
+        for order_type, entry in stats.items():
+            entry['fill_rate'] = entry['filled'] / entry['submitted']
+            if order_type in totals and totals[order_type][2] > 0:
+                slip, latency, qty = totals[order_type]
+                entry['avg_slippage_ticks'] = slip / qty
+                entry['avg_fill_latency_ms'] = latency / qty
+                
+        return stats
@@ -7,11 +7,14 @@ import os
 import json
 import asyncio
 import websocket
-from datetime import datetime
-from typing import Dict, List, Optional
+import requests
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional
 from enum import Enum
 from dotenv import load_dotenv
 
+from contract_roll_manager import ContractRollManager
+
 # Load environment variables
 load_dotenv()
 
@@ -36,12 +39,37 @@ class TradovateOMS:
     Handles order placement, modification, and tracking
     """
     
-    def __init__(self):
-        self.api_key = os.getenv('TRADOVATE_API_KEY')
-        self.api_secret = os.getenv('TRADOVATE_API_SECRET')
-        self.account_id = os.getenv('TRADOVATE_ACCOUNT_ID')
-        self.environment = os.getenv('TRADOVATE_ENVIRONMENT', 'sandbox')
+    def __init__(self,
+                 account_id: Optional[str] = None,
+                 api_key: Optional[str] = None,
+                 api_secret: Optional[str] = None,
+                 environment: Optional[str] = None,
+                 paper_engine=None,
+                 governor=None,
+                 roll_manager: Optional[ContractRollManager] = None,
+                 execution_recorder=None):
+        """
+        Initialize OMS session
+        
+        Args:
+            account_id: Tradovate account (default TRADOVATE_ACCOUNT_ID)
+            api_key: API key override (default TRADOVATE_API_KEY)
+            api_secret: API secret override (default TRADOVATE_API_SECRET)
+            environment: 'live' or 'sandbox' (default TRADOVATE_ENVIRONMENT)
+            paper_engine: Optional PaperMatchingEngine; when set, orders are
+                matched locally against the tick feed instead of sent to Tradovate
+            governor: Optional TerminusGovernor consulted before every order
+            roll_manager: Front-month resolver (shared across sessions if given)
+            execution_recorder: Optional ExecutionRecorder timing every order
+                from decision to fill
+        """
+        self.api_key = api_key or os.getenv('TRADOVATE_API_KEY')
+        self.api_secret = api_secret or os.getenv('TRADOVATE_API_SECRET')
+        self.account_id = account_id or os.getenv('TRADOVATE_ACCOUNT_ID')
+        self.environment = environment or os.getenv('TRADOVATE_ENVIRONMENT', 'sandbox')
         self.cid = os.getenv('TRADOVATE_CID')
+        self.paper_engine = paper_engine
+        self.roll_manager = roll_manager or ContractRollManager()
         
         # Connection state
         self.ws = None
@@ -50,11 +78,115 @@ class TradovateOMS:
         
         # Order tracking
         self.active_orders = {}
-        self.position = {'symbol': 'MES', 'quantity': 0, 'avg_price': 0}
+        self._order_seq = 0
+        self.position = {'symbol': 'MES', 'contract': None, 'contractId': None,
+                         'quantity': 0, 'avg_price': 0}
+        self.fill_callbacks: List[Callable] = []
+        self._roll_check_day: Optional[date] = None
+        self._reserved: Dict[str, int] = {}  # Order ID -> unfilled qty held by the governor
         
+        # Pre-trade risk gate
+        self.governor = None
+        if governor is not None:
+            self.attach_governor(governor)
+            
+        # Execution quality (slippage and latency per order)
+        self.execution_recorder = None
+        if execution_recorder is not None:
+            self.attach_execution_recorder(execution_recorder)
+            
         # URLs based on environment
         self.base_url = self._get_base_url()
         
+    def attach_governor(self, governor):
+        """
+        Gate every order through a TerminusGovernor
+        
+        The governor receives this account's fills and ticks (via on_tick)
+        and can force-flatten the account through close_position when it
+        reaches Critical.
+        """
+        self.governor = governor
+        governor.flatten_callback = self._governor_flatten
+        self.register_fill_callback(governor.on_fill_async)
+        
+    def attach_execution_recorder(self, recorder):
+        """
+        Time every order through an ExecutionRecorder
+        
+        The recorder is fed ticks through on_tick so it knows the mid at
+        decision time; the OMS marks submit, ack, reject and fill stages.
+        """
+        self.execution_recorder = recorder
+        
+        async def record_fill(fill: Dict):
+            recorder.record_fill(fill)
+            
+        self.register_fill_callback(record_fill)
+        
+    async def on_tick(self, tick: Dict):
+        """
+        Feed callback: forward a market data tick to this session's listeners
+        
+        Subscribe this (or AccountRouter.on_tick) to the market data feed.
+        The execution recorder sees the tick first so its decision mid is
+        current, the paper engine then matches working orders, and the
+        governor marks open P&L last so it includes any fills the tick caused.
+        The first tick of each day also checks for a contract roll; the
+        first tick of the session re-resolves the front month for its own
+        date, so a replay of past ticks trades the contracts of that period.
+        """
+        await self._check_roll(tick['timestamp'])
+        if self.execution_recorder is not None:
+            self.execution_recorder.on_price(tick)
+        if self.paper_engine is not None:
+            await self.paper_engine.on_tick(tick)
+        if self.governor is not None:
+            await self.governor.on_tick(tick)
+            
+    async def _check_roll(self, timestamp):
+        """
+        Re-resolve the front month once per day when a roll date is reached
+        
+        New orders go to the new contract from then on; a position opened
+        before the roll stays on (and is closed in) the contract it was
+        opened in.
+        """
+        as_of = self._tick_date(timestamp)
+        if as_of == self._roll_check_day:
+            return
+        first_tick = self._roll_check_day is None
+        self._roll_check_day = as_of
+        
+        # connect() resolved against today; ticks being replayed may predate it
+        if first_tick and self.roll_manager.session_date != as_of:
+            await self.roll_manager.resolve_session(self._lookup_contract_id, as_of)
+            return
+            
+        if not self.roll_manager.needs_roll(as_of):
+            return
+            
+        for roll in await self.roll_manager.roll_session(self._lookup_contract_id, as_of):
+            print(f"🔁 {self.account_id}: {roll['root']} rolled {roll['from_symbol']} -> {roll['to_symbol']}")
+            
+    @staticmethod
+    def _tick_date(timestamp) -> date:
+        """Date of a tick timestamp (ISO string, datetime, epoch seconds or nanoseconds)"""
+        if isinstance(timestamp, str):
+            return datetime.fromisoformat(timestamp).date()
+        if isinstance(timestamp, datetime):
+            return timestamp.date()
+        seconds = float(timestamp)
+        if seconds > 1e12:
+            seconds /= 1e9
+        return datetime.fromtimestamp(seconds).date()
+        
+    async def _governor_flatten(self):
+        """Cancel working orders and close the position (governor Critical)"""
+        for order in self.get_active_orders():
+            await self.cancel_order(order['orderId'])
+        return await self.close_position()
+        
     def _get_base_url(self):
         """Get appropriate base URL for environment"""
         if self.environment == 'live':
@@ -70,6 +202,12 @@ class TradovateOMS:
     
     async def connect(self):
         """Establish connection to Tradovate"""
+        if self.paper_engine is not None:
+            print(f"🧪 Paper trading account {self.account_id} on local matching engine")
+            await self.roll_manager.resolve_session(self._lookup_contract_id)
+            self.is_connected = True
+            return True
+            
         try:
             # Validate credentials
             if not all([self.api_key, self.api_secret, self.account_id]):
@@ -83,6 +221,8 @@ class TradovateOMS:
             # 1. Get access token via OAuth
             # 2. Establish WebSocket connection
             # 3. Subscribe to account updates
+            # 4. Resolve front-month IDs once for the session:
+            #    await self.roll_manager.resolve_session(self._lookup_contract_id)
             
             print(f"🔌 Connecting to Tradovate {self.environment} environment...")
             print("⚠️  Connection placeholder - implement actual Tradovate auth")
@@ -99,43 +239,99 @@ class TradovateOMS:
                          quantity: int = 1,
                          order_type: OrderType = OrderType.MARKET,
                          price: Optional[float] = None,
-                         stop_price: Optional[float] = None) -> Dict:
+                         stop_price: Optional[float] = None,
+                         decision_ns: Optional[int] = None,
+                         contract: Optional[Dict] = None) -> Dict:
         """
         Place an order for /MES futures
         
         Args:
             side: 'buy' or 'sell'
             quantity: Number of contracts (default 1)
-            order_type: Type of order (Market, Limit, Stop)
-            price: Limit price (for Limit orders)
-            stop_price: Stop price (for Stop orders)
+            order_type: Type of order (Market, Limit, Stop, StopLimit)
+            price: Limit price (for Limit and StopLimit orders)
+            stop_price: Stop price (for Stop and StopLimit orders)
+            decision_ns: time.monotonic_ns() when the strategy decided to trade
+                (default: now); used for execution analytics
+            contract: Dict with 'contract' (symbol) and 'contractId' to trade
+                instead of the current front month (used to close a position
+                held in a contract that has since rolled)
             
         Returns:
             Order details dict
         """
         if not self.is_connected:
             return {"error": "Not connected to Tradovate"}
+            
+        record = None
+        if self.execution_recorder is not None:
+            record = self.execution_recorder.begin_order(side, quantity, order_type.value, decision_ns)
         
+        # Governor approval (synchronous, O(1))
+        if self.governor is not None:
+            approved, reason, max_quantity = self.governor.check_order(side, quantity)
+            if not approved:
+                print(f"🛡️  Order blocked by governor: {reason}")
+                if record is not None:
+                    self.execution_recorder.mark_reject(record, reason)
+                return {"error": reason, "status": OrderStatus.REJECTED.value}
+            if max_quantity < quantity:
+                print(f"🛡️  Governor reduced size {quantity} -> {max_quantity} ({reason})")
+                quantity = max_quantity
+                if record is not None:
+                    record['qty'] = quantity
+                
         # Create order object
+        if contract is None:
+            contract = {'contract': self.roll_manager.get_front_symbol('MES'),
+                        'contractId': self._get_mes_contract_id()}
         order = {
             'accountId': self.account_id,
-            'contractId': self._get_mes_contract_id(),
+            'contractId': contract['contractId'],
+            'symbol': contract['contract'],
             'action': side.capitalize(),
             'qty': quantity,
             'orderType': order_type.value,
             'timestamp': datetime.now().isoformat()
         }
         
-        if order_type == OrderType.LIMIT and price:
+        if order_type in (OrderType.LIMIT, OrderType.STOP_LIMIT) and price:
             order['price'] = price
-        elif order_type == OrderType.STOP and stop_price:
+        if order_type in (OrderType.STOP, OrderType.STOP_LIMIT) and stop_price:
             order['stopPrice'] = stop_price
         
-        # TODO: Send order to Tradovate API
+        self._order_seq += 1
+        order_id = f"ORD-{datetime.now().strftime('%Y%m%d%H%M%S')}-{self._order_seq:04d}"
+        
+        # Approved quantity counts against the governor's limits until it fills or is cancelled
+        if self.governor is not None:
+            self.governor.reserve(side, quantity)
+            self._reserved[order_id] = quantity
+            
+        if self.paper_engine is not None:
+            order_response = {
+                'orderId': order_id,
+                'status': OrderStatus.WORKING.value,
+                'order': order,
+                'message': 'Routed to paper matching engine'
+            }
+            # Register before submitting so fills can always find the order
+            self.active_orders[order_id] = order_response
+            if record is not None:
+                self.execution_recorder.mark_submit(record)
+                self.execution_recorder.mark_ack(record, order_id)
+            self.paper_engine.submit_order(order_id, side, quantity, order_type,
+                                           price=order.get('price'),
+                                           stop_price=order.get('stopPrice'),
+                                           callback=self._on_fill)
+            print(f"📤 Paper order placed: {side.upper()} {quantity} MES @ {order_type.value}")
+            return order_response
+            
+        # TODO: Send order to Tradovate API (mark_submit before the request,
+        # mark_ack / mark_reject on the response, _release_reservation on reject)
         # response = await self._send_order(order)
         
-        # Placeholder response
-        order_id = f"ORD-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        # Placeholder response (sequence suffix keeps same-second orders distinct)
         order_response = {
             'orderId': order_id,
             'status': OrderStatus.PENDING.value,
@@ -144,6 +340,9 @@ class TradovateOMS:
         }
         
         self.active_orders[order_id] = order_response
+        if record is not None:
+            self.execution_recorder.mark_submit(record)
+            self.execution_recorder.mark_ack(record, order_id)
         print(f"📤 Order placed: {side.upper()} {quantity} MES @ {order_type.value}")
         
         return order_response
@@ -154,11 +353,19 @@ class TradovateOMS:
             print(f"❌ Order {order_id} not found")
             return False
         
+        if self.paper_engine is not None:
+            if not self.paper_engine.cancel_order(order_id):
+                print(f"❌ Order {order_id} no longer working")
+                return False
+                
         # TODO: Send cancel request to Tradovate
         # response = await self._cancel_order(order_id)
         
         # Update local state
         self.active_orders[order_id]['status'] = OrderStatus.CANCELLED.value
+        self._release_reservation(order_id)
+        if self.execution_recorder is not None:
+            self.execution_recorder.close_order(order_id)
         print(f"🚫 Order {order_id} cancelled")
         
         return True
@@ -195,17 +402,102 @@ class TradovateOMS:
         if pos['quantity'] == 0:
             return {"message": "No position to close"}
         
-        # Place opposite order to flatten
+        # Place opposite order to flatten, in the contract the position is held in
         side = 'sell' if pos['quantity'] > 0 else 'buy'
         quantity = abs(pos['quantity'])
+        contract = pos if pos['contract'] is not None else None
         
-        return await self.place_order(side, quantity, OrderType.MARKET)
+        return await self.place_order(side, quantity, OrderType.MARKET, contract=contract)
     
-    def _get_mes_contract_id(self) -> int:
-        """Get contract ID for current /MES contract"""
-        # TODO: Fetch actual contract ID from Tradovate
-        # This changes based on expiration month
-        return 12345  # Placeholder
+    def register_fill_callback(self, callback: Callable):
+        """
+        Register an async callback invoked with every fill on this account
+        
+        Args:
+            callback: Coroutine function taking the fill dict
+        """
+        self.fill_callbacks.append(callback)
+        
+    async def _on_fill(self, fill: Dict):
+        """
+        Apply a fill to local state and notify listeners
+        
+        Args:
+            fill: Dict with 'orderId', 'action', 'qty' and 'price'
+        """
+        signed_qty = fill['qty'] if fill['action'].lower() == 'buy' else -fill['qty']
+        current_qty = self.position['quantity']
+        new_qty = current_qty + signed_qty
+        order = self.active_orders.get(fill['orderId'])
+        
+        if order is not None and (current_qty == 0 or (new_qty != 0 and (new_qty > 0) != (current_qty > 0))):
+            # Opening from flat (or flipping): the position lives in this order's contract
+            self.position['contract'] = order['order']['symbol']
+            self.position['contractId'] = order['order']['contractId']
+        elif new_qty == 0:
+            self.position['contract'] = None
+            self.position['contractId'] = None
+            
+        if current_qty == 0 or (current_qty > 0) == (signed_qty > 0):
+            # Opening or adding: blend average price
+            total_cost = self.position['avg_price'] * abs(current_qty) + fill['price'] * abs(signed_qty)
+            self.position['avg_price'] = total_cost / abs(new_qty)
+        elif new_qty == 0:
+            self.position['avg_price'] = 0
+        elif (new_qty > 0) != (current_qty > 0):
+            # Flipped through flat: remainder opens at fill price
+            self.position['avg_price'] = fill['price']
+        self.position['quantity'] = new_qty
+        
+        if order is not None:
+            order['filledQty'] = order.get('filledQty', 0) + fill['qty']
+            if order['filledQty'] >= order['order']['qty']:
+                order['status'] = OrderStatus.FILLED.value
+                
+        for callback in self.fill_callbacks:
+            await callback(fill)
+            
+        # Release after the governor books the fill: exposure is briefly overstated, never understated
+        self._release_reservation(fill['orderId'], fill['qty'])
+        
+    def _release_reservation(self, order_id: str, quantity: Optional[int] = None):
+        """
+        Return reserved quantity to the governor
+        
+        Args:
+            order_id: Order holding the reservation
+            quantity: Contracts to release (default: all that remain)
+        """
+        reserved = self._reserved.pop(order_id, 0)
+        if reserved == 0:
+            return
+        released = reserved if quantity is None else min(quantity, reserved)
+        if released < reserved:
+            self._reserved[order_id] = reserved - released
+        self.governor.release(self.active_orders[order_id]['order']['action'], released)
+        
+    def _get_mes_contract_id(self) -> Optional[int]:
+        """Get contract ID for current /MES contract (session cache, no lookup)"""
+        return self.roll_manager.get_contract_id('MES')
+        
+    async def _lookup_contract_id(self, symbol: str) -> int:
+        """
+        Look up a Tradovate contract ID by symbol
+        
+        Called once per contract per session by the roll manager.
+        """
+        if self.access_token is None:
+            return 12345  # Placeholder until Tradovate auth is implemented
+            
+        response = await asyncio.to_thread(
+            requests.get,
+            f"{self.base_url['api']}/contract/find",
+            params={'name': symbol},
+            headers={'Authorization': f"Bearer {self.access_token}"},
+            timeout=5
+        )
+        response.raise_for_status()
+        return response.json()['id']
     
     async def get_account_info(self) -> Dict:
         """Get account information including balance and margin"""
@@ -215,6 +507,23 @@ class TradovateOMS:
         # TODO: Fetch actual account data
         # response = await self._get_account()
         
+        # Governor state is marked to every tick, so prefer it when attached
+        if self.governor is not None:
+            state = self.governor.get_state()
+            return {
+                'accountId': self.account_id,
+                'balance': state['balance'],
+                'netLiq': state['equity'],
+                'availableFunds': state['equity'],
+                'marginRequirement': 0,
+                'unrealizedPnL': state['open_pnl'],
+                'realizedPnL': state['balance'] - self.governor.starting_balance,
+                'highWaterMark': state['high_water_mark'],
+                'riskBudget': state['risk_budget'],
+                'governorLevel': state['level'],
+                'environment': self.environment
+            }
+            
         # Placeholder data matching Apex 25K evaluation
         return {
             'accountId': self.account_id,
@@ -235,8 +544,11 @@ class TradovateOMS:
         print("🔌 Disconnected from Tradovate")
 
 async def test_tradovate_oms():
-    """Test the Tradovate OMS"""
-    oms = TradovateOMS()
+    """Test the Tradovate OMS against the local paper matching engine"""
+    from paper_matching_engine import PaperMatchingEngine
+    
+    engine = PaperMatchingEngine(tick_size=0.25, latency_ms=50.0)
+    oms = TradovateOMS(paper_engine=engine)
     
     print("=" * 60)
     print("🔧 TRADOVATE OMS TEST")
@@ -248,6 +560,9 @@ async def test_tradovate_oms():
         print("⚠️  Running in placeholder mode")
         oms.is_connected = True  # Force for testing
     
+    # Seed the engine with a trade so orders have a reference price
+    await engine.on_tick({'timestamp': '2025-08-01T09:30:00', 'price': 4490.00, 'size': 5})
+    
     # Test account info
     account = await oms.get_account_info()
     print(f"\n💰 Account Info:")
@@ -269,6 +584,19 @@ async def test_tradovate_oms():
     stop_order = await oms.place_order('sell', 1, OrderType.STOP, stop_price=4480.00)
     print(f"   Stop Order: {stop_order['orderId']}")
     
+    # Replay a short tick path: up through the limit, then down through the stop
+    ticks = []
+    prices = [4490.25, 4495.00, 4500.50, 4500.50, 4501.00, 4490.00, 4479.75]
+    for i, px in enumerate(prices):
+        ticks.append({'timestamp': f"2025-08-01T09:30:{i + 1:02d}", 'price': px, 'size': 10})
+    fills = await engine.replay(ticks)
+    
+    print(f"\n✅ Fills: {len(fills)}")
+    for fill in fills:
+        print(f"   {fill['orderId']}: {fill['action'].upper()} {fill['qty']} @ {fill['price']} "
+              f"({fill['orderType']}, {fill['slippageTicks']:+.1f} ticks)")
+    print(f"   Position: {oms.get_position()}")
+    
     # Show active orders
     active = oms.get_active_orders()
     print(f"\n📋 Active Orders: {len(active)}")